@@ -0,0 +1,75 @@
+import sys
+import timeit
+from typing import Dict, Any
+
+from core.templates import render_value
+
+# Micro-benchmark: compiled templates vs. the old per-key str.replace sweeps in runner.py
+# Usage: python bench_templates.py [context_keys] [body_leaves]
+
+
+def legacy_replace_placeholders(text: str, ctx: Dict[str, Any]) -> str:
+    for k in sorted(ctx.keys(), key=len, reverse=True):
+        v = ctx[k]
+        if isinstance(v, (str, int, float, bool)):
+            text = text.replace(f"{{{{{k}}}}}", str(v))
+            text = text.replace(f"{{{k}}}", str(v))
+        elif isinstance(v, dict):
+            for sub_k, sub_v in v.items():
+                if isinstance(sub_v, (str, int, float, bool)):
+                    text = text.replace(f"{{{{{k}.{sub_k}}}}}", str(sub_v))
+                    text = text.replace(f"{{{k}.{sub_k}}}", str(sub_v))
+    return text
+
+
+def legacy_resolve_body(obj: Any, ctx: Dict[str, Any]) -> Any:
+    if isinstance(obj, str):
+        stripped = obj.strip()
+        if (stripped.startswith("{{") and stripped.endswith("}}")) or (stripped.startswith("{") and stripped.endswith("}")):
+            key = stripped.strip("{}")
+            if key in ctx:
+                return ctx[key]
+        return legacy_replace_placeholders(obj, ctx)
+    elif isinstance(obj, dict):
+        return {k: legacy_resolve_body(v, ctx) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [legacy_resolve_body(i, ctx) for i in obj]
+    return obj
+
+
+def build_case(n_keys: int, n_leaves: int):
+    ctx: Dict[str, Any] = {f"var_{i}": f"value-{i}" for i in range(n_keys)}
+    ctx["create_driver"] = {"id": "d-1", "name": "Ravi"}
+    body = {}
+    for i in range(n_leaves):
+        kind = i % 4
+        if kind == 0:
+            body[f"f{i}"] = f"{{{{var_{i % n_keys}}}}}"
+        elif kind == 1:
+            body[f"f{i}"] = f"prefix-{{var_{i % n_keys}}}-suffix"
+        elif kind == 2:
+            body[f"f{i}"] = "{{create_driver.id}}"
+        else:
+            body[f"f{i}"] = "plain text value"
+    return ctx, body
+
+
+def main():
+    n_keys = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    n_leaves = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    ctx, body = build_case(n_keys, n_leaves)
+
+    assert legacy_resolve_body(body, ctx) == render_value(body, ctx), "implementations disagree"
+
+    number = 20
+    legacy = timeit.timeit(lambda: legacy_resolve_body(body, ctx), number=number) / number
+    compiled = timeit.timeit(lambda: render_value(body, ctx), number=number) / number
+
+    print(f"context keys: {n_keys}, body leaves: {n_leaves}")
+    print(f"legacy   : {legacy * 1000:.3f} ms/body")
+    print(f"compiled : {compiled * 1000:.3f} ms/body")
+    print(f"speedup  : {legacy / compiled:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
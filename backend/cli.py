@@ -0,0 +1,327 @@
+import argparse
+import asyncio
+import copy
+import json
+import os
+import sys
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from xml.etree import ElementTree as ET
+
+from models import ApiEndpoint
+from core.runner import get_operation_id
+from core.schema import ParsedSpec
+
+# Headless runner for CI: parse a spec, run every operation through a worker pool, stream
+# results to the terminal / NDJSON and write a JUnit report at the end.
+# Usage: python cli.py SPEC --base-url URL [--data testdata.json] [--workers N]
+#                          [--junit report.xml] [--ndjson results.ndjson | --ndjson -]
+#                          [--shards N [--processes P] [--shard-by component|tag]]
+#                          [--results-db DB [--check-latency] [--repeat N --capture-baseline]]
+# Only the runner path is imported; the AI modules (and groq) are never loaded here.
+
+EXIT_PASSED, EXIT_FAILED, EXIT_ERROR = 0, 1, 2
+
+
+def _load_json_or_yaml(path: str) -> Any:
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    if path.lower().endswith((".yaml", ".yml")):
+        import yaml
+        return yaml.safe_load(text)
+    return json.loads(text)
+
+
+async def load_spec(source: str) -> ParsedSpec:
+    if os.path.exists(source):
+        return ParsedSpec(_load_json_or_yaml(source))
+    from core.spec_cache import SpecCache
+    return await SpecCache().load(source)
+
+
+def _parse_pairs(pairs: List[str], sep: str) -> Dict[str, str]:
+    out = {}
+    for pair in pairs:
+        key, found, value = pair.partition(sep)
+        if not found:
+            raise ValueError(f"Expected NAME{sep}VALUE, got '{pair}'")
+        out[key.strip()] = value.strip()
+    return out
+
+
+def _select(endpoints: List[ApiEndpoint], only: List[str], tags: List[str]) -> List[ApiEndpoint]:
+    if only:
+        wanted = set(only)
+        endpoints = [ep for ep in endpoints if get_operation_id(ep) in wanted]
+    if tags:
+        endpoints = [ep for ep in endpoints if set(ep.tags) & set(tags)]
+    return endpoints
+
+
+def _describe_failure(result: Dict[str, Any]) -> str:
+    lines = [f"HTTP {result.get('status')} {result.get('method')} {result.get('url', result.get('endpoint'))}"]
+    if result.get("error"):
+        lines.append(result["error"])
+    for error in result.get("schemaErrors") or []:
+        lines.append(f"  {error['path']}: {error['message']}")
+    if result.get("response") is not None:
+        lines.append(json.dumps(result["response"], default=str)[:2000])
+    return "\n".join(lines)
+
+
+def junit_xml(suites: List[Tuple[str, List[ApiEndpoint], List[Optional[Dict[str, Any]]], float]]) -> ET.ElementTree:
+    # suites: (name, endpoints, results, elapsed) per pass; one <testsuite> each
+    root = ET.Element("testsuites")
+    for suite, endpoints, results, elapsed in suites:
+        _junit_suite(root, suite, endpoints, results, elapsed)
+    ET.indent(root)
+    return ET.ElementTree(root)
+
+
+def _junit_suite(root: ET.Element, suite: str, endpoints: List[ApiEndpoint], results: List[Optional[Dict[str, Any]]], elapsed: float):
+    failures = sum(1 for r in results if r is not None and not r.get("passed"))
+    skipped = sum(1 for r in results if r is None)
+    node = ET.SubElement(root, "testsuite", {
+        "name": suite,
+        "tests": str(len(results)),
+        "failures": str(failures),
+        "errors": "0",
+        "skipped": str(skipped),
+        "time": f"{elapsed:.3f}"
+    })
+    for ep, result in zip(endpoints, results):
+        case = ET.SubElement(node, "testcase", {
+            "classname": ep.tags[0] if ep.tags else ep.path.split("{")[0].rstrip("/") or "/",
+            "name": get_operation_id(ep),
+            "time": f"{(result or {}).get('time', 0) / 1000:.3f}"
+        })
+        if result is None:
+            ET.SubElement(case, "skipped", {"message": "not run"})
+        elif not result.get("passed"):
+            failure = ET.SubElement(case, "failure", {
+                "message": result.get("error") or f"HTTP {result.get('status')}",
+                "type": "SchemaMismatch" if result.get("schemaErrors") else "HTTPError"
+            })
+            failure.text = _describe_failure(result)
+
+
+class ResultSink:
+    # Prints one line per result as it lands and appends it to the NDJSON stream, if any.
+    # One sink (and one NDJSON file) per invocation; start_pass() begins each --repeat pass.
+    def __init__(self, ndjson_path: Optional[str], quiet: bool, store=None, judge=None, passes: int = 1):
+        self.quiet = quiet
+        self.store = store
+        self.judge = judge
+        self.passes = passes
+        self.to_stdout = ndjson_path == "-"
+        self.stream = sys.stdout if self.to_stdout else (open(ndjson_path, "w", encoding="utf-8") if ndjson_path else None)
+        self.run_id: Optional[str] = None
+        self.pass_number = 0
+        self.passed = 0
+        self.failed = 0
+
+    def start_pass(self, number: int, run_id: Optional[str]):
+        # Counters are per pass; the stream stays open across passes
+        self.pass_number = number
+        self.run_id = run_id
+        self.passed = 0
+        self.failed = 0
+
+    async def __call__(self, index: int, result: Dict[str, Any]):
+        if self.judge is not None:
+            self.judge(result)
+        if result.get("passed"):
+            self.passed += 1
+        else:
+            self.failed += 1
+        if self.store is not None:
+            self.store.record(self.run_id, result)
+        if self.stream is not None:
+            line = {"index": index, "pass": self.pass_number, **result} if self.passes > 1 else {"index": index, **result}
+            self.stream.write(json.dumps(line, default=str) + "\n")
+            self.stream.flush()
+        if not self.quiet and not self.to_stdout:
+            mark = "PASS" if result.get("passed") else "FAIL"
+            verdict = f" [{result['verdict']}]" if result.get("verdict") not in (None, "ok", "no_baseline") else ""
+            print(f"{mark} {result.get('status') or 0:>3} {result.get('time', 0):8.1f}ms {result.get('method')} {result.get('endpoint')}{verdict}", file=sys.stderr)
+
+    def close(self):
+        if self.stream is not None and not self.to_stdout:
+            self.stream.close()
+
+
+async def run(args: argparse.Namespace) -> int:
+    from core.http_pool import ClientPool, PoolConfig
+    from core.validation import response_validators
+
+    spec = await load_spec(args.spec)
+    endpoints = _select(spec.endpoints, args.only, args.tag)
+    if not endpoints:
+        print("No endpoints selected", file=sys.stderr)
+        return EXIT_ERROR
+
+    test_data = _load_json_or_yaml(args.data) if args.data else {}
+    if args.generate:
+        from core.datagen import generate_local_test_data
+        generated, _ = generate_local_test_data(spec, endpoints, args.seed)
+        # Explicit test data wins over generated entries
+        test_data = {**generated, **test_data}
+    variables: Dict[str, Any] = _parse_pairs(args.var, "=")
+    if args.header:
+        variables["headers"] = _parse_pairs(args.header, ":")
+
+    validators = None if args.no_validate else response_validators(spec)
+    workers = args.workers or os.cpu_count() or 4
+    pool = ClientPool(PoolConfig(max_connections=max(workers, 10), max_keepalive_connections=workers))
+    store = judge = None
+    if args.results_db:
+        from core.results_store import ResultsStore
+        store = ResultsStore(args.results_db)
+    elif args.check_latency or args.capture_baseline:
+        print("--check-latency and --capture-baseline need --results-db", file=sys.stderr)
+        return EXIT_ERROR
+    policy = None
+    repeat = max(1, args.repeat)
+    if args.check_latency or args.capture_baseline:
+        from core.baselines import LatencyJudge, LatencyPolicy
+        policy = LatencyPolicy.from_dict({k: _option_value(v) for k, v in _parse_pairs(args.latency, "=").items()})
+        if args.check_latency:
+            step_policy = policy
+            if repeat > 1:
+                # Single samples only get a verdict; the rank test over all passes decides below
+                step_policy = copy.copy(policy)
+                step_policy.fail_on_regression = False
+            judge = LatencyJudge(store.baselines(args.base_url), step_policy)
+    # Cold passes (new connections, empty caches) run first and stay out of baselines and rank tests
+    warmup = policy.warmup if policy is not None and (args.capture_baseline or repeat > 1) else 0
+
+    code = EXIT_PASSED
+    passes = warmup + repeat
+    sink = ResultSink(args.ndjson, args.quiet, store, judge, passes)
+    suites = []
+    title = spec.raw.get("info", {}).get("title") or args.spec
+    try:
+        # --repeat gives baselines and rank tests enough samples per operation; each pass is its own run
+        for n in range(passes):
+            if n == warmup and judge is not None:
+                judge.samples.clear()
+            run_id = store.start_run(source="cli", base_url=args.base_url, spec_url=args.spec) if store is not None else None
+            sink.start_pass(n + 1, run_id)
+            results, elapsed, how = await _run_once(args, spec, endpoints, variables, test_data, validators, workers, pool, sink)
+            if store is not None:
+                store.finish_run(run_id)
+            suites.append((title if passes == 1 else f"{title} (pass {n + 1})", endpoints, results, elapsed))
+            print(f"{sink.passed} passed, {sink.failed} failed in {elapsed:.2f}s ({how})", file=sys.stderr)
+            code = max(code, EXIT_PASSED if sink.failed == 0 else EXIT_FAILED)
+        if args.junit:
+            junit_xml(suites).write(args.junit, encoding="utf-8", xml_declaration=True)
+        if args.capture_baseline:
+            from core.baselines import capture_baselines
+            store.flush()
+            built = capture_baselines(store, args.base_url, warmup + repeat, policy)
+            print(f"captured latency baselines for {len(built)} operations", file=sys.stderr)
+    finally:
+        sink.close()
+        await pool.close()
+        if store is not None:
+            store.close()
+    if judge is not None and repeat > 1:
+        from core.baselines import judge_operations
+        verdicts = judge_operations(judge.samples, judge.baselines, policy)
+        regressed = {op: v for op, v in verdicts.items() if v["verdict"] == "regressed"}
+        for op, v in regressed.items():
+            print(f"latency regression {op}: {v['ratio']:.2f}x baseline median {v['baselineMedian']:.1f}ms "
+                  f"(n={v['n']})", file=sys.stderr)
+        print(f"{len(regressed)} of {len(verdicts)} operations regressed over {repeat} passes", file=sys.stderr)
+        if regressed and policy.fail_on_regression:
+            code = max(code, EXIT_FAILED)
+    elif judge is not None and judge.regressed:
+        print(f"{judge.regressed} latency regressions", file=sys.stderr)
+    return code
+
+
+def _option_value(text: str) -> Any:
+    # --latency minRatio=1.5 / failOnRegression=false / outliers=none
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+async def _run_once(args, spec: ParsedSpec, endpoints, variables, test_data, validators, workers: int,
+                    pool, sink: ResultSink) -> Tuple[List[Optional[Dict[str, Any]]], float, str]:
+    from core.scheduler import run_dag, run_sequential
+
+    started = time.perf_counter()
+    if args.shards > 1:
+        # Independent dependency components in separate processes; each shard's results are
+        # streamed as soon as that shard finishes
+        from core.sharding import run_sharded
+
+        async def on_report(report: Dict[str, Any]):
+            for result in report["results"]:
+                await sink(result["index"], result)
+            failed = sum(1 for r in report["results"] if not r.get("passed"))
+            print(f"shard {report['shard']} ({report['worker']}): {len(report['results'])} tests, "
+                  f"{failed} failed in {report['elapsed']:.2f}s", file=sys.stderr)
+
+        report = await run_sharded(spec, endpoints, args.base_url, variables, test_data, args.shards,
+                                   processes=args.processes, by=args.shard_by,
+                                   options={"concurrency": workers, "validate": not args.no_validate},
+                                   on_report=on_report)
+        return report["results"], time.perf_counter() - started, f"{len(report['shards'])} shards"
+
+    client = await pool.get(args.base_url)
+    if args.sequential:
+        results = await run_sequential(client, endpoints, args.base_url, variables, test_data,
+                                       on_result=sink, validators=validators)
+    else:
+        # Worker pool bounded by --workers; producers still run before their consumers
+        results = await run_dag(client, endpoints, args.base_url, variables, test_data,
+                                max_concurrency=workers, on_result=sink, validators=validators)
+    return results, time.perf_counter() - started, f"{workers} workers"
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="cli.py", description="Run an API test suite headlessly.")
+    parser.add_argument("spec", help="OpenAPI/Swagger file, spec URL or docs page URL")
+    parser.add_argument("--base-url", required=True, help="Base URL of the API under test")
+    parser.add_argument("--data", help="Test data file (JSON or YAML) keyed by operationId")
+    parser.add_argument("--generate", action="store_true", help="Fill missing test data with the local schema-driven generator")
+    parser.add_argument("--seed", type=int, help="Seed for --generate")
+    parser.add_argument("--var", action="append", default=[], metavar="NAME=VALUE", help="Variable for templates (repeatable)")
+    parser.add_argument("--header", action="append", default=[], metavar="NAME:VALUE", help="Request header (repeatable)")
+    parser.add_argument("--only", action="append", default=[], metavar="OPERATION_ID", help="Run only these operations (repeatable)")
+    parser.add_argument("--tag", action="append", default=[], help="Run only operations with this tag (repeatable)")
+    parser.add_argument("--workers", type=int, help="Concurrent requests (default: CPU count)")
+    parser.add_argument("--sequential", action="store_true", help="Run in spec order, one at a time")
+    parser.add_argument("--shards", type=int, default=1, help="Split the suite into N shards run in separate processes")
+    parser.add_argument("--processes", type=int, help="Processes for --shards (default: min(shards, CPU count))")
+    parser.add_argument("--shard-by", choices=["component", "tag"], default="component", help="How to group operations into shards")
+    parser.add_argument("--no-validate", action="store_true", help="Skip response schema validation")
+    parser.add_argument("--junit", help="Write a JUnit XML report here")
+    parser.add_argument("--ndjson", help="Stream results as NDJSON to this file ('-' for stdout)")
+    parser.add_argument("--quiet", action="store_true", help="No per-result lines on stderr")
+    parser.add_argument("--results-db", help="Record the run in this results history database (SQLite)")
+    parser.add_argument("--check-latency", action="store_true", help="Judge latencies against the baselines in --results-db")
+    parser.add_argument("--latency", action="append", default=[], metavar="OPTION=VALUE",
+                        help="Latency policy override, e.g. minRatio=1.5 or failOnRegression=false (repeatable)")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="Run the suite N times (one recorded run each); with --check-latency each operation "
+                             "is judged by a rank test over all passes")
+    parser.add_argument("--capture-baseline", action="store_true",
+                        help="After the runs, store latency baselines from them (warmup passes are added first and dropped)")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return asyncio.run(run(args))
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return EXIT_ERROR
+
+
+if __name__ == "__main__":
+    sys.exit(main())
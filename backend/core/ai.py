@@ -1,22 +1,103 @@
-from groq import Groq
+import asyncio
 import json
-from typing import Dict, Any, List, Optional
+import logging
+import os
+from typing import Dict, Any, List, Optional, Tuple
 from models import ApiEndpoint, TestExecutionResult
+from core.schema import ParsedSpec
+from core.runner import get_operation_id
+from core.llm import LLMGateway, DEFAULT_MODEL
+from core.ai_cache import AICache
+from core.testdata import endpoint_summary, plan_chunks, naming_contract, validate_test_data
+from core.datagen import generate_local_test_data
 
-def generate_ai_test_data(api_key: str, endpoints: List[ApiEndpoint]) -> Dict[str, Any]:
-    client = Groq(api_key=api_key)
-    
+logger = logging.getLogger(__name__)
+
+# Shared by every AI feature: one client per key, bounded concurrency, retries with backoff.
+# API_LLM_BACKEND=stub swaps in an offline backend.
+gateway = LLMGateway.from_env()
+
+# Repeat prompts are answered from disk (API_AI_CACHE=off disables it)
+ai_cache = AICache.from_env()
+
+# Bump when a prompt changes so cached answers to the old wording are not reused
+TESTDATA_PROMPT = "testdata:v2"
+DIAGNOSE_PROMPT = "diagnose:v1"
+
+# Failures per batched diagnosis prompt
+DIAGNOSE_BATCH_SIZE = 8
+
+# Prompt budget per test-data chunk (estimated tokens of endpoint summaries)
+CHUNK_TOKENS = int(os.getenv("API_AI_CHUNK_TOKENS", "6000"))
+
+async def generate_test_data(
+    api_key: Optional[str],
+    endpoints: List[ApiEndpoint],
+    spec: Optional[ParsedSpec] = None,
+    mode: str = "auto",
+    seed: Optional[Any] = None,
+    placeholders: bool = False
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    # "local": schema-driven generator only. "ai": the LLM for everything.
+    # "auto": local first; only operations it could not satisfy go to the LLM (when a key is given).
+    if mode == "ai":
+        return await generate_ai_test_data(api_key, endpoints, spec)
+
+    local, unsatisfied = generate_local_test_data(spec, endpoints, seed, placeholders)
+    pending = [ep for ep in endpoints if get_operation_id(ep) in unsatisfied]
+    issues: List[Dict[str, Any]] = []
+    if pending and mode == "auto" and api_key:
+        try:
+            ai_data, ai_issues = await generate_ai_test_data(api_key, pending, spec)
+            local.update(ai_data)
+            issues.extend(ai_issues)
+            unsatisfied = {op: reasons for op, reasons in unsatisfied.items() if op not in ai_data}
+        except Exception as e:
+            logger.warning(f"AI test data generation failed, keeping local data: {e}")
+    for op_id, reasons in unsatisfied.items():
+        issues.extend({"operationId": op_id, "issue": f"not generated locally: {reason}"} for reason in reasons)
+
+    data, problems = validate_test_data(local, endpoints, spec)
+    return data, issues + problems
+
+async def generate_ai_test_data(
+    api_key: str,
+    endpoints: List[ApiEndpoint],
+    spec: Optional[ParsedSpec] = None,
+    chunk_tokens: int = CHUNK_TOKENS
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
     # Simplify endpoints for prompt to save tokens and focus on schema
-    schema_summary = []
-    for ep in endpoints:
-        schema_summary.append({
-            "path": ep.path,
-            "method": ep.method,
-            "operationId": ep.operationId or f"{ep.method}_{ep.path}",
-            "parameters": [p["name"] for p in ep.parameters if p.get("in") in ["path", "query"]],
-            "body_schema": ep.requestBody  # rudimentary, might need specific extraction
-        })
+    summaries = [endpoint_summary(ep, spec) for ep in endpoints]
+
+    # Token-budgeted chunks (grouped by tag / collection) generated concurrently; wall time
+    # follows the largest chunk instead of the whole spec
+    chunks = plan_chunks(endpoints, summaries, chunk_tokens)
+    contract = naming_contract(summaries)
+    outcomes = await asyncio.gather(
+        *(_generate_chunk(api_key, chunk, contract) for chunk in chunks),
+        return_exceptions=True
+    )
+
+    failures = [o for o in outcomes if isinstance(o, Exception)]
+    if failures and len(failures) == len(outcomes):
+        # Nothing came back at all: fail like the single-prompt version did
+        logger.error(f"AI test data generation failed for every chunk: {failures[0]}")
+        raise failures[0]
 
+    merged: Dict[str, Any] = {}
+    issues: List[Dict[str, Any]] = []
+    for chunk, outcome in zip(chunks, outcomes):
+        if isinstance(outcome, Exception):
+            logger.warning(f"AI test data generation failed for {len(chunk)} operations: {outcome}")
+            issues.extend({"operationId": s["operationId"], "issue": f"generation failed: {outcome}"} for s in chunk)
+            continue
+        if isinstance(outcome, dict):
+            merged.update(outcome)
+
+    data, problems = validate_test_data(merged, endpoints, spec)
+    return data, issues + problems
+
+async def _generate_chunk(api_key: str, chunk: List[Dict[str, Any]], contract: List[str]) -> Dict[str, Any]:
     prompt = f"""
     You are a QA Automation Engineer. Generate a comprehensive JSON test data set for the following API endpoints.
     
@@ -24,33 +105,60 @@ def generate_ai_test_data(api_key: str, endpoints: List[ApiEndpoint]) -> Dict[st
     1. Output ONLY valid JSON. No markdown, no comments.
     2. The JSON structure must be keyed by 'operationId' (or 'METHOD_path' if operationId is missing).
     3. Provide realistic data for 'body' (for POST/PUT) and 'parameters' (for path/query).
-    4. Ensure dependencies are respected (e.g. if create_user returns an ID, use {{create_user.id}} in subsequent get_user calls).
+    4. Ensure dependencies are respected (e.g. if create_user returns an ID, use {{{{create_user.id}}}} in subsequent get_user calls).
     5. Generate success scenarios.
+    6. Only generate entries for the endpoints under "API Def". To reference a value produced by any
+       other operation, use {{{{<operationId>.<field>}}}} with an operationId from "All operations".
+    
+    All operations (operationId: METHOD path):
+    {json.dumps(contract, indent=2)}
     
     API Def:
-    {json.dumps(schema_summary, indent=2)}
+    {json.dumps(chunk, indent=2)}
     """
-    
-    try:
-        completion = client.chat.completions.create(
-            messages=[
-                {"role": "system", "content": "You are a helpful JSON data generator for API testing."},
-                {"role": "user", "content": prompt}
-            ],
-            model="llama-3.3-70b-versatile",
-            temperature=0.1,
-            response_format={"type": "json_object"}
-        )
-        
-        content = completion.choices[0].message.content
-        return json.loads(content)
-    except Exception as e:
-        print(f"Error calling Groq: {e}")
-        raise e
 
-def diagnose_error(api_key: str, endpoint: Dict[str, Any], request_body: Any, response_body: Any) -> Dict[str, Any]:
-    client = Groq(api_key=api_key)
-    
+    key = {"model": DEFAULT_MODEL, "chunk": chunk, "contract": contract}
+    cached = await _cache_get(TESTDATA_PROMPT, key)
+    if cached is not None:
+        return cached
+
+    data = await gateway.complete_json(api_key, [
+        {"role": "system", "content": "You are a helpful JSON data generator for API testing."},
+        {"role": "user", "content": prompt}
+    ])
+    await _cache_put(TESTDATA_PROMPT, key, data)
+    return data
+
+async def _cache_get(kind: str, payload: Any, mask: bool = True) -> Optional[Any]:
+    if ai_cache is None:
+        return None
+    return await asyncio.to_thread(ai_cache.get, kind, payload, mask)
+
+async def _cache_put(kind: str, payload: Any, value: Any, mask: bool = True):
+    if ai_cache is not None:
+        await asyncio.to_thread(ai_cache.put, kind, payload, value, mask)
+
+def _diagnosis_key(endpoint: Dict[str, Any], request_body: Any, response_body: Any) -> Dict[str, Any]:
+    # Only what the prompt uses. Looked up unmasked: the suggested_fix the frontend auto-applies
+    # contains this request's ids, so only the exact same request may reuse it
+    return {
+        "model": DEFAULT_MODEL,
+        "endpoint": f"{endpoint.get('method')} {endpoint.get('path')}",
+        "request": request_body,
+        "response": response_body
+    }
+
+async def diagnose_error(api_key: str, endpoint: Dict[str, Any], request_body: Any, response_body: Any) -> Dict[str, Any]:
+    key = _diagnosis_key(endpoint, request_body, response_body)
+    cached = await _cache_get(DIAGNOSE_PROMPT, key, mask=False)
+    if cached is not None:
+        return cached
+    diagnosis = await _diagnose_uncached(api_key, endpoint, request_body, response_body)
+    if "error" not in diagnosis:
+        await _cache_put(DIAGNOSE_PROMPT, key, diagnosis, mask=False)
+    return diagnosis
+
+async def _diagnose_uncached(api_key: str, endpoint: Dict[str, Any], request_body: Any, response_body: Any) -> Dict[str, Any]:
     prompt = f"""
     You are an expert API Debugger. Analyze the following API failure.
     
@@ -74,22 +182,85 @@ def diagnose_error(api_key: str, endpoint: Dict[str, Any], request_body: Any, re
     """
     
     try:
-        completion = client.chat.completions.create(
-            messages=[
-                {"role": "system", "content": "You are a specialized AI for debugging API failures."},
-                {"role": "user", "content": prompt}
-            ],
-            model="llama-3.3-70b-versatile",
-            temperature=0.1,
-            response_format={"type": "json_object"}
-        )
-        return json.loads(completion.choices[0].message.content)
+        return await gateway.complete_json(api_key, [
+            {"role": "system", "content": "You are a specialized AI for debugging API failures."},
+            {"role": "user", "content": prompt}
+        ])
     except Exception as e:
         return {"error": str(e)}
 
-def chat_with_context(api_key: str, endpoints: List[ApiEndpoint], user_message: str, history: List[Dict[str, str]], results: List[TestExecutionResult]) -> str:
-    client = Groq(api_key=api_key)
+async def diagnose_errors(api_key: str, failures: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # Cached failures answer immediately; the rest go several per prompt (one completion instead
+    # of N), with batches running concurrently through the gateway
+    keys = [_diagnosis_key(f.get("endpoint", {}), f.get("requestBody"), f.get("responseBody")) for f in failures]
+    results: List[Optional[Dict[str, Any]]] = list(await asyncio.gather(*(_cache_get(DIAGNOSE_PROMPT, k, mask=False) for k in keys)))
+    pending = [i for i, r in enumerate(results) if r is None]
+
+    batches = [pending[i:i + DIAGNOSE_BATCH_SIZE] for i in range(0, len(pending), DIAGNOSE_BATCH_SIZE)]
+    diagnosed = await asyncio.gather(*(_diagnose_batch(api_key, [failures[i] for i in batch]) for batch in batches))
+    for batch, answers in zip(batches, diagnosed):
+        for i, answer in zip(batch, answers):
+            results[i] = answer
+            if "error" not in answer:
+                await _cache_put(DIAGNOSE_PROMPT, keys[i], answer, mask=False)
+    return results
+
+async def _diagnose_batch(api_key: str, failures: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    if len(failures) == 1:
+        f = failures[0]
+        return [await _diagnose_uncached(api_key, f.get("endpoint", {}), f.get("requestBody"), f.get("responseBody"))]
+
+    cases = [
+        {
+            "index": i,
+            "endpoint": f"{f.get('endpoint', {}).get('method')} {f.get('endpoint', {}).get('path')}",
+            "request_body": f.get("requestBody"),
+            "response": f.get("responseBody")
+        }
+        for i, f in enumerate(failures)
+    ]
+
+    prompt = f"""
+    You are an expert API Debugger. Analyze each of the following API failures independently.
+    
+    Failures:
+    {json.dumps(cases, indent=2)}
+    
+    Task, for every failure:
+    1. Determine if this is an "INPUT_ISSUE" (the user sent bad data) or an "API_ISSUE" (the server code is logically broken).
+    2. If it is an "INPUT_ISSUE", provide the corrected JSON request body that will make the API pass.
+    3. If it is an "API_ISSUE", explain why the server is failing.
     
+    Rules:
+    - Return ONLY a JSON object.
+    - Structure: 
+      {{
+        "diagnoses": [
+          {{
+            "index": <index of the failure>,
+            "diagnosis": "INPUT_ISSUE" | "API_ISSUE",
+            "explanation": "Short clear explanation in simple English",
+            "suggested_fix": {{ ... corrected JSON body if input issue ... }}
+          }}
+        ]
+      }}
+    """
+
+    try:
+        data = await gateway.complete_json(api_key, [
+            {"role": "system", "content": "You are a specialized AI for debugging API failures."},
+            {"role": "user", "content": prompt}
+        ])
+    except Exception as e:
+        return [{"error": str(e)} for _ in failures]
+
+    by_index = {}
+    for item in data.get("diagnoses", []) if isinstance(data, dict) else []:
+        if isinstance(item, dict) and isinstance(item.get("index"), int):
+            by_index[item.pop("index")] = item
+    return [by_index.get(i, {"error": "No diagnosis returned for this failure"}) for i in range(len(failures))]
+
+async def chat_with_context(api_key: str, endpoints: List[ApiEndpoint], user_message: str, history: List[Dict[str, str]], results: List[TestExecutionResult]) -> str:
     # Summarize API context to keep tokens manageable
     context_summary = []
     for ep in endpoints:
@@ -137,11 +308,6 @@ def chat_with_context(api_key: str, endpoints: List[ApiEndpoint], user_message:
     messages.append({"role": "user", "content": user_message})
     
     try:
-        completion = client.chat.completions.create(
-            messages=messages,
-            model="llama-3.3-70b-versatile",
-            temperature=0.3,
-        )
-        return completion.choices[0].message.content
+        return await gateway.complete(api_key, messages, temperature=0.3)
     except Exception as e:
         return f"Error communicating with AI: {str(e)}"
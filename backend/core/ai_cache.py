@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import logging
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Values that differ on every run but do not change what the model would say
+_VOLATILE = [
+    (re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"), "<uuid>"),
+    (re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:?\d{2})?"), "<timestamp>")
+]
+
+
+def normalize(payload: Any, mask: bool = True) -> str:
+    # Canonical JSON (sorted keys) with ids and timestamps masked, so equivalent inputs share a key.
+    # mask=False for results that echo input values back (a diagnosis' suggested_fix carries the
+    # request's ids): a masked hit would replay another request's ids.
+    text = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+    if mask:
+        for pattern, replacement in _VOLATILE:
+            text = pattern.sub(replacement, text)
+    return text
+
+
+class AICache:
+    # Content-addressed store for LLM results: sha256(kind + normalized input) -> JSON value.
+    # Entries expire after `ttl`; past `max_bytes` the least recently used are dropped.
+    def __init__(self, path: str, ttl: float = 7 * 24 * 3600, max_bytes: int = 50 * 1024 * 1024):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evicted = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS ai_cache ("
+            " key TEXT PRIMARY KEY, kind TEXT NOT NULL, value TEXT NOT NULL, size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS ai_cache_accessed ON ai_cache (accessed_at)")
+        self._db.commit()
+
+    @classmethod
+    def from_env(cls) -> Optional["AICache"]:
+        path = os.getenv("API_AI_CACHE", "ai_cache.sqlite3")
+        if path in ("", "off"):
+            return None
+        return cls(
+            path,
+            ttl=float(os.getenv("API_AI_CACHE_TTL", str(7 * 24 * 3600))),
+            max_bytes=int(os.getenv("API_AI_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+        )
+
+    @staticmethod
+    def key(kind: str, payload: Any, mask: bool = True) -> str:
+        return hashlib.sha256(f"{kind}\n{normalize(payload, mask)}".encode()).hexdigest()
+
+    def get(self, kind: str, payload: Any, mask: bool = True) -> Optional[Any]:
+        key = self.key(kind, payload, mask)
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT value, created_at FROM ai_cache WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE ai_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, kind: str, payload: Any, value: Any, mask: bool = True):
+        text = json.dumps(value, default=str)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO ai_cache (key, kind, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (self.key(kind, payload, mask), kind, text, len(text), now, now)
+            )
+            self.writes += 1
+            self._evict(now)
+            self._db.commit()
+
+    def _evict(self, now: float):
+        cur = self._db.execute("DELETE FROM ai_cache WHERE created_at < ?", (now - self.ttl,))
+        self.evicted += cur.rowcount
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM ai_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Oldest access first until back under the limit
+        for key, size in self._db.execute("SELECT key, size FROM ai_cache ORDER BY accessed_at").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM ai_cache WHERE key = ?", (key,))
+            total -= size
+            self.evicted += 1
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM ai_cache")
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._db.execute("SELECT kind, COUNT(*), COALESCE(SUM(size), 0) FROM ai_cache GROUP BY kind").fetchall()
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "entries": sum(r[1] for r in rows),
+            "bytes": sum(r[2] for r in rows),
+            "by_kind": {r[0]: {"entries": r[1], "bytes": r[2]} for r in rows},
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "writes": self.writes,
+            "evicted": self.evicted
+        }
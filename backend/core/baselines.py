@@ -0,0 +1,226 @@
+import math
+from typing import Dict, Any, List, Optional
+from core.results_store import percentile
+
+# Max samples kept per baseline (enough for rank tests, small enough to load per run)
+MAX_SAMPLES = 200
+
+# Consistency constant: MAD * 1.4826 estimates the standard deviation for normal data
+MAD_SCALE = 1.4826
+
+
+class LatencyPolicy:
+    # How baselines are built and how strict comparisons are. Every field can be overridden
+    # per request (RunRequest.latency) or from the CLI.
+    def __init__(
+        self,
+        warmup: int = 1,
+        outliers: str = "mad",
+        mad_k: float = 3.5,
+        z: float = 3.0,
+        min_ratio: float = 1.25,
+        min_delta_ms: float = 2.0,
+        alpha: float = 0.01,
+        min_samples: int = 3,
+        fail_on_regression: bool = True
+    ):
+        if outliers not in ("mad", "none"):
+            raise ValueError(f"Unknown outlier mode '{outliers}' (use mad or none)")
+        # Overrides arrive as JSON / CLI values; reject bad ones up front instead of mid-run
+        for name, value, kind, low in (
+            ("warmup", warmup, int, 0), ("minSamples", min_samples, int, 1), ("madK", mad_k, float, 0),
+            ("z", z, float, 0), ("minRatio", min_ratio, float, 1), ("minDeltaMs", min_delta_ms, float, 0),
+            ("alpha", alpha, float, 0)
+        ):
+            if isinstance(value, bool) or not isinstance(value, (int, float) if kind is float else int):
+                raise ValueError(f"Latency option '{name}' must be {'a number' if kind is float else 'an integer'}")
+            if value < low:
+                raise ValueError(f"Latency option '{name}' must be >= {low}")
+        if z <= 0 or mad_k <= 0:
+            raise ValueError("Latency options 'z' and 'madK' must be positive")
+        if not 0 < alpha < 1:
+            raise ValueError("Latency option 'alpha' must be between 0 and 1")
+        if not isinstance(fail_on_regression, bool):
+            raise ValueError("Latency option 'failOnRegression' must be true or false")
+        self.warmup = warmup
+        self.outliers = outliers
+        self.mad_k = mad_k
+        self.z = z
+        self.min_ratio = min_ratio
+        self.min_delta_ms = min_delta_ms
+        self.alpha = alpha
+        self.min_samples = min_samples
+        self.fail_on_regression = fail_on_regression
+
+    @classmethod
+    def from_dict(cls, overrides: Optional[Dict[str, Any]]) -> "LatencyPolicy":
+        names = {
+            "warmup": "warmup", "outliers": "outliers", "madK": "mad_k", "z": "z", "minRatio": "min_ratio",
+            "minDeltaMs": "min_delta_ms", "alpha": "alpha", "minSamples": "min_samples",
+            "failOnRegression": "fail_on_regression"
+        }
+        kwargs = {}
+        for key, value in (overrides or {}).items():
+            if key not in names:
+                raise ValueError(f"Unknown latency option '{key}'")
+            kwargs[names[key]] = value
+        return cls(**kwargs)
+
+
+def _median(sorted_values: List[float]) -> float:
+    n = len(sorted_values)
+    mid = n // 2
+    return sorted_values[mid] if n % 2 else (sorted_values[mid - 1] + sorted_values[mid]) / 2
+
+
+def trim_outliers(samples: List[float], policy: LatencyPolicy) -> List[float]:
+    # Drops samples further than mad_k robust deviations from the median (GC pauses, cold caches)
+    if policy.outliers == "none" or len(samples) < 3:
+        return list(samples)
+    ordered = sorted(samples)
+    med = _median(ordered)
+    mad = _median(sorted(abs(s - med) for s in ordered))
+    if mad == 0:
+        return list(samples)
+    limit = policy.mad_k * MAD_SCALE * mad
+    return [s for s in samples if abs(s - med) <= limit]
+
+
+def build_baseline(samples: List[float], policy: LatencyPolicy) -> Optional[Dict[str, Any]]:
+    # samples: one operation's successful latencies in ms, oldest first, warm-up already removed
+    kept = trim_outliers(samples, policy)
+    if len(kept) < policy.min_samples:
+        return None
+    ordered = sorted(kept)
+    med = _median(ordered)
+    mad = _median(sorted(abs(s - med) for s in ordered))
+    return {
+        "n": len(ordered),
+        "dropped": len(samples) - len(kept),
+        "median": med,
+        "p90": percentile(ordered, 90),
+        "p99": percentile(ordered, 99),
+        "mad": mad,
+        "samples": kept[-MAX_SAMPLES:]
+    }
+
+
+def _noise(baseline: Dict[str, Any], policy: LatencyPolicy) -> float:
+    # Robust spread with a floor, so a perfectly stable baseline does not flag every jitter
+    return max(MAD_SCALE * baseline["mad"], 0.05 * baseline["median"], policy.min_delta_ms / policy.z, 1e-6)
+
+
+def judge_sample(value_ms: float, baseline: Optional[Dict[str, Any]], policy: LatencyPolicy) -> Dict[str, Any]:
+    # One new measurement against the baseline: robust z-score plus practical-significance gates
+    if baseline is None:
+        return {"verdict": "no_baseline"}
+    med = baseline["median"]
+    z = (value_ms - med) / _noise(baseline, policy)
+    ratio = value_ms / med if med else math.inf
+    delta = value_ms - med
+    if z >= policy.z and ratio >= policy.min_ratio and delta >= policy.min_delta_ms:
+        verdict = "regressed"
+    elif z <= -policy.z and ratio <= 1 / policy.min_ratio and -delta >= policy.min_delta_ms:
+        verdict = "improved"
+    else:
+        verdict = "ok"
+    return {"verdict": verdict, "baselineMedian": med, "ratio": ratio, "z": z}
+
+
+def mann_whitney_p(current: List[float], reference: List[float]) -> float:
+    # One-sided p-value that `current` is stochastically larger (slower) than `reference`;
+    # normal approximation with tie correction
+    n1, n2 = len(current), len(reference)
+    if not n1 or not n2:
+        return 1.0
+    pooled = sorted([(v, 0) for v in current] + [(v, 1) for v in reference])
+    ranks = [0.0] * len(pooled)
+    ties = 0.0
+    i = 0
+    while i < len(pooled):
+        j = i
+        while j + 1 < len(pooled) and pooled[j + 1][0] == pooled[i][0]:
+            j += 1
+        rank = (i + j) / 2 + 1
+        for k in range(i, j + 1):
+            ranks[k] = rank
+        t = j - i + 1
+        ties += t ** 3 - t
+        i = j + 1
+    r1 = sum(r for r, (_, group) in zip(ranks, pooled) if group == 0)
+    u = r1 - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def judge_samples(samples: List[float], baseline: Optional[Dict[str, Any]], policy: LatencyPolicy) -> Dict[str, Any]:
+    # Several new measurements (repeated runs, load tests): rank test against the stored samples
+    if baseline is None:
+        return {"verdict": "no_baseline", "n": len(samples)}
+    if len(samples) < policy.min_samples or len(baseline["samples"]) < policy.min_samples:
+        if not samples:
+            return {"verdict": "no_data", "n": 0}
+        return {**judge_sample(_median(sorted(samples)), baseline, policy), "n": len(samples)}
+    current = trim_outliers(samples, policy)
+    med = _median(sorted(current))
+    ratio = med / baseline["median"] if baseline["median"] else math.inf
+    p = mann_whitney_p(current, baseline["samples"])
+    if p < policy.alpha and ratio >= policy.min_ratio and med - baseline["median"] >= policy.min_delta_ms:
+        verdict = "regressed"
+    elif ratio <= 1 / policy.min_ratio and mann_whitney_p(baseline["samples"], current) < policy.alpha:
+        verdict = "improved"
+    else:
+        verdict = "ok"
+    return {"verdict": verdict, "baselineMedian": baseline["median"], "median": med, "ratio": ratio, "p": p, "n": len(current)}
+
+
+class LatencyJudge:
+    # Applied to each result as it completes: adds `verdict` (and `latency` details) next to
+    # `passed`, and fails the step on a regression when the policy says so
+    def __init__(self, baselines: Dict[str, Dict[str, Any]], policy: LatencyPolicy):
+        self.baselines = baselines
+        self.policy = policy
+        self.regressed = 0
+        # operationId -> latencies seen, for judge_operations over repeated passes
+        self.samples: Dict[str, List[float]] = {}
+
+    def __call__(self, result: Dict[str, Any]):
+        # Latency of failed requests says nothing about performance
+        if not result.get("passed") or not result.get("operationId"):
+            return
+        self.samples.setdefault(result["operationId"], []).append(result.get("time", 0.0))
+        judged = judge_sample(result.get("time", 0.0), self.baselines.get(result["operationId"]), self.policy)
+        result["verdict"] = judged.pop("verdict")
+        if judged:
+            result["latency"] = judged
+        if result["verdict"] == "regressed":
+            self.regressed += 1
+            if self.policy.fail_on_regression:
+                result["passed"] = False
+                result["error"] = (
+                    f"Latency regression: {result['time']:.1f}ms vs baseline median "
+                    f"{judged['baselineMedian']:.1f}ms ({judged['ratio']:.2f}x)"
+                )
+
+
+def judge_operations(samples: Dict[str, List[float]], baselines: Dict[str, Dict[str, Any]],
+                     policy: LatencyPolicy) -> Dict[str, Dict[str, Any]]:
+    # Repeated passes: one rank-test verdict per operation over all of its new samples
+    return {op: judge_samples(values, baselines.get(op), policy) for op, values in samples.items()}
+
+
+def capture_baselines(store, base_url: str, runs: int, policy: LatencyPolicy,
+                      operation_ids: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+    # store: core.results_store.ResultsStore. Operations with too few clean samples are skipped.
+    samples = store.latency_samples(base_url, runs, policy.warmup, operation_ids)
+    built = {}
+    for op, values in samples.items():
+        baseline = build_baseline(values, policy)
+        if baseline is not None:
+            built[op] = baseline
+    store.save_baselines(base_url, built)
+    return built
@@ -0,0 +1,80 @@
+import httpx
+from collections import ChainMap
+from typing import Dict, Any, List, Optional, Tuple
+from core.runner import execute_test_step
+from core.schema import ParsedSpec
+from core.resolver import RunResolver, needed_variables, fill_placeholders, learn_from
+from core.scheduler import OnResult
+from core.validation import response_validators
+
+
+def _unknown(op_id: str) -> Dict[str, Any]:
+    return {
+        "operationId": op_id,
+        "endpoint": None,
+        "method": None,
+        "status": 0,
+        "time": 0,
+        "passed": False,
+        "error": f"Unknown operationId: {op_id}"
+    }
+
+
+async def run_batch(
+    client: httpx.AsyncClient,
+    spec: ParsedSpec,
+    resolver: RunResolver,
+    steps: List[Dict[str, Any]],
+    base_url: str,
+    variables: Dict[str, Any],
+    test_data: Dict[str, Any],
+    on_result: Optional[OnResult] = None,
+    validate_schema: bool = True
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    # Steps name operations by operationId; endpoints come from the server-held spec.
+    # Runs in order and carries learned ids forward, like the UI's step-by-step flow.
+    # `variables` is extended in place, so a session's context grows without being copied.
+    context = variables
+    # Same precedence as the runner's merge (test data over variables), but as a live view
+    scope = ChainMap(test_data, context)
+    learned: Dict[str, Any] = {}
+    results = []
+    validators = response_validators(spec) if validate_schema else None
+
+    for i, step in enumerate(steps):
+        op_id = step["operationId"]
+        endpoint = spec.operation(op_id)
+        if endpoint is None:
+            result = _unknown(op_id)
+        else:
+            op_data = dict(test_data.get(op_id, {}))
+            if step.get("body") is not None:
+                op_data["body"] = step["body"]
+            if step.get("parameters"):
+                op_data["parameters"] = {**op_data.get("parameters", {}), **step["parameters"]}
+
+            body = op_data.get("body")
+            found = await resolver.resolve(needed_variables(endpoint, body), client, base_url, context)
+            context.update(found)
+            if body is not None:
+                op_data["body"] = fill_placeholders(body, context)
+
+            step_learned = dict(found)
+            # Shared headers (auth) travel with the step's own entry; the runner reads them from test data
+            step_data = {op_id: op_data}
+            if "headers" in test_data:
+                step_data["headers"] = test_data["headers"]
+            result = await execute_test_step(client, endpoint, base_url, context, step_data, scope=scope, validators=validators)
+            result["operationId"] = op_id
+            if result.get("passed") and result.get("response") is not None:
+                step_learned.update(learn_from(endpoint, result["response"]))
+                context.update(step_learned)
+
+            # Per-step delta, so streaming clients can keep their context without a final payload
+            result["learned"] = step_learned
+            learned.update(step_learned)
+
+        results.append(result)
+        if on_result:
+            await on_result(i, result)
+    return results, learned
@@ -0,0 +1,439 @@
+import random
+import re
+import string
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+from models import ApiEndpoint
+from core.runner import get_operation_id
+from core.schema import ParsedSpec
+
+# The regex parser is private to the standard library (re._parser, formerly sre_parse) and may
+# change or disappear. Without it, or if it changes shape, patterned strings are reported as
+# unsatisfied (the spec's example or the LLM fills them) instead of breaking generation.
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    try:
+        import sre_parse
+    except ImportError:
+        sre_parse = None
+
+# Deterministic anchor for dates, so seeded output does not drift with the clock
+BASE_DATE = datetime(2026, 1, 1, 9, 0, 0)
+MAX_DEPTH = 8
+MAX_REPEAT = 8
+
+FIRST_NAMES = ["Arun", "Priya", "Karthik", "Divya", "Rahul", "Meena", "Vijay", "Anita", "Suresh", "Kavya"]
+LAST_NAMES = ["Kumar", "Sharma", "Reddy", "Iyer", "Nair", "Patel", "Singh", "Rao"]
+CITIES = ["Chennai", "Bengaluru", "Mumbai", "Hyderabad", "Coimbatore", "Pune"]
+STREETS = ["MG Road", "Anna Salai", "Brigade Road", "Park Street", "Linking Road"]
+COLORS = ["White", "Black", "Silver", "Red", "Blue", "Grey"]
+WORDS = ["alpha", "bravo", "delta", "echo", "nova", "orbit", "pixel", "quartz", "sigma", "vertex"]
+
+# "pickupLat" / "candidate_name" / "DOB" -> words; heuristics match whole words, never substrings
+NAME_TOKEN_RE = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+
+
+class Unsatisfiable(Exception):
+    pass
+
+
+def _name_tokens(name: str) -> List[str]:
+    words = [w.lower() for w in NAME_TOKEN_RE.findall(name)]
+    # Plurals match their singular ("seats" -> "seat")
+    return words + [w[:-1] for w in words if len(w) > 3 and w.endswith("s")]
+
+
+def _is_id_field(name: str) -> bool:
+    lower = name.lower()
+    return lower == "id" or lower.endswith("_id") or (lower.endswith("id") and name[-2:] == "Id")
+
+
+class SchemaDataGenerator:
+    # Walks resolved schemas and builds values that satisfy them: enums/const (pydantic Literal),
+    # formats, patterns, length and range bounds, with field-name heuristics for realism.
+    # Whatever cannot be satisfied is collected in `unsatisfied` (as JSON-pointer-ish paths).
+    # With placeholders, required id fields become "{{name}}" for the run resolver to fill
+    # (/run-step and /run-steps with a runId); otherwise they get a value like any other field.
+    def __init__(self, spec: Optional[ParsedSpec] = None, seed: Optional[Any] = None, placeholders: bool = False):
+        self.spec = spec or ParsedSpec({})
+        self.seed = seed
+        self.placeholders = placeholders
+        self.rng = random.Random(seed)
+        self.unsatisfied: List[str] = []
+
+    def reseed(self, salt: str):
+        # Per-operation streams: one operation's values do not shift when others change
+        self.rng = random.Random(f"{self.seed}:{salt}" if self.seed is not None else None)
+
+    # --- Entry points ---
+
+    def value(self, schema: Any, name: str = "", path: str = "", depth: int = 0) -> Any:
+        try:
+            return self._value(self.spec.resolve(schema) if schema else {}, name, path, depth)
+        except Unsatisfiable as e:
+            self.unsatisfied.append(f"{path or '/'}: {e}")
+            return None
+
+    def _value(self, schema: Dict[str, Any], name: str, path: str, depth: int) -> Any:
+        if not isinstance(schema, dict):
+            raise Unsatisfiable("schema is not an object")
+        if schema.get("x-unresolved"):
+            raise Unsatisfiable(f"unresolved $ref {schema.get('$ref')}")
+        if depth > MAX_DEPTH:
+            raise Unsatisfiable("nested too deep")
+
+        if "const" in schema:
+            return schema["const"]
+        if schema.get("enum"):
+            choices = [v for v in schema["enum"] if v is not None] or schema["enum"]
+            return self.rng.choice(choices)
+        for key in ("example", "default"):
+            if key in schema and schema[key] is not None:
+                return schema[key]
+        examples = schema.get("examples")
+        if isinstance(examples, list) and examples:
+            return examples[0]
+
+        if "allOf" in schema:
+            merged: Dict[str, Any] = {k: v for k, v in schema.items() if k != "allOf"}
+            for sub in schema["allOf"]:
+                sub = self.spec.resolve(sub)
+                props = {**merged.get("properties", {}), **sub.get("properties", {})}
+                required = list(dict.fromkeys(merged.get("required", []) + sub.get("required", [])))
+                merged = {**merged, **sub, "properties": props, "required": required}
+            return self._value(merged, name, path, depth + 1)
+        for key in ("anyOf", "oneOf"):
+            if key in schema:
+                # First non-null alternative (Optional[X] is anyOf [X, null])
+                options = [self.spec.resolve(o) for o in schema[key]]
+                usable = [o for o in options if o.get("type") != "null"] or options
+                return self._value(usable[0], name, path, depth + 1)
+
+        if schema.get("x-circular"):
+            raise Unsatisfiable(f"recursive schema {schema.get('$ref')}")
+
+        kind = schema.get("type")
+        if isinstance(kind, list):
+            kind = next((k for k in kind if k != "null"), "null")
+        if kind is None:
+            kind = "object" if "properties" in schema else "array" if "items" in schema else "string"
+
+        if kind == "object":
+            return self._object(schema, path, depth)
+        if kind == "array":
+            return self._array(schema, name, path, depth)
+        if kind == "integer":
+            return self._number(schema, name, integer=True)
+        if kind == "number":
+            return self._number(schema, name, integer=False)
+        if kind == "boolean":
+            return self.rng.random() < 0.5 if not name.lower().startswith(("is_", "has_")) else True
+        if kind == "null":
+            return None
+        return self._string(schema, name)
+
+    # --- Composite types ---
+
+    def _object(self, schema: Dict[str, Any], path: str, depth: int) -> Dict[str, Any]:
+        props = schema.get("properties", {})
+        required = schema.get("required", [])
+        obj = {}
+        for key, prop in props.items():
+            prop = self.spec.resolve(prop)
+            if isinstance(prop, dict) and prop.get("x-circular") and key not in required:
+                continue
+            if _is_id_field(key) and not ("enum" in prop or "const" in prop):
+                # Ids come from other operations, so optional ones are left out. Required ones are
+                # a {{name}} template for the resolver, or a schema-valid value when none runs.
+                if key not in required:
+                    continue
+                if self.placeholders:
+                    obj[key] = f"{{{{{key}}}}}"
+                    continue
+            before = len(self.unsatisfied)
+            value = self.value(prop, key, f"{path}/{key}", depth + 1)
+            if len(self.unsatisfied) > before and key not in required:
+                # An optional field we could not fill is simply left out
+                del self.unsatisfied[before:]
+                continue
+            obj[key] = value
+        for key in required:
+            if key not in props:
+                self.unsatisfied.append(f"{path}/{key}: required but not described")
+        return obj
+
+    def _array(self, schema: Dict[str, Any], name: str, path: str, depth: int) -> List[Any]:
+        low = schema.get("minItems", 1)
+        high = max(low, min(schema.get("maxItems", low), low + 1))
+        count = self.rng.randint(low, high)
+        items = schema.get("items", {})
+        out: List[Any] = []
+        attempts = 0
+        while len(out) < count and attempts < count * 4:
+            attempts += 1
+            item = self.value(items, name, f"{path}/{len(out)}", depth + 1)
+            if schema.get("uniqueItems") and item in out:
+                continue
+            out.append(item)
+        if len(out) < low:
+            self.unsatisfied.append(f"{path}: could not build {low} unique items")
+        return out
+
+    # --- Scalars ---
+
+    def _number(self, schema: Dict[str, Any], name: str, integer: bool):
+        lo, hi = self._heuristic_range(_name_tokens(name), integer)
+
+        minimum, maximum = schema.get("minimum"), schema.get("maximum")
+        ex_min, ex_max = schema.get("exclusiveMinimum"), schema.get("exclusiveMaximum")
+        step = 1 if integer else 0.01
+        # OpenAPI 3.0 uses booleans next to minimum/maximum, 3.1 uses the bound itself
+        if isinstance(ex_min, bool):
+            ex_min = minimum if ex_min else None
+            minimum = None if ex_min is not None else minimum
+        if isinstance(ex_max, bool):
+            ex_max = maximum if ex_max else None
+            maximum = None if ex_max is not None else maximum
+        if minimum is not None:
+            lo = max(lo, minimum) if lo <= (maximum if maximum is not None else hi) else minimum
+        if ex_min is not None:
+            lo = max(lo, ex_min + step)
+        if maximum is not None:
+            hi = min(hi, maximum)
+        if ex_max is not None:
+            hi = min(hi, ex_max - step)
+        if lo > hi:
+            # Heuristic range does not overlap the declared bounds; trust the schema
+            lo = minimum if minimum is not None else (ex_min + step if ex_min is not None else hi)
+            hi = maximum if maximum is not None else (ex_max - step if ex_max is not None else lo)
+        if lo > hi:
+            raise Unsatisfiable(f"empty range [{lo}, {hi}]")
+
+        multiple = schema.get("multipleOf")
+        if multiple:
+            first = -(-lo // multiple) * multiple
+            if first > hi:
+                raise Unsatisfiable(f"no multiple of {multiple} in [{lo}, {hi}]")
+            value = first + multiple * self.rng.randint(0, int((hi - first) // multiple))
+            return int(value) if integer else value
+        if integer:
+            return self.rng.randint(int(-(-lo // 1)), int(hi // 1))
+        return round(self.rng.uniform(lo, hi), 2)
+
+    @staticmethod
+    def _heuristic_range(words: List[str], integer: bool) -> Tuple[float, float]:
+        def has(*keys: str) -> bool:
+            return any(k in words for k in keys)
+
+        if has("lat", "latitude"):
+            return (8.0, 28.0)
+        if has("lng", "lon", "longitude"):
+            return (72.0, 88.0)
+        if has("amount", "price", "fare", "cost", "balance", "total", "charge"):
+            return (100, 2000)
+        if has("capacity", "count", "passenger", "seat", "quantity", "qty"):
+            return (1, 6)
+        if has("year"):
+            return (2020, 2030)
+        if has("age"):
+            return (21, 60)
+        if has("rating"):
+            return (1, 5)
+        if has("percent", "percentage"):
+            return (0, 100)
+        if has("km", "distance", "odo", "odometer"):
+            return (1, 500)
+        return (1, 100)
+
+    def _string(self, schema: Dict[str, Any], name: str) -> str:
+        pattern = schema.get("pattern")
+        if pattern:
+            value = self._from_pattern(pattern)
+        else:
+            value = self._formatted(schema.get("format"), name)
+
+        min_len, max_len = schema.get("minLength", 0), schema.get("maxLength")
+        if not pattern:
+            if len(value) < min_len:
+                value += "".join(self.rng.choice(string.ascii_lowercase) for _ in range(min_len - len(value)))
+            if max_len is not None and len(value) > max_len:
+                value = value[:max_len]
+        elif len(value) < min_len or (max_len is not None and len(value) > max_len):
+            raise Unsatisfiable(f"pattern {pattern!r} and length bounds disagree")
+        return value
+
+    def _formatted(self, fmt: Optional[str], name: str) -> str:
+        rng = self.rng
+        words = _name_tokens(name)
+        last = NAME_TOKEN_RE.findall(name)[-1].lower() if words else ""
+
+        def has(*keys: str) -> bool:
+            return any(k in words for k in keys)
+
+        moment = BASE_DATE + timedelta(days=rng.randint(0, 365), minutes=rng.randint(0, 24 * 60))
+        if fmt == "date-time" or last == "at" or has("datetime", "timestamp"):
+            return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+        if fmt == "date" or has("date", "dob", "birthday", "expiry"):
+            return moment.strftime("%Y-%m-%d")
+        if fmt == "time" or last == "time":
+            return moment.strftime("%H:%M:%S")
+        if fmt == "uuid":
+            return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+        if fmt == "email" or has("email"):
+            return f"{rng.choice(FIRST_NAMES).lower()}.{rng.randint(100, 99999)}@example.com"
+        if fmt in ("uri", "url") or has("url", "uri", "link", "website"):
+            return f"https://example.com/{rng.choice(WORDS)}/{rng.randint(1, 9999)}"
+        if fmt == "ipv4":
+            return ".".join(str(rng.randint(1, 254)) for _ in range(4))
+        if fmt == "password" or has("password"):
+            return "Pa55-" + "".join(rng.choice(string.ascii_letters + string.digits) for _ in range(10))
+        if has("phone", "mobile"):
+            return str(rng.randint(7, 9)) + "".join(str(rng.randint(0, 9)) for _ in range(9))
+        if has("otp", "pin"):
+            return "".join(str(rng.randint(0, 9)) for _ in range(6))
+        if has("firstname") or (has("first") and has("name")):
+            return rng.choice(FIRST_NAMES)
+        if has("lastname", "surname") or (has("last") and has("name")):
+            return rng.choice(LAST_NAMES)
+        if has("name", "fullname"):
+            return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        if has("address", "location"):
+            return f"{rng.randint(1, 200)}, {rng.choice(STREETS)}, {rng.choice(CITIES)}"
+        if has("city"):
+            return rng.choice(CITIES)
+        if has("zip", "pincode", "postal", "postcode"):
+            return str(rng.randint(600001, 699999))
+        if has("color", "colour"):
+            return rng.choice(COLORS)
+        if has("currency"):
+            return "INR"
+        if has("number", "code", "reference"):
+            return "".join(rng.choice(string.ascii_uppercase) for _ in range(2)) + str(rng.randint(1000, 9999))
+        if has("description", "note", "comment", "message", "reason", "remarks"):
+            return f"Automated test {rng.choice(WORDS)} {rng.randint(1, 999)}"
+        return f"{rng.choice(WORDS)}-{rng.randint(1, 9999)}"
+
+    # --- Regex patterns ---
+
+    def _from_pattern(self, pattern: str) -> str:
+        if sre_parse is None:
+            raise Unsatisfiable(f"pattern {pattern!r} needs the regex parser, not available here")
+        try:
+            parsed = sre_parse.parse(pattern)
+            value = self._emit(parsed)
+        except Unsatisfiable:
+            raise
+        except Exception as e:
+            raise Unsatisfiable(f"unsupported pattern {pattern!r}: {e}")
+        if not re.search(pattern, value):
+            raise Unsatisfiable(f"could not satisfy pattern {pattern!r}")
+        return value
+
+    def _emit(self, tokens) -> str:
+        out = []
+        for op, arg in tokens:
+            out.append(self._emit_one(op, arg))
+        return "".join(out)
+
+    def _emit_one(self, op, arg) -> str:
+        rng = self.rng
+        if op == sre_parse.LITERAL:
+            return chr(arg)
+        if op == sre_parse.NOT_LITERAL:
+            return next(c for c in string.ascii_letters if ord(c) != arg)
+        if op == sre_parse.ANY:
+            return rng.choice(string.ascii_letters)
+        if op == sre_parse.AT:
+            return ""
+        if op == sre_parse.IN:
+            return self._from_class(arg)
+        if op == sre_parse.CATEGORY:
+            return self._from_class([(op, arg)])
+        if op == sre_parse.BRANCH:
+            return self._emit(rng.choice(arg[1]))
+        if op == sre_parse.SUBPATTERN:
+            return self._emit(arg[-1])
+        if op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+            low, high, sub = arg
+            high = min(high, max(low, MAX_REPEAT)) if high != sre_parse.MAXREPEAT else max(low, min(low + 3, MAX_REPEAT))
+            return "".join(self._emit(sub) for _ in range(rng.randint(low, high)))
+        raise Unsatisfiable(f"regex construct {op}")
+
+    def _from_class(self, items) -> str:
+        chars: List[str] = []
+        negate = False
+        for op, arg in items:
+            if op == sre_parse.NEGATE:
+                negate = True
+            elif op == sre_parse.LITERAL:
+                chars.append(chr(arg))
+            elif op == sre_parse.RANGE:
+                lo, hi = arg
+                chars.extend(chr(c) for c in range(lo, min(hi, lo + 94) + 1))
+            elif op == sre_parse.CATEGORY:
+                if arg == sre_parse.CATEGORY_DIGIT:
+                    chars.extend(string.digits)
+                elif arg == sre_parse.CATEGORY_WORD:
+                    chars.extend(string.ascii_letters + string.digits + "_")
+                elif arg == sre_parse.CATEGORY_SPACE:
+                    chars.append(" ")
+                else:
+                    raise Unsatisfiable(f"character category {arg}")
+            else:
+                raise Unsatisfiable(f"character class item {op}")
+        if negate:
+            pool = [c for c in string.ascii_letters + string.digits if c not in chars]
+            return self.rng.choice(pool)
+        return self.rng.choice(chars)
+
+
+def _parameter_value(gen: SchemaDataGenerator, param: Dict[str, Any], op_path: str) -> Tuple[bool, Any]:
+    # Ids in path/query are produced by other operations at run time; everything else is generated
+    name = param.get("name", "")
+    if _is_id_field(name):
+        return False, None
+    schema = param.get("schema", {k: v for k, v in param.items() if k in ("type", "format", "enum", "pattern", "minimum", "maximum")})
+    return True, gen.value(schema, name, f"{op_path}/parameters/{name}")
+
+
+def generate_local_test_data(
+    spec: Optional[ParsedSpec],
+    endpoints: List[ApiEndpoint],
+    seed: Optional[Any] = None,
+    placeholders: bool = False
+) -> Tuple[Dict[str, Any], Dict[str, List[str]]]:
+    # testData keyed by operationId, plus what could not be satisfied per operation
+    gen = SchemaDataGenerator(spec, seed, placeholders)
+    data: Dict[str, Any] = {}
+    unsatisfied: Dict[str, List[str]] = {}
+
+    for ep in endpoints:
+        op_id = get_operation_id(ep)
+        gen.reseed(op_id)
+        gen.unsatisfied = []
+        entry: Dict[str, Any] = {}
+
+        params = gen.spec.parameters(ep) if spec else [gen.spec.resolve(p) for p in ep.parameters]
+        values = {}
+        for param in params:
+            if param.get("in") not in ("path", "query") or (param.get("in") == "query" and not param.get("required")):
+                continue
+            keep, value = _parameter_value(gen, param, op_id)
+            if keep:
+                values[param["name"]] = value
+        if values:
+            entry["parameters"] = values
+
+        if ep.method.upper() in ("POST", "PUT", "PATCH"):
+            schema = gen.spec.request_schema(ep)
+            if schema is None and ep.requestBody:
+                gen.unsatisfied.append("/body: request body has no JSON schema")
+            elif schema is not None:
+                entry["body"] = gen.value(schema, "", "/body")
+
+        data[op_id] = entry
+        if gen.unsatisfied:
+            unsatisfied[op_id] = list(gen.unsatisfied)
+    return data, unsatisfied
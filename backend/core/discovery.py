@@ -0,0 +1,242 @@
+import asyncio
+import json
+import os
+import time
+import logging
+import httpx
+import yaml
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Probed under the target's origin, in priority order
+DEFAULT_PATHS = [
+    "/openapi.json",
+    "/api/openapi.json",
+    "/api/v1/openapi.json",
+    "/v1/openapi.json",
+    "/swagger.json",
+    "/api/swagger.json",
+    "/v3/api-docs",
+    "/v2/api-docs",
+    "/openapi.yaml",
+    "/openapi.yml",
+    "/swagger.yaml",
+    "/api/openapi.yaml"
+]
+
+CLIENT_OPTIONS = {"verify": False, "headers": {"User-Agent": "Mozilla/5.0"}}
+
+
+class ProbeResult:
+    def __init__(self, url: str):
+        self.url = url
+        self.status: Optional[int] = None
+        self.content_type: Optional[str] = None
+        self.error: Optional[str] = None
+        self.elapsed = 0.0
+        self.response: Optional[httpx.Response] = None
+        self.spec: Optional[Dict[str, Any]] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.spec is not None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "status": self.status,
+            "content_type": self.content_type,
+            "error": self.error,
+            "elapsed_ms": self.elapsed * 1000,
+            "is_spec": self.ok
+        }
+
+
+def parse_spec_body(resp: httpx.Response) -> Optional[Dict[str, Any]]:
+    # JSON first; YAML only when the response or URL says so (HTML docs pages would parse as YAML strings)
+    data = None
+    try:
+        data = resp.json()
+    except Exception:
+        ctype = resp.headers.get("content-type", "").lower()
+        path = resp.url.path.lower()
+        if "yaml" in ctype or path.endswith((".yaml", ".yml")) or resp.text.lstrip().startswith(("openapi:", "swagger:")):
+            try:
+                data = yaml.safe_load(resp.text)
+            except yaml.YAMLError:
+                data = None
+    if isinstance(data, dict) and ("paths" in data or "openapi" in data or "swagger" in data):
+        return data
+    return None
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}" if parts.scheme and parts.netloc else url.rstrip("/")
+
+
+class SpecDiscovery:
+    def __init__(
+        self,
+        paths: Optional[List[str]] = None,
+        max_concurrency: int = 8,
+        per_host: int = 4,
+        timeout: float = 5.0,
+        cache_path: Optional[str] = None,
+        winner_grace: Optional[float] = None
+    ):
+        self.paths = paths or DEFAULT_PATHS
+        self.max_concurrency = max_concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.cache_path = cache_path or os.getenv("API_DISCOVERY_CACHE", "discovery_cache.json")
+        # Once a candidate serves a spec, how long higher-priority probes still in flight get to beat it
+        self.winner_grace = winner_grace if winner_grace is not None else float(os.getenv("API_DISCOVERY_WINNER_GRACE", "1.0"))
+        self._known: Optional[Dict[str, Dict[str, Any]]] = None
+
+    # --- Candidate list ---
+
+    def candidates(self, url: str) -> List[str]:
+        candidates = [url]
+
+        # If it looks like a UI URL, prioritize the likely JSON path
+        if "docs" in url or "redoc" in url:
+            base = url.split("#")[0].rstrip("/")
+            json_url = base.replace("/docs", "/openapi.json").replace("/redoc", "/openapi.json")
+            candidates.insert(0, json_url)
+
+        # Same fallbacks under the prefix the docs page was mounted on (e.g. https://host/api/docs -> https://host/api)
+        base_domain = url.split("/docs")[0].split("/redoc")[0]
+        if base_domain != url:
+            candidates.extend(f"{base_domain.rstrip('/')}{p}" for p in self.paths)
+
+        origin = _origin(url)
+        candidates.extend(f"{origin}{p}" for p in self.paths)
+
+        # Remove duplicates while preserving order
+        return list(dict.fromkeys(candidates))
+
+    # --- Winner cache, persisted per host ---
+
+    def _load_known(self) -> Dict[str, Dict[str, Any]]:
+        if self._known is None:
+            self._known = {}
+            if os.path.exists(self.cache_path):
+                try:
+                    with open(self.cache_path, "r") as f:
+                        self._known = json.load(f)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Ignoring unreadable discovery cache {self.cache_path}: {e}")
+        return self._known
+
+    def known_location(self, url: str) -> Optional[str]:
+        entry = self._load_known().get(urlsplit(url).netloc)
+        if not entry:
+            return None
+        # Only shortcut when the request points at the same thing: the same input, the spec
+        # itself, or the bare host / its docs page. Any other explicit path gets probed.
+        path = urlsplit(url).path.rstrip("/")
+        if url in (entry.get("source"), entry["url"]) or path in ("", "/docs", "/redoc"):
+            return entry["url"]
+        return None
+
+    def remember(self, url: str, winner: str):
+        self._load_known()[urlsplit(url).netloc] = {"url": winner, "source": url, "updated_at": time.time()}
+        self._save_known()
+
+    def forget(self, url: str):
+        if self._load_known().pop(urlsplit(url).netloc, None) is not None:
+            self._save_known()
+
+    def _save_known(self):
+        tmp = f"{self.cache_path}.tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(self._load_known(), f, indent=2)
+            os.replace(tmp, self.cache_path)
+        except OSError as e:
+            logger.warning(f"Could not persist discovery cache: {e}")
+
+    # --- Probing ---
+
+    async def _probe(self, client: httpx.AsyncClient, url: str, limits: Dict[str, asyncio.Semaphore], overall: asyncio.Semaphore) -> ProbeResult:
+        result = ProbeResult(url)
+        host = urlsplit(url).netloc
+        host_limit = limits.setdefault(host, asyncio.Semaphore(self.per_host))
+        async with overall, host_limit:
+            started = time.perf_counter()
+            try:
+                resp = await client.get(url, timeout=self.timeout, follow_redirects=True)
+                result.status = resp.status_code
+                result.content_type = resp.headers.get("content-type")
+                result.response = resp
+                if resp.status_code == 200:
+                    result.spec = parse_spec_body(resp)
+            except Exception as e:
+                result.error = str(e) or type(e).__name__
+            result.elapsed = time.perf_counter() - started
+        logger.debug(f"Probe {url}: {result.status or result.error}")
+        return result
+
+    async def probe_all(self, urls: List[str]) -> List[ProbeResult]:
+        # Report mode: every candidate runs to completion, results in input order
+        limits: Dict[str, asyncio.Semaphore] = {}
+        overall = asyncio.Semaphore(self.max_concurrency)
+        async with httpx.AsyncClient(**CLIENT_OPTIONS) as client:
+            return await asyncio.gather(*(self._probe(client, u, limits, overall) for u in urls))
+
+    async def _first_spec(self, urls: List[str]) -> Tuple[Optional[ProbeResult], List[ProbeResult]]:
+        # Ordered race: probes run concurrently, but the highest-priority candidate that
+        # serves a spec wins, so the answer does not depend on which server replied first.
+        # Once some candidate has a spec, probes ahead of it get winner_grace seconds to
+        # answer; a hanging higher-priority host then loses instead of holding up discovery.
+        limits: Dict[str, asyncio.Semaphore] = {}
+        overall = asyncio.Semaphore(self.max_concurrency)
+        loop = asyncio.get_running_loop()
+        async with httpx.AsyncClient(**CLIENT_OPTIONS) as client:
+            tasks = [asyncio.create_task(self._probe(client, u, limits, overall)) for u in urls]
+            index = {t: i for i, t in enumerate(tasks)}
+            best: Optional[int] = None
+            deadline: Optional[float] = None
+            try:
+                while True:
+                    ahead = [t for t in tasks[:len(tasks) if best is None else best] if not t.done()]
+                    if not ahead:
+                        break
+                    timeout = None if deadline is None else max(0.0, deadline - loop.time())
+                    done, _ = await asyncio.wait(ahead, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                    if not done:
+                        break
+                    for t in done:
+                        if t.result().ok and (best is None or index[t] < best):
+                            best = index[t]
+                            if deadline is None:
+                                deadline = loop.time() + self.winner_grace
+                winner = tasks[best].result() if best is not None else None
+                return winner, [t.result() for t in tasks if t.done() and not t.cancelled()]
+            finally:
+                # Cancel the losers and let them unwind before the client closes
+                for t in tasks:
+                    t.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def discover(self, url: str) -> Tuple[httpx.Response, Dict[str, Any]]:
+        # 1. Go straight to the location that worked last time for this host
+        known = self.known_location(url)
+        if known:
+            winner, _ = await self._first_spec([known])
+            if winner:
+                return winner.response, winner.spec
+            logger.info(f"Cached spec location {known} no longer valid, probing again")
+            self.forget(url)
+
+        # 2. Probe the candidate list
+        urls = self.candidates(url)
+        winner, _ = await self._first_spec(urls)
+        if not winner:
+            raise Exception(f"Could not find valid openapi.json in {len(urls)} locations.")
+
+        self.remember(url, str(winner.response.url))
+        return winner.response, winner.spec
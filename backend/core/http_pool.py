@@ -0,0 +1,209 @@
+import os
+import time
+import asyncio
+import logging
+import httpx
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, "1" if default else "0").lower() in ("1", "true", "yes")
+
+
+class PoolConfig:
+    def __init__(
+        self,
+        max_connections: int = None,
+        max_keepalive_connections: int = None,
+        keepalive_expiry: float = None,
+        http2: bool = None,
+        max_pools: int = None,
+        idle_grace: float = None
+    ):
+        # Explicit arguments win, then environment, then defaults
+        self.max_connections = max_connections or int(os.getenv("API_POOL_MAX_CONNECTIONS", "100"))
+        self.max_keepalive_connections = max_keepalive_connections or int(os.getenv("API_POOL_MAX_KEEPALIVE", "20"))
+        self.keepalive_expiry = keepalive_expiry or float(os.getenv("API_POOL_KEEPALIVE_EXPIRY", "30"))
+        self.http2 = http2 if http2 is not None else _env_bool("API_POOL_HTTP2", False)
+        self.max_pools = max_pools or int(os.getenv("API_POOL_MAX_HOSTS", "32"))
+        # A client checked out or used more recently than this is never evicted, even before its first request
+        self.idle_grace = idle_grace if idle_grace is not None else float(os.getenv("API_POOL_IDLE_GRACE", "10"))
+
+        # HTTP/2 needs the optional 'h2' package
+        if self.http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("API_POOL_HTTP2 is set but 'h2' is not installed; using HTTP/1.1")
+                self.http2 = False
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "max_connections": self.max_connections,
+            "max_keepalive_connections": self.max_keepalive_connections,
+            "keepalive_expiry": self.keepalive_expiry,
+            "http2": self.http2,
+            "max_pools": self.max_pools,
+            "idle_grace": self.idle_grace
+        }
+
+
+def pool_key(base_url: str) -> str:
+    # One pool per scheme://host:port, paths share connections
+    parts = urlsplit(base_url)
+    if not parts.scheme or not parts.netloc:
+        return base_url.rstrip("/")
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    # Response body wrapper that reports when the body is closed (read to the end or abandoned)
+    def __init__(self, stream: httpx.AsyncByteStream, release):
+        self._stream = stream
+        self._release = release
+        self._released = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._released:
+                self._released = True
+                self._release()
+
+
+class _CountingTransport(httpx.AsyncBaseTransport):
+    # Counts requests from send until their response body is closed, through the public transport API.
+    # last_active moves on every send and every closed body, so a client that a long run holds
+    # (one get() for thousands of requests) never looks idle while the run keeps using it.
+    def __init__(self, inner: httpx.AsyncHTTPTransport):
+        self.inner = inner
+        self.in_flight = 0
+        self.last_active = 0.0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.in_flight += 1
+        self.last_active = time.time()
+        try:
+            response = await self.inner.handle_async_request(request)
+        except BaseException:
+            self.in_flight -= 1
+            raise
+        response.stream = _ReleasingStream(response.stream, self._release)
+        return response
+
+    def _release(self):
+        self.in_flight -= 1
+        self.last_active = time.time()
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+
+class _PooledClient:
+    def __init__(self, client: httpx.AsyncClient, transport: _CountingTransport):
+        self.client = client
+        self.transport = transport
+        self.created_at = time.time()
+        self.last_used = self.created_at
+        self.checkouts = 0
+        self.requests = 0
+
+    async def _count_request(self, request: httpx.Request):
+        self.requests += 1
+
+    @property
+    def last_active(self) -> float:
+        # Latest checkout, send or finished response
+        return max(self.last_used, self.transport.last_active)
+
+    def evictable(self, grace: float) -> bool:
+        # No request in flight and neither checked out nor used within the grace period: covers a
+        # caller that just got this client from get() but has not sent yet, and the gap between
+        # two requests of a run holding the client
+        return self.transport.in_flight == 0 and time.time() - self.last_active >= grace
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {
+            "created_at": self.created_at,
+            "last_used": self.last_active,
+            "checkouts": self.checkouts,
+            "requests": self.requests,
+            "in_flight": self.transport.in_flight
+        }
+        # Socket counts come from httpcore's pool, which httpx does not expose publicly
+        # (AsyncHTTPTransport._pool, httpcore 1.x `connections`). Diagnostics only: left out
+        # when the internals change; eviction relies on in_flight above.
+        connections = getattr(getattr(self.transport.inner, "_pool", None), "connections", None)
+        if connections is not None:
+            idle = sum(1 for c in connections if c.is_idle())
+            stats.update(connections=len(connections), idle_connections=idle, active_connections=len(connections) - idle)
+        return stats
+
+
+class ClientPool:
+    def __init__(self, config: Optional[PoolConfig] = None):
+        self.config = config or PoolConfig()
+        self._clients: "OrderedDict[str, _PooledClient]" = OrderedDict()
+        self._lock = asyncio.Lock()
+        self.evictions = 0
+
+    def _build(self) -> _PooledClient:
+        limits = httpx.Limits(
+            max_connections=self.config.max_connections,
+            max_keepalive_connections=self.config.max_keepalive_connections,
+            keepalive_expiry=self.config.keepalive_expiry
+        )
+        transport = _CountingTransport(httpx.AsyncHTTPTransport(limits=limits, http2=self.config.http2))
+        client = httpx.AsyncClient(transport=transport)
+        pooled = _PooledClient(client, transport)
+        client.event_hooks["request"].append(pooled._count_request)
+        return pooled
+
+    async def get(self, base_url: str) -> httpx.AsyncClient:
+        key = pool_key(base_url)
+        async with self._lock:
+            pooled = self._clients.get(key)
+            if pooled is None:
+                pooled = self._build()
+                self._clients[key] = pooled
+            self._clients.move_to_end(key)
+            await self._evict_idle()
+
+        pooled.checkouts += 1
+        pooled.last_used = time.time()
+        return pooled.client
+
+    async def _evict_idle(self):
+        # Bound the number of hosts we keep sockets open to; never close a client that is mid-request
+        # or was just handed out
+        for key in list(self._clients.keys())[:-1]:
+            if len(self._clients) <= self.config.max_pools:
+                break
+            pooled = self._clients[key]
+            if pooled.evictable(self.config.idle_grace):
+                del self._clients[key]
+                self.evictions += 1
+                await pooled.client.aclose()
+
+    async def close(self):
+        async with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for pooled in clients:
+            await pooled.client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "config": self.config.as_dict(),
+            "evictions": self.evictions,
+            "pools": {key: pooled.stats() for key, pooled in self._clients.items()}
+        }
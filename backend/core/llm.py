@@ -0,0 +1,177 @@
+import asyncio
+import json
+import os
+import random
+import logging
+from typing import Dict, Any, List, Optional, Callable
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "llama-3.3-70b-versatile"
+
+# HTTP statuses worth another attempt: timeouts, conflicts, rate limits and server errors
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+Messages = List[Dict[str, str]]
+
+
+class LLMError(Exception):
+    pass
+
+
+class GroqBackend:
+    # One AsyncGroq client per API key, shared by every request. The SDK's own retries are
+    # disabled so the gateway's backoff is the only retry loop.
+    def __init__(self):
+        self._clients: Dict[str, Any] = {}
+
+    def _client(self, api_key: str):
+        client = self._clients.get(api_key)
+        if client is None:
+            # Imported lazily so offline use (stub backend, CLI) works without the SDK
+            from groq import AsyncGroq
+            client = AsyncGroq(api_key=api_key, max_retries=0)
+            self._clients[api_key] = client
+        return client
+
+    async def complete(self, api_key: str, messages: Messages, model: str, temperature: float, json_mode: bool) -> str:
+        kwargs: Dict[str, Any] = {"messages": messages, "model": model, "temperature": temperature}
+        if json_mode:
+            kwargs["response_format"] = {"type": "json_object"}
+        completion = await self._client(api_key).chat.completions.create(**kwargs)
+        return completion.choices[0].message.content
+
+    async def close(self):
+        for client in self._clients.values():
+            await client.close()
+        self._clients.clear()
+
+
+class StubBackend:
+    # Offline backend for tests and demos. The responder gets the messages and json_mode and
+    # returns the completion text; the default answers "{}" for JSON prompts.
+    def __init__(self, responder: Optional[Callable[[Messages, bool], str]] = None):
+        self.responder = responder or (lambda messages, json_mode: "{}" if json_mode else "Stub reply (offline LLM backend).")
+        self.calls: List[Messages] = []
+
+    async def complete(self, api_key: str, messages: Messages, model: str, temperature: float, json_mode: bool) -> str:
+        self.calls.append(messages)
+        return self.responder(messages, json_mode)
+
+    async def close(self):
+        pass
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers is None:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, asyncio.TimeoutError):
+        return True
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    # SDK connection / timeout errors carry no status
+    name = type(error).__name__
+    return "Timeout" in name or "Connection" in name
+
+
+class LLMGateway:
+    def __init__(
+        self,
+        backend: Optional[Any] = None,
+        max_concurrency: int = 4,
+        timeout: float = 60.0,
+        retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 8.0
+    ):
+        self.backend = backend or GroqBackend()
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.calls = 0
+        self.retried = 0
+        self.failed = 0
+
+    @classmethod
+    def from_env(cls) -> "LLMGateway":
+        backend = StubBackend() if os.getenv("API_LLM_BACKEND", "groq") == "stub" else GroqBackend()
+        return cls(
+            backend=backend,
+            max_concurrency=int(os.getenv("API_LLM_MAX_CONCURRENCY", "4")),
+            timeout=float(os.getenv("API_LLM_TIMEOUT", "60")),
+            retries=int(os.getenv("API_LLM_RETRIES", "3"))
+        )
+
+    def _limit(self) -> asyncio.Semaphore:
+        # Created on first use so it binds to the running loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def _call(self, api_key: str, messages: Messages, model: str, temperature: float, json_mode: bool) -> str:
+        # Plugged-in backends may be blocking; those run on a worker thread, never on the loop
+        if asyncio.iscoroutinefunction(self.backend.complete):
+            return await self.backend.complete(api_key, messages, model, temperature, json_mode)
+        return await asyncio.to_thread(self.backend.complete, api_key, messages, model, temperature, json_mode)
+
+    async def complete(
+        self,
+        api_key: str,
+        messages: Messages,
+        model: str = DEFAULT_MODEL,
+        temperature: float = 0.1,
+        json_mode: bool = False
+    ) -> str:
+        self.calls += 1
+        attempt = 0
+        while True:
+            try:
+                async with self._limit():
+                    return await asyncio.wait_for(self._call(api_key, messages, model, temperature, json_mode), timeout=self.timeout)
+            except Exception as e:
+                if attempt >= self.retries or not _is_retryable(e):
+                    self.failed += 1
+                    raise LLMError(str(e) or type(e).__name__) from e
+                # Exponential backoff with full jitter; the server's Retry-After wins when given,
+                # but never past max_backoff so one large header cannot stall the request
+                retry_after = _retry_after(e)
+                if retry_after is not None:
+                    delay = min(self.max_backoff, max(0.0, retry_after))
+                else:
+                    delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+                attempt += 1
+                self.retried += 1
+                logger.info(f"LLM call failed ({type(e).__name__}), retry {attempt}/{self.retries} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    async def complete_json(self, api_key: str, messages: Messages, model: str = DEFAULT_MODEL, temperature: float = 0.1) -> Any:
+        content = await self.complete(api_key, messages, model, temperature, json_mode=True)
+        try:
+            return json.loads(content)
+        except json.JSONDecodeError as e:
+            raise LLMError(f"Model returned invalid JSON: {e}") from e
+
+    async def close(self):
+        await self.backend.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self.backend).__name__,
+            "max_concurrency": self.max_concurrency,
+            "calls": self.calls,
+            "retried": self.retried,
+            "failed": self.failed
+        }
@@ -0,0 +1,209 @@
+import asyncio
+import math
+import random
+import time
+import httpx
+from typing import Dict, Any, List, Optional
+from models import ApiEndpoint
+from core.runner import execute_test_step, get_operation_id
+
+
+class LatencyHistogram:
+    # HDR-style log-linear buckets: constant relative error (~precision) from 1us to hours
+    def __init__(self, precision: float = 0.01):
+        self.precision = precision
+        self._log_base = math.log(1 + precision)
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def _bucket(self, value_ms: float) -> int:
+        micros = max(value_ms * 1000.0, 1.0)
+        return int(math.log(micros) / self._log_base)
+
+    def _bucket_value(self, bucket: int) -> float:
+        # Upper edge of the bucket, back in milliseconds
+        return math.exp((bucket + 1) * self._log_base) / 1000.0
+
+    def record(self, value_ms: float):
+        b = self._bucket(value_ms)
+        self.counts[b] = self.counts.get(b, 0) + 1
+        self.count += 1
+        self.total += value_ms
+        self.min = value_ms if self.min is None else min(self.min, value_ms)
+        self.max = value_ms if self.max is None else max(self.max, value_ms)
+
+    def merge(self, other: "LatencyHistogram"):
+        for b, n in other.counts.items():
+            self.counts[b] = self.counts.get(b, 0) + n
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self.count:
+            return None
+        target = max(1, math.ceil(self.count * p / 100.0))
+        seen = 0
+        for b in sorted(self.counts):
+            seen += self.counts[b]
+            if seen >= target:
+                return min(self._bucket_value(b), self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.total / self.count if self.count else None,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "p999": self.percentile(99.9)
+        }
+
+
+class _OpStats:
+    def __init__(self, endpoint: ApiEndpoint):
+        self.endpoint = endpoint
+        self.histogram = LatencyHistogram()
+        self.errors = 0
+        self.schema_errors = 0
+        self.status_codes: Dict[int, int] = {}
+        # Phase name -> histogram (core.timing), to split server time from network time
+        self.phases: Dict[str, LatencyHistogram] = {}
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        count = self.histogram.count
+        return {
+            "endpoint": self.endpoint.path,
+            "method": self.endpoint.method,
+            "requests": count,
+            "errors": self.errors,
+            "error_rate": self.errors / count if count else 0.0,
+            "schema_errors": self.schema_errors,
+            "throughput": count / elapsed if elapsed else 0.0,
+            "status_codes": self.status_codes,
+            "latency_ms": self.histogram.summary(),
+            "phases_ms": {phase: h.summary() for phase, h in self.phases.items()}
+        }
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    endpoints: List[ApiEndpoint],
+    base_url: str,
+    variables: Dict[str, Any],
+    test_data: Dict[str, Any],
+    duration: float,
+    rate: Optional[float] = None,
+    concurrency: Optional[int] = None,
+    weights: Optional[Dict[str, float]] = None,
+    max_in_flight: int = 1000,
+    seed: Optional[int] = None,
+    validators: Optional[Any] = None
+) -> Dict[str, Any]:
+    if not endpoints:
+        raise ValueError("No endpoints selected for load test")
+    if not rate and not concurrency:
+        raise ValueError("Either rate or concurrency is required")
+    if duration <= 0:
+        raise ValueError("duration must be positive")
+    if rate is not None and rate <= 0:
+        raise ValueError("rate must be positive")
+    if concurrency is not None and concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    if max_in_flight < 1:
+        raise ValueError("max_in_flight must be at least 1")
+
+    op_ids = [get_operation_id(ep) for ep in endpoints]
+    stats = {op: _OpStats(ep) for op, ep in zip(op_ids, endpoints)}
+    mix_weights = [(weights or {}).get(op, 1.0) for op in op_ids]
+    rng = random.Random(seed)
+
+    def pick() -> int:
+        return rng.choices(range(len(endpoints)), weights=mix_weights)[0]
+
+    async def fire(i: int, intended_start: float):
+        result = await execute_test_step(client, endpoints[i], base_url, variables, test_data, validators=validators)
+        # Latency counts from the intended send time, so queueing behind a slow server is not hidden
+        latency = (time.perf_counter() - intended_start) * 1000
+        op = stats[op_ids[i]]
+        op.histogram.record(latency)
+        if not result.get("passed"):
+            op.errors += 1
+            if "schemaErrors" in result:
+                op.schema_errors += 1
+        for phase, value in (result.get("timings") or {}).items():
+            if phase not in ("reused", "total"):
+                op.phases.setdefault(phase, LatencyHistogram()).record(value)
+        status = result.get("status") or 0
+        op.status_codes[status] = op.status_codes.get(status, 0) + 1
+
+    started = time.perf_counter()
+    deadline = started + duration
+    in_flight = asyncio.Semaphore(max_in_flight)
+    tasks = set()
+
+    if rate:
+        # Open loop: request n is due at started + n / rate whether or not earlier ones returned.
+        # A slot is taken before the task exists, so max_in_flight bounds tasks as well as requests;
+        # time spent waiting for one still counts against the request's latency.
+        async def scheduled(i: int, intended: float):
+            try:
+                await fire(i, intended)
+            finally:
+                in_flight.release()
+
+        n = 0
+        while True:
+            intended = started + n / rate
+            if intended >= deadline:
+                break
+            delay = intended - time.perf_counter()
+            # Behind schedule still yields, so a high rate cannot starve the event loop
+            await asyncio.sleep(max(0.0, delay))
+            await in_flight.acquire()
+            if time.perf_counter() >= deadline:
+                # Saturated for the rest of the run: stop generating rather than overrun the duration
+                in_flight.release()
+                break
+            task = asyncio.create_task(scheduled(pick(), intended))
+            # Drop finished tasks as we go so long runs don't accumulate them
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            n += 1
+    else:
+        # Closed loop: fixed number of workers, each sends as soon as its previous call returns
+        async def worker():
+            while time.perf_counter() < deadline:
+                await fire(pick(), time.perf_counter())
+
+        tasks = {asyncio.create_task(worker()) for _ in range(concurrency)}
+
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    overall = LatencyHistogram()
+    total_errors = 0
+    for op in stats.values():
+        overall.merge(op.histogram)
+        total_errors += op.errors
+
+    return {
+        "mode": "open_loop" if rate else "closed_loop",
+        "target_rate": rate,
+        "concurrency": concurrency,
+        "duration": elapsed,
+        "requests": overall.count,
+        "errors": total_errors,
+        "error_rate": total_errors / overall.count if overall.count else 0.0,
+        "throughput": overall.count / elapsed if elapsed else 0.0,
+        "latency_ms": overall.summary(),
+        "operations": [op.report(elapsed) for op in stats.values() if op.histogram.count]
+    }
@@ -0,0 +1,290 @@
+import asyncio
+import re
+import weakref
+import logging
+import httpx
+from typing import Dict, Any, List, Optional, Set, Union
+from models import ApiEndpoint
+from core.runner import execute_test_step, get_operation_id
+from core.schema import ParsedSpec
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_VAR_RE = re.compile(r"\{\{\s*([^}\s]+)\s*\}\}")
+PATH_PARAM_RE = re.compile(r"\{([^}]+)\}")
+
+# Body values that mean "fill me in" for an id field
+PLACEHOLDER_VALUES = (None, "", "string", 0, "uuid")
+
+# Where list endpoints usually wrap their items
+LIST_WRAPPERS = ("data", "items", "results", "content", "records")
+
+JsonPath = List[Union[str, int]]
+
+
+def _search_key(var: str) -> str:
+    # "driver_id" -> "driver", "tripId" -> "trip"
+    key = var.lower()
+    for suffix in ("_id", "id", "_uuid", "uuid"):
+        if key.endswith(suffix) and len(key) > len(suffix):
+            return key[: -len(suffix)].rstrip("_")
+    return key
+
+
+def _is_id_key(key: str) -> bool:
+    key = key.lower()
+    return key.endswith("id") or key.endswith("uuid")
+
+
+def _is_placeholder(value: Any) -> bool:
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, str) and "{{" in value:
+        return True
+    return value in PLACEHOLDER_VALUES
+
+
+def needed_variables(endpoint: ApiEndpoint, body: Any) -> List[str]:
+    # Path params, {{templates}} in the body, and id fields left as placeholders ("string", 0, "")
+    needed = list(PATH_PARAM_RE.findall(endpoint.path))
+
+    def scan(obj: Any):
+        if isinstance(obj, str):
+            # Dotted references ({{create_user.id}}) come from earlier steps, not from producers
+            needed.extend(v for v in TEMPLATE_VAR_RE.findall(obj) if "." not in v)
+        elif isinstance(obj, list):
+            for v in obj:
+                scan(v)
+        elif isinstance(obj, dict):
+            for k, v in obj.items():
+                if _is_id_key(k) and _is_placeholder(v):
+                    needed.append(k)
+                scan(v)
+
+    scan(body)
+    return list(dict.fromkeys(needed))
+
+
+def fill_placeholders(body: Any, values: Dict[str, Any]) -> Any:
+    # Replaces placeholder id fields with resolved values; {{templates}} are left to the runner
+    if isinstance(body, list):
+        return [fill_placeholders(v, values) for v in body]
+    if isinstance(body, dict):
+        filled = {}
+        for k, v in body.items():
+            if _is_id_key(k) and _is_placeholder(v) and not (isinstance(v, str) and "{{" in v) and k in values:
+                filled[k] = values[k]
+            else:
+                filled[k] = fill_placeholders(v, values)
+        return filled
+    return body
+
+
+def extract_identifiers(data: Any) -> Dict[str, Any]:
+    # First scalar wins for every key, so a list response yields its first item's ids
+    found: Dict[str, Any] = {}
+
+    def scan(obj: Any):
+        if isinstance(obj, list):
+            for v in obj:
+                scan(v)
+        elif isinstance(obj, dict):
+            for k, v in obj.items():
+                if k in found:
+                    continue
+                if isinstance(v, (str, int, float, bool)):
+                    found[k] = v
+                else:
+                    scan(v)
+
+    scan(data)
+    return found
+
+
+def learn_from(endpoint: ApiEndpoint, response: Any) -> Dict[str, Any]:
+    # Ids from a successful response, plus "<resource>_id" / "<resource>Id" aliases for its "id"
+    learned = extract_identifiers(response)
+    last = endpoint.path.rstrip("/").rsplit("/", 1)[-1]
+    if last and "{" not in last:
+        singular = last[:-1] if last.endswith("s") else last
+        for key in ("id", "uuid", "_id", "userId"):
+            if learned.get(key):
+                learned[f"{singular}_id"] = learned[key]
+                learned[f"{singular}Id"] = learned[key]
+    return learned
+
+
+def value_at(data: Any, path: JsonPath) -> Any:
+    # Integer steps index lists; a key step on a list looks inside its first element
+    for step in path:
+        if isinstance(step, int):
+            if not isinstance(data, list) or step >= len(data):
+                return None
+            data = data[step]
+            continue
+        if isinstance(data, list):
+            data = data[0] if data else None
+        if not isinstance(data, dict):
+            return None
+        data = data.get(step)
+    return data
+
+
+class Producer:
+    def __init__(self, op_id: str, endpoint: ApiEndpoint, path: Optional[JsonPath], score: int):
+        self.op_id = op_id
+        self.endpoint = endpoint
+        self.path = path  # None: schema gave no hint, fall back to scanning the response
+        self.score = score
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"operationId": self.op_id, "path": self.endpoint.path, "jsonPath": self.path, "score": self.score}
+
+
+class ProducerIndex:
+    # Built once per parsed spec: variable name -> best GET list endpoint and where its id lives
+    def __init__(self, spec: ParsedSpec):
+        self.spec = spec
+        self.sources = [
+            ep for ep in spec.endpoints
+            if ep.method.upper() == "GET" and "{" not in ep.path
+        ]
+        self._by_var: Dict[str, Optional[Producer]] = {}
+        for var in self._variables():
+            self._by_var[var] = self._best(var)
+
+    def _variables(self) -> Set[str]:
+        names: Set[str] = set()
+        for ep in self.spec.endpoints:
+            names.update(PATH_PARAM_RE.findall(ep.path))
+            schema = self.spec.request_schema(ep)
+            if isinstance(schema, dict):
+                names.update(k for k in schema.get("properties", {}) if _is_id_key(k))
+        return names
+
+    def _best(self, var: str) -> Optional[Producer]:
+        key = _search_key(var)
+        best: Optional[Producer] = None
+        for ep in self.sources:
+            path = ep.path.lower().rstrip("/")
+            last = path.rsplit("/", 1)[-1]
+            op_desc = (ep.operationId or "").lower()
+            tags = [t.lower() for t in ep.tags]
+
+            if last in (key, f"{key}s", f"{key}es"):
+                score = 3
+            elif key in path:
+                score = 2
+            elif key in op_desc or any(key in t for t in tags):
+                score = 1
+            else:
+                continue
+
+            # Higher score wins; the shorter path (the base list endpoint) breaks ties
+            if best is None or (score, -len(ep.path)) > (best.score, -len(best.endpoint.path)):
+                best = Producer(get_operation_id(ep), ep, self._id_path(ep, var, key), score)
+        return best
+
+    def _id_path(self, ep: ApiEndpoint, var: str, key: str) -> Optional[JsonPath]:
+        schema = self.spec.response_schema(ep, 200)
+        if not isinstance(schema, dict):
+            return None
+
+        prefix: JsonPath = []
+        if schema.get("type") == "array" or "items" in schema:
+            prefix, schema = [0], schema.get("items", {})
+        else:
+            props = schema.get("properties", {})
+            for wrapper in LIST_WRAPPERS:
+                inner = props.get(wrapper)
+                if isinstance(inner, dict) and inner.get("type") == "array":
+                    prefix, schema = [wrapper, 0], inner.get("items", {})
+                    break
+
+        props = schema.get("properties", {}) if isinstance(schema, dict) else {}
+        for candidate in (var, f"{key}_id", f"{key}Id", "id", "uuid", "_id"):
+            if candidate in props:
+                return prefix + [candidate]
+        ids = [k for k in props if _is_id_key(k)]
+        return prefix + [ids[0]] if ids else None
+
+    def producer_for(self, var: str) -> Optional[Producer]:
+        if var not in self._by_var:
+            # Not mentioned by the spec (e.g. a {{template}} from AI data): index it on first use
+            self._by_var[var] = self._best(var)
+        return self._by_var[var]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {var: p.as_dict() for var, p in self._by_var.items() if p is not None}
+
+
+_indexes: "weakref.WeakKeyDictionary[ParsedSpec, ProducerIndex]" = weakref.WeakKeyDictionary()
+
+
+def producer_index(spec: ParsedSpec) -> ProducerIndex:
+    index = _indexes.get(spec)
+    if index is None:
+        index = ProducerIndex(spec)
+        _indexes[spec] = index
+    return index
+
+
+class RunResolver:
+    # Per-run: each producer is fetched at most once, concurrent steps share the in-flight fetch
+    def __init__(self, index: ProducerIndex):
+        self.index = index
+        self._fetches: Dict[str, "asyncio.Task[Dict[str, Any]]"] = {}
+        self.fetched = 0
+
+    async def _fetch(self, producer: Producer, client: httpx.AsyncClient, base_url: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+        self.fetched += 1
+        result = await execute_test_step(client, producer.endpoint, base_url, variables, {})
+        if not result.get("passed"):
+            logger.info(f"Producer {producer.op_id} failed with status {result.get('status')}")
+            return {}
+        return result
+
+    async def resolve(
+        self,
+        names: List[str],
+        client: httpx.AsyncClient,
+        base_url: str,
+        variables: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        learned: Dict[str, Any] = {}
+        for var in names:
+            if variables.get(var) or learned.get(var):
+                continue
+            producer = self.index.producer_for(var)
+            if producer is None:
+                # Nothing in the spec produces it; a generic id learned earlier is the best guess
+                fallback = variables.get("id") or variables.get("uuid")
+                if fallback:
+                    learned[var] = fallback
+                continue
+
+            task = self._fetches.get(producer.op_id)
+            if task is None:
+                task = asyncio.create_task(self._fetch(producer, client, base_url, variables))
+                self._fetches[producer.op_id] = task
+            result = await task
+            response = result.get("response")
+            if response is None:
+                continue
+
+            value = value_at(response, producer.path) if producer.path else None
+            if value is None:
+                # No schema hint (or it was wrong): exact key, then "id", then any id-like key
+                found = extract_identifiers(response)
+                value = found.get(var) or found.get("id")
+                if value is None:
+                    value = next((v for k, v in found.items() if _is_id_key(k) and k != var), None)
+            if value is None:
+                value = variables.get("id") or variables.get("uuid")
+            if value is not None:
+                learned[var] = value
+        return learned
+
+    def cancel(self):
+        for task in self._fetches.values():
+            task.cancel()
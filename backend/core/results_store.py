@@ -0,0 +1,411 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS runs ("
+    " run_id TEXT PRIMARY KEY, source TEXT, base_url TEXT, spec_url TEXT,"
+    " started_at REAL NOT NULL, finished_at REAL NOT NULL, total INTEGER NOT NULL,"
+    " passed INTEGER NOT NULL, failed INTEGER NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS runs_started ON runs (started_at)",
+    "CREATE TABLE IF NOT EXISTS steps ("
+    " id INTEGER PRIMARY KEY, run_id TEXT NOT NULL, ts REAL NOT NULL, operation_id TEXT NOT NULL,"
+    " method TEXT, endpoint TEXT, status INTEGER, passed INTEGER NOT NULL, time_ms REAL,"
+    " response_bytes INTEGER, error TEXT, request_bytes INTEGER, timings TEXT)",
+    # Time series and rollups scan one operation over a time range
+    "CREATE INDEX IF NOT EXISTS steps_op_ts ON steps (operation_id, ts)",
+    "CREATE INDEX IF NOT EXISTS steps_run ON steps (run_id)",
+    # Latency baselines per target and operation (core.baselines)
+    "CREATE TABLE IF NOT EXISTS baselines ("
+    " base_url TEXT NOT NULL, operation_id TEXT NOT NULL, captured_at REAL NOT NULL, data TEXT NOT NULL,"
+    " PRIMARY KEY (base_url, operation_id))",
+]
+
+# Columns added after the first release; applied to existing databases on open
+MIGRATIONS = {
+    "request_bytes": "ALTER TABLE steps ADD COLUMN request_bytes INTEGER",
+    "timings": "ALTER TABLE steps ADD COLUMN timings TEXT",
+}
+
+MAX_OPEN_RUNS = 1024
+
+RUN_COLUMNS = "run_id, source, base_url, spec_url, started_at, finished_at, total, passed, failed"
+RUN_KEYS = ["runId", "source", "baseUrl", "specUrl", "startedAt", "finishedAt", "total", "passed", "failed"]
+
+
+def percentile(sorted_values: List[float], p: float) -> Optional[float]:
+    # Nearest-rank on an already sorted list
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, int(round(p / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def _summary(times: List[float]) -> Dict[str, Any]:
+    times = sorted(times)
+    return {
+        "count": len(times),
+        "mean": sum(times) / len(times) if times else None,
+        "p50": percentile(times, 50),
+        "p90": percentile(times, 90),
+        "p99": percentile(times, 99),
+        "max": times[-1] if times else None
+    }
+
+
+def _response_bytes(result: Dict[str, Any]) -> Optional[int]:
+    size = result.get("responseBytes")
+    if size is not None:
+        return size
+    response = result.get("response")
+    if response is None:
+        return None
+    return len(response.encode()) if isinstance(response, str) else len(json.dumps(response, default=str))
+
+
+class _OpenRun:
+    def __init__(self, run_id: str, source: Optional[str], base_url: Optional[str], spec_url: Optional[str]):
+        self.run_id = run_id
+        self.source = source
+        self.base_url = base_url
+        self.spec_url = spec_url
+        self.started_at = time.time()
+        self.finished_at = self.started_at
+        self.passed = 0
+        self.failed = 0
+
+
+class ResultsStore:
+    # Embedded history of every run and step. record() only appends to an in-memory buffer;
+    # a background thread writes batches (one transaction each), so runs never wait on disk.
+    def __init__(self, path: str, flush_interval: float = 1.0, batch_size: int = 500):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.recorded = 0
+        self.written = 0
+        self.flushes = 0
+        self._buffer: List[tuple] = []
+        self._runs: "OrderedDict[str, _OpenRun]" = OrderedDict()
+        self._dirty_runs: Dict[str, _OpenRun] = {}
+        # Run totals taken by flush() and not yet committed (see _reopen)
+        self._writing_runs: Dict[str, _OpenRun] = {}
+        # base_url -> {operation_id: baseline}; loaded once, replaced on capture
+        self._baselines: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        for statement in SCHEMA:
+            self._db.execute(statement)
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(steps)")}
+        for column, statement in MIGRATIONS.items():
+            if column not in columns:
+                self._db.execute(statement)
+        self._db.commit()
+        self._thread = threading.Thread(target=self._flusher, name="results-store", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_env(cls) -> Optional["ResultsStore"]:
+        path = os.getenv("API_RESULTS_DB", "results.sqlite3")
+        if path in ("", "off"):
+            return None
+        return cls(path, flush_interval=float(os.getenv("API_RESULTS_FLUSH_INTERVAL", "1.0")))
+
+    # --- Recording (hot path: no I/O) ---
+
+    def start_run(self, run_id: Optional[str] = None, source: Optional[str] = None,
+                  base_url: Optional[str] = None, spec_url: Optional[str] = None) -> str:
+        run_id = run_id or uuid.uuid4().hex
+        with self._lock:
+            if run_id not in self._runs:
+                run = self._open(run_id)
+                run.source = run.source or source
+                run.base_url = run.base_url or base_url
+                run.spec_url = run.spec_url or spec_url
+            self._runs.move_to_end(run_id)
+        return run_id
+
+    def finish_run(self, run_id: str):
+        # The run is complete: leave the open set (its totals are already queued for writing).
+        # Later steps under the same id still continue from the stored totals.
+        with self._lock:
+            self._runs.pop(run_id, None)
+
+    def _open(self, run_id: str) -> _OpenRun:
+        # Caller holds self._lock. A run that is not open (finished, evicted past MAX_OPEN_RUNS,
+        # or recorded before a restart) continues from its pending or stored totals; starting
+        # from zero would overwrite them on the next INSERT OR REPLACE
+        run = self._dirty_runs.get(run_id) or self._writing_runs.get(run_id)
+        if run is None:
+            run = _OpenRun(run_id, None, None, None)
+            with self._db_lock:
+                row = self._db.execute(f"SELECT {RUN_COLUMNS} FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+            if row is not None:
+                stored = dict(zip(RUN_KEYS, row))
+                run.source, run.base_url, run.spec_url = stored["source"], stored["baseUrl"], stored["specUrl"]
+                run.started_at, run.finished_at = stored["startedAt"], stored["finishedAt"]
+                run.passed, run.failed = stored["passed"], stored["failed"]
+        self._runs[run_id] = run
+        while len(self._runs) > MAX_OPEN_RUNS:
+            self._runs.popitem(last=False)
+        return run
+
+    def record(self, run_id: str, result: Dict[str, Any]):
+        now = time.time()
+        with self._lock:
+            run = self._runs.get(run_id)
+            if run is None:
+                # Steps from clients that never started a run explicitly (per-step UI calls)
+                run = self._open(run_id)
+            run.finished_at = now
+            if result.get("passed"):
+                run.passed += 1
+            else:
+                run.failed += 1
+            self._dirty_runs[run_id] = run
+            # Result dicts are kept as-is; sizing and serialization happen on the flusher thread
+            self._buffer.append((run_id, now, result))
+            self.recorded += 1
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    # --- Writing (background thread) ---
+
+    def _flusher(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Results store flush failed: {e}")
+
+    def flush(self):
+        with self._lock:
+            buffer, self._buffer = self._buffer, []
+            runs = [
+                (r.run_id, r.source, r.base_url, r.spec_url, r.started_at, r.finished_at, r.passed + r.failed, r.passed, r.failed)
+                for r in self._dirty_runs.values()
+            ]
+            self._writing_runs, self._dirty_runs = self._dirty_runs, {}
+        if not buffer and not runs:
+            return
+        rows = [
+            (
+                run_id, ts, result.get("operationId") or f"{result.get('method')}_{result.get('endpoint')}",
+                result.get("method"), result.get("endpoint"), result.get("status"), 1 if result.get("passed") else 0,
+                result.get("time"), _response_bytes(result), result.get("error"), result.get("requestBytes"),
+                json.dumps(result["timings"]) if result.get("timings") else None
+            )
+            for run_id, ts, result in buffer
+        ]
+        with self._db_lock:
+            self._db.executemany(
+                "INSERT INTO steps (run_id, ts, operation_id, method, endpoint, status, passed, time_ms, response_bytes, error,"
+                " request_bytes, timings) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self._db.executemany(f"INSERT OR REPLACE INTO runs ({RUN_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", runs)
+            self._db.commit()
+            self.written += len(rows)
+            self.flushes += 1
+        with self._lock:
+            self._writing_runs = {}
+
+    def close(self):
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout=5)
+        self.flush()
+        with self._db_lock:
+            self._db.close()
+
+    # --- Queries ---
+
+    def _query(self, sql: str, params: tuple = ()) -> List[tuple]:
+        # Reads see everything recorded so far
+        self.flush()
+        with self._db_lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def runs(self, limit: int = 50) -> List[Dict[str, Any]]:
+        rows = self._query(f"SELECT {RUN_COLUMNS} FROM runs ORDER BY started_at DESC LIMIT ?", (limit,))
+        return [dict(zip(RUN_KEYS, row)) for row in rows]
+
+    def run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        found = self._query(f"SELECT {RUN_COLUMNS} FROM runs WHERE run_id = ?", (run_id,))
+        if not found:
+            return None
+        rows = self._query(
+            "SELECT ts, operation_id, method, endpoint, status, passed, time_ms, response_bytes, error, request_bytes, timings"
+            " FROM steps WHERE run_id = ? ORDER BY id", (run_id,)
+        )
+        keys = ["ts", "operationId", "method", "endpoint", "status", "passed", "time", "responseBytes", "error", "requestBytes"]
+        run = dict(zip(RUN_KEYS, found[0]))
+        run["steps"] = [
+            {**dict(zip(keys, row)), "passed": bool(row[5]), "timings": json.loads(row[10]) if row[10] else None}
+            for row in rows
+        ]
+        return run
+
+    def series(self, operation_id: str, since: Optional[float] = None, limit: int = 1000) -> List[Dict[str, Any]]:
+        rows = self._query(
+            "SELECT ts, run_id, status, passed, time_ms, response_bytes, request_bytes, timings FROM steps"
+            " WHERE operation_id = ? AND ts >= ? ORDER BY ts DESC LIMIT ?",
+            (operation_id, since or 0.0, limit)
+        )
+        keys = ["ts", "runId", "status", "passed", "time", "responseBytes", "requestBytes"]
+        return [
+            {**dict(zip(keys, row)), "passed": bool(row[3]), "timings": json.loads(row[7]) if row[7] else None}
+            for row in reversed(rows)
+        ]
+
+    def rollup(self, since: Optional[float] = None, until: Optional[float] = None,
+               operation_id: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        # Per-operation latency percentiles (successful steps) and error rate over a time range
+        sql = "SELECT operation_id, passed, time_ms, response_bytes, request_bytes, timings FROM steps WHERE ts >= ? AND ts < ?"
+        params: tuple = (since or 0.0, until or time.time() + 1)
+        if operation_id:
+            sql += " AND operation_id = ?"
+            params += (operation_id,)
+        ops: Dict[str, Dict[str, Any]] = {}
+        for op, passed, time_ms, size, request_size, timings in self._query(sql, params):
+            entry = ops.setdefault(op, {"times": [], "errors": 0, "bytes": 0, "sized": 0, "sent": 0, "sent_n": 0, "phases": {}})
+            if passed and time_ms is not None:
+                entry["times"].append(time_ms)
+                if timings:
+                    for phase, value in json.loads(timings).items():
+                        if phase not in ("reused", "total"):
+                            entry["phases"].setdefault(phase, []).append(value)
+            if not passed:
+                entry["errors"] += 1
+            if size is not None:
+                entry["bytes"] += size
+                entry["sized"] += 1
+            if request_size is not None:
+                entry["sent"] += request_size
+                entry["sent_n"] += 1
+        out = {}
+        for op, entry in ops.items():
+            total = len(entry["times"]) + entry["errors"]
+            out[op] = {
+                "latency_ms": _summary(entry["times"]),
+                "requests": total,
+                "error_rate": entry["errors"] / total if total else 0.0,
+                "mean_response_bytes": entry["bytes"] / entry["sized"] if entry["sized"] else None,
+                "mean_request_bytes": entry["sent"] / entry["sent_n"] if entry["sent_n"] else None,
+                # Where the time goes: server (ttfb) vs network (connect, tls, download)
+                "phases_ms": {phase: _summary(values) for phase, values in entry["phases"].items()}
+            }
+        return out
+
+    def regressions(self, window: float = 86400.0, baseline: float = 7 * 86400.0, threshold: float = 1.5,
+                    min_samples: int = 5, metric: str = "p50") -> List[Dict[str, Any]]:
+        # Recent window vs the baseline period just before it, per operation
+        now = time.time()
+        recent = self.rollup(since=now - window, until=now + 1)
+        before = self.rollup(since=now - window - baseline, until=now - window)
+        found = []
+        for op, stats in recent.items():
+            base = before.get(op)
+            if base is None:
+                continue
+            current, reference = stats["latency_ms"], base["latency_ms"]
+            if current["count"] < min_samples or reference["count"] < min_samples:
+                continue
+            if not reference[metric] or current[metric] is None:
+                continue
+            ratio = current[metric] / reference[metric]
+            error_delta = stats["error_rate"] - base["error_rate"]
+            if ratio >= threshold or error_delta >= 0.1:
+                found.append({
+                    "operationId": op,
+                    "metric": metric,
+                    "baseline": reference[metric],
+                    "current": current[metric],
+                    "ratio": ratio,
+                    "baselineErrorRate": base["error_rate"],
+                    "errorRate": stats["error_rate"],
+                    "samples": {"baseline": reference["count"], "current": current["count"]}
+                })
+        return sorted(found, key=lambda r: r["ratio"], reverse=True)
+
+    # --- Baselines ---
+
+    def latency_samples(self, base_url: str, runs: int, warmup: int = 0,
+                        operation_ids: Optional[List[str]] = None) -> Dict[str, List[float]]:
+        # Successful step latencies from the latest `runs` runs against base_url, oldest first.
+        # The oldest `warmup` of those runs are the capture's cold passes (new connections,
+        # empty caches) and are dropped, so runs - warmup runs contribute samples.
+        rows = self._query(
+            "SELECT run_id FROM runs WHERE base_url = ? ORDER BY started_at DESC LIMIT ?", (base_url, runs)
+        )
+        run_ids = [r[0] for r in rows][:max(0, len(rows) - warmup)]
+        if not run_ids:
+            return {}
+        marks = ",".join("?" * len(run_ids))
+        sql = f"SELECT operation_id, time_ms FROM steps WHERE passed = 1 AND run_id IN ({marks})"
+        params = tuple(run_ids)
+        if operation_ids:
+            sql += f" AND operation_id IN ({','.join('?' * len(operation_ids))})"
+            params += tuple(operation_ids)
+        samples: Dict[str, List[float]] = {}
+        for op, time_ms in self._query(sql + " ORDER BY ts", params):
+            if time_ms is not None:
+                samples.setdefault(op, []).append(time_ms)
+        return samples
+
+    def save_baselines(self, base_url: str, baselines: Dict[str, Dict[str, Any]]):
+        now = time.time()
+        rows = [(base_url, op, now, json.dumps(b)) for op, b in baselines.items()]
+        with self._db_lock:
+            self._db.executemany("INSERT OR REPLACE INTO baselines (base_url, operation_id, captured_at, data) VALUES (?, ?, ?, ?)", rows)
+            self._db.commit()
+        self._baselines.pop(base_url, None)
+
+    def baselines(self, base_url: str) -> Dict[str, Dict[str, Any]]:
+        cached = self._baselines.get(base_url)
+        if cached is None:
+            with self._db_lock:
+                rows = self._db.execute(
+                    "SELECT operation_id, captured_at, data FROM baselines WHERE base_url = ?", (base_url,)
+                ).fetchall()
+            cached = {op: {**json.loads(data), "capturedAt": captured_at} for op, captured_at, data in rows}
+            self._baselines[base_url] = cached
+        return cached
+
+    def delete_baselines(self, base_url: str, operation_ids: Optional[List[str]] = None) -> int:
+        sql, params = "DELETE FROM baselines WHERE base_url = ?", (base_url,)
+        if operation_ids:
+            sql += f" AND operation_id IN ({','.join('?' * len(operation_ids))})"
+            params += tuple(operation_ids)
+        with self._db_lock:
+            count = self._db.execute(sql, params).rowcount
+            self._db.commit()
+        self._baselines.pop(base_url, None)
+        return count
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = len(self._buffer)
+        return {
+            "path": self.path,
+            "recorded": self.recorded,
+            "written": self.written,
+            "pending": pending,
+            "flushes": self.flushes,
+            "open_runs": len(self._runs)
+        }
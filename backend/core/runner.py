@@ -1,45 +1,43 @@
 import httpx
 import time
-from typing import Dict, Any, List
+from collections import ChainMap
+from typing import Dict, Any, List, Mapping, Optional
 from models import ApiEndpoint
+from core.templates import render, render_value
+from core.timing import RequestTrace
+
+def get_operation_id(endpoint: ApiEndpoint) -> str:
+    return endpoint.operationId or f"{endpoint.method}_{endpoint.path}"
 
 async def execute_test_step(
     client: httpx.AsyncClient, 
     endpoint: ApiEndpoint, 
     base_url: str, 
     variables: Dict[str, Any],
-    test_data: Dict[str, Any]
+    test_data: Dict[str, Any],
+    scope: Optional[Mapping[str, Any]] = None,
+    validators: Optional[Any] = None
 ) -> Dict[str, Any]:
     
     # 0. Get specific data for this endpoint
-    op_id = endpoint.operationId or f"{endpoint.method}_{endpoint.path}"
+    op_id = get_operation_id(endpoint)
     op_data = test_data.get(op_id, {})
     
     # 1. Substitute Variables in URL
     # Context includes global variables, global test data, and this operation's specific parameters
-    context = {**variables, **test_data, **op_data.get("parameters", {})}
+    # A caller holding a long-lived context (run sessions) passes it as a prebuilt scope, layered
+    # the same way, so large contexts are not copied on every step
+    params = op_data.get("parameters", {})
+    if scope is not None:
+        context = ChainMap(params, scope) if params else scope
+    else:
+        context = {**variables, **test_data, **params}
     
-    def replace_placeholders(text: str, ctx: Dict[str, Any]) -> str:
-        # Sort keys by length descending to avoid partial matches
-        for k in sorted(ctx.keys(), key=len, reverse=True):
-            v = ctx[k]
-            # Handle string/int values
-            if isinstance(v, (str, int, float, bool)):
-                text = text.replace(f"{{{{{k}}}}}", str(v))
-                text = text.replace(f"{{{k}}}", str(v))
-            # Handle nested objects (rudimentary)
-            elif isinstance(v, dict):
-                for sub_k, sub_v in v.items():
-                    if isinstance(sub_v, (str, int, float, bool)):
-                        text = text.replace(f"{{{{{k}.{sub_k}}}}}", str(sub_v))
-                        text = text.replace(f"{{{k}.{sub_k}}}", str(sub_v))
-        return text
-
     # Normalize URL segments
     base = base_url.rstrip("/")
     path = endpoint.path.lstrip("/")
     url = f"{base}/{path}"
-    url = replace_placeholders(url, context)
+    url = render(url, context)
     
     # Also replace path parameters explicitly defined in Swagger if missing from placeholder logic
     if endpoint.parameters:
@@ -53,29 +51,14 @@ async def execute_test_step(
     # 2. Prepare Body
     body = op_data.get("body")
     if body and endpoint.method in ["POST", "PUT", "PATCH"]:
-        def resolve_body_placeholders(obj):
-            if isinstance(obj, str):
-                # 1. Check if it's a DIRECT replacement (e.g. "{{id}}" or "{id}")
-                # This preserves types (ints, bools) which is critical for parsing
-                stripped = obj.strip()
-                if (stripped.startswith("{{") and stripped.endswith("}}")) or (stripped.startswith("{") and stripped.endswith("}")):
-                    key = stripped.strip("{}")
-                    if key in context:
-                        return context[key]
-                
-                # 2. General string replacement for templates
-                return replace_placeholders(obj, context)
-            
-            elif isinstance(obj, dict):
-                return {k: resolve_body_placeholders(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [resolve_body_placeholders(i) for i in obj]
-            return obj
-
-        body = resolve_body_placeholders(body)
+        # Direct "{{id}}" values keep their type (ints, bools), which is critical for parsing
+        body = render_value(body, context)
     
     # 3. Request
-    start_time = time.time()
+    # Monotonic clock: wall-clock adjustments (NTP) must not show up as latency
+    start_time = time.perf_counter()
+    # Per-phase breakdown (connect, TLS, TTFB, download) from the transport's trace events
+    trace = RequestTrace()
     
     # Merge headers
     req_headers = variables.get("headers", {})
@@ -88,21 +71,28 @@ async def execute_test_step(
             url=url,
             json=body,
             headers=req_headers,
-            timeout=10.0
+            timeout=10.0,
+            extensions={"trace": trace}
         )
         
-        duration = (time.time() - start_time) * 1000
+        finished = time.perf_counter()
+        duration = (finished - start_time) * 1000
         
         # Safe JSON extraction
         resp_data = None
+        is_json = False
         if "application/json" in response.headers.get("content-type", "").lower():
             try:
                 resp_data = response.json()
+                is_json = True
             except:
                 resp_data = response.text
         else:
             resp_data = response.text
 
+        # Validated as parsed: an empty list or object is a real body, not "No Data"
+        parsed = resp_data
+
         # If data is empty string or None, explicitly return "No Data"
         if not resp_data and resp_data != 0 and resp_data != False:
              resp_data = "No Data"
@@ -116,18 +106,26 @@ async def execute_test_step(
             if resp_data.get("success") is False or resp_data.get("error") is True:
                 passed = False
 
-        return {
+        result = {
+            "operationId": op_id,
             "endpoint": endpoint.path,
             "method": endpoint.method,
             "status": response.status_code,
             "time": duration,
             "passed": passed,
             "response": resp_data,
-            "url": url # for debugging
+            "url": url, # for debugging
+            # Body bytes as sent, and as received on the wire (before decompression)
+            "requestBytes": len(response.request.content),
+            "responseBytes": response.num_bytes_downloaded
         }
+        timings = trace.timings(finished)
+        if timings is not None:
+            result["timings"] = timings
 
     except Exception as e:
-        return {
+        result = {
+            "operationId": op_id,
             "endpoint": endpoint.path,
             "method": endpoint.method,
             "status": 0,
@@ -136,3 +134,22 @@ async def execute_test_step(
             "error": str(e),
             "url": url
         }
+        # Shows where a timeout or reset happened (e.g. stuck in connect vs waiting on the server)
+        timings = trace.timings()
+        if timings is not None:
+            result["timings"] = timings
+        return result
+
+    # Contract check against the declared response schema (core.validation.ResponseValidators).
+    # Outside the transport try: a validator problem is reported as such, never as status 0.
+    if validators is not None and is_json:
+        try:
+            schema_errors = validators.validate(endpoint, response.status_code, parsed)
+        except Exception as e:
+            result["validationError"] = f"Schema check skipped: {e}"
+            schema_errors = None
+        if schema_errors:
+            result["passed"] = False
+            result["schemaErrors"] = schema_errors
+            result["error"] = f"Response does not match the declared schema ({len(schema_errors)} errors)"
+    return result
@@ -0,0 +1,248 @@
+import asyncio
+import re
+import httpx
+from typing import Dict, Any, List, Set, Optional, Callable, Awaitable
+from models import ApiEndpoint
+from core.runner import execute_test_step, get_operation_id
+
+# Matches {{name}}, {name} and dotted forms like {{create_user.id}}; group 1 is the root name
+PLACEHOLDER_RE = re.compile(r"\{\{?\s*([A-Za-z0-9_\-]+)(?:\.[A-Za-z0-9_\-]+)*\s*\}?\}")
+PATH_PARAM_RE = re.compile(r"\{([^}]+)\}")
+
+OnResult = Callable[[int, Dict[str, Any]], Awaitable[None]]
+
+
+def _collect_placeholders(obj: Any, found: Set[str]):
+    if isinstance(obj, str):
+        found.update(PLACEHOLDER_RE.findall(obj))
+    elif isinstance(obj, dict):
+        for v in obj.values():
+            _collect_placeholders(v, found)
+    elif isinstance(obj, list):
+        for v in obj:
+            _collect_placeholders(v, found)
+
+
+def _collection(path: str) -> str:
+    # "/api/trips/{trip_id}/assign-driver/{driver_id}" -> "/api/trips"
+    return path.split("{")[0].rstrip("/")
+
+
+def _resource_name(param: str) -> str:
+    # "driver_id" -> "driver", "tripId" -> "trip"
+    name = param.lower()
+    for suffix in ("_id", "id"):
+        if name.endswith(suffix) and len(name) > len(suffix):
+            return name[: -len(suffix)].rstrip("_")
+    return name
+
+
+def _singular(segment: str) -> str:
+    return segment[:-1] if segment.endswith("s") else segment
+
+
+def _find_producer(endpoints: List[ApiEndpoint], consumer: ApiEndpoint, param: str) -> Optional[int]:
+    # Creators are POSTs on a plain collection path (no path params of their own)
+    creators = [
+        (i, ep) for i, ep in enumerate(endpoints)
+        if ep.method.upper() == "POST" and "{" not in ep.path and ep is not consumer
+    ]
+
+    # 1. The collection the parameter lives under, e.g. POST /api/drivers/ for /api/drivers/{driver_id}
+    marker = f"{{{param}}}"
+    idx = consumer.path.find(marker)
+    if idx > 0:
+        owner = consumer.path[:idx].rstrip("/")
+        for i, ep in creators:
+            if ep.path.rstrip("/") == owner:
+                return i
+
+    # 2. Name match on the last segment: driver_id -> .../drivers
+    resource = _resource_name(param)
+    if resource == param.lower():
+        return None
+    for i, ep in creators:
+        segments = [s for s in ep.path.lower().split("/") if s]
+        if segments and _singular(segments[-1]).replace("-", "_") == resource:
+            return i
+    return None
+
+
+def build_dependency_graph(
+    endpoints: List[ApiEndpoint],
+    test_data: Dict[str, Any]
+) -> Dict[str, Any]:
+    op_ids = [get_operation_id(ep) for ep in endpoints]
+    index_by_op = {op: i for i, op in enumerate(op_ids)}
+
+    deps: List[Set[int]] = [set() for _ in endpoints]
+    # Per node: path param name -> producing node, used to map a producer's "id" onto the param
+    bindings: List[Dict[str, int]] = [{} for _ in endpoints]
+
+    for i, ep in enumerate(endpoints):
+        # 1. Explicit references to other operations in this step's test data ({{create_user.id}})
+        refs: Set[str] = set()
+        _collect_placeholders(test_data.get(op_ids[i], {}), refs)
+        for ref in refs:
+            j = index_by_op.get(ref)
+            if j is not None and j != i:
+                deps[i].add(j)
+
+        # 2. Path params that some other operation has to create first
+        for param in PATH_PARAM_RE.findall(ep.path):
+            j = _find_producer(endpoints, ep, param)
+            if j is not None:
+                deps[i].add(j)
+                bindings[i][param] = j
+
+    # 3. Deletes wait for every other consumer of the same collection
+    for i, ep in enumerate(endpoints):
+        if ep.method.upper() != "DELETE" or "{" not in ep.path:
+            continue
+        coll = _collection(ep.path)
+        for j, other in enumerate(endpoints):
+            if j != i and other.method.upper() != "DELETE" and "{" in other.path and _collection(other.path) == coll:
+                deps[i].add(j)
+
+    # Cycles can come from AI data referencing later steps; fall back to list order for those
+    if _has_cycle(deps):
+        for i in range(len(deps)):
+            deps[i] = {j for j in deps[i] if j < i}
+            bindings[i] = {p: j for p, j in bindings[i].items() if j < i}
+
+    return {"op_ids": op_ids, "deps": deps, "bindings": bindings}
+
+
+def _has_cycle(deps: List[Set[int]]) -> bool:
+    # Kahn's algorithm: anything left unvisited sits on a cycle
+    indegree = [len(d) for d in deps]
+    dependents: List[List[int]] = [[] for _ in deps]
+    for i, d in enumerate(deps):
+        for j in d:
+            dependents[j].append(i)
+
+    ready = [i for i, n in enumerate(indegree) if n == 0]
+    visited = 0
+    while ready:
+        node = ready.pop()
+        visited += 1
+        for k in dependents[node]:
+            indegree[k] -= 1
+            if indegree[k] == 0:
+                ready.append(k)
+    return visited != len(deps)
+
+
+def select_affected(
+    endpoints: List[ApiEndpoint],
+    test_data: Dict[str, Any],
+    op_ids: Set[str]
+) -> List[int]:
+    # Changed operations, everything downstream of them, and the upstream steps those need
+    # to get their ids and learned values. Returned in the original order.
+    graph = build_dependency_graph(endpoints, test_data)
+    deps = graph["deps"]
+    dependents: List[Set[int]] = [set() for _ in deps]
+    for i, d in enumerate(deps):
+        for j in d:
+            dependents[j].add(i)
+
+    def closure(seeds: Set[int], edges: List[Set[int]]) -> Set[int]:
+        seen, stack = set(seeds), list(seeds)
+        while stack:
+            for k in edges[stack.pop()]:
+                if k not in seen:
+                    seen.add(k)
+                    stack.append(k)
+        return seen
+
+    seeds = {i for i, op in enumerate(graph["op_ids"]) if op in op_ids}
+    downstream = closure(seeds, dependents)
+    return sorted(closure(downstream, deps))
+
+
+def _learned_from(op_id: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    # Only successful responses feed later steps
+    resp = result.get("response")
+    if not result.get("passed") or not isinstance(resp, dict):
+        return {}
+    learned = {k: v for k, v in resp.items() if isinstance(v, (str, int, float, bool))}
+    learned[op_id] = resp
+    return learned
+
+
+async def run_dag(
+    client: httpx.AsyncClient,
+    endpoints: List[ApiEndpoint],
+    base_url: str,
+    variables: Dict[str, Any],
+    test_data: Dict[str, Any],
+    max_concurrency: int = 8,
+    on_result: Optional[OnResult] = None,
+    validators: Optional[Any] = None
+) -> List[Dict[str, Any]]:
+    graph = build_dependency_graph(endpoints, test_data)
+    op_ids, deps, bindings = graph["op_ids"], graph["deps"], graph["bindings"]
+
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    results: List[Optional[Dict[str, Any]]] = [None] * len(endpoints)
+    learned: List[Dict[str, Any]] = [{} for _ in endpoints]
+    tasks: List[asyncio.Task] = []
+
+    async def run_node(i: int):
+        # Wait for producers first, outside the semaphore so waiting steps don't hold a slot
+        if deps[i]:
+            await asyncio.gather(*(tasks[j] for j in deps[i]))
+
+        # Merge producer outputs in list order so the context is deterministic; variables the
+        # caller set explicitly always win over fields learned from responses
+        ctx: Dict[str, Any] = {}
+        for j in sorted(deps[i]):
+            ctx.update(learned[j])
+        for param, j in bindings[i].items():
+            produced = learned[j]
+            if param not in produced and "id" in produced:
+                ctx[param] = produced["id"]
+        ctx.update(variables)
+        # Test data is layered over the context, so a producer's own request entry would hide its
+        # response from {{create_user.id}} references; the step does not need the former
+        step_data = test_data
+        shadowed = {op_ids[j] for j in deps[i]} & test_data.keys()
+        if shadowed:
+            step_data = {k: v for k, v in test_data.items() if k not in shadowed}
+
+        async with semaphore:
+            result = await execute_test_step(client, endpoints[i], base_url, ctx, step_data, validators=validators)
+
+        results[i] = result
+        learned[i] = _learned_from(op_ids[i], result)
+        if on_result:
+            await on_result(i, result)
+
+    tasks.extend(asyncio.create_task(run_node(i)) for i in range(len(endpoints)))
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for t in tasks:
+            t.cancel()
+
+    return results
+
+
+async def run_sequential(
+    client: httpx.AsyncClient,
+    endpoints: List[ApiEndpoint],
+    base_url: str,
+    variables: Dict[str, Any],
+    test_data: Dict[str, Any],
+    on_result: Optional[OnResult] = None,
+    validators: Optional[Any] = None
+) -> List[Dict[str, Any]]:
+    results = []
+    for i, endpoint in enumerate(endpoints):
+        result = await execute_test_step(client, endpoint, base_url, variables, test_data, validators=validators)
+        results.append(result)
+        # Continue on failure: every API gets its own pass/fail indicator
+        if on_result:
+            await on_result(i, result)
+    return results
@@ -0,0 +1,199 @@
+import hashlib
+import json
+from typing import Dict, Any, List, Optional
+from models import ApiEndpoint
+from core.runner import get_operation_id
+
+JSON_CONTENT_TYPES = ["application/json", "application/*+json", "*/*"]
+
+# Documentation-only keys; editing them does not change an operation's contract
+CONTRACT_NOISE = {"description", "summary", "example", "examples", "externalDocs"}
+
+
+def _unescape(token: str) -> str:
+    # JSON pointer escaping: ~1 is "/", ~0 is "~"
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def _canonical(obj: Any, names: bool = False) -> Any:
+    # names=True: keys are user-defined property names (a property may be called "description")
+    if isinstance(obj, dict):
+        return {
+            k: _canonical(v, names=(k == "properties" and not names))
+            for k, v in obj.items()
+            if names or k not in CONTRACT_NOISE
+        }
+    if isinstance(obj, list):
+        return [_canonical(v) for v in obj]
+    return obj
+
+
+def _digest(value: Any) -> str:
+    payload = json.dumps(_canonical(value), sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+class ParsedSpec:
+    # Wraps a raw OpenAPI/Swagger document. $refs are resolved lazily, on first use, and each
+    # resolved component is memoized so every endpoint that uses it shares one object.
+    def __init__(self, swagger: Dict[str, Any], content_hash: Optional[str] = None):
+        self.raw = swagger
+        self.content_hash = content_hash
+        self._refs: Dict[str, Any] = {}
+        self._resolving: List[str] = []
+        self._endpoints: Optional[List[ApiEndpoint]] = None
+        self._by_op: Optional[Dict[str, ApiEndpoint]] = None
+        self._fingerprints: Optional[Dict[str, Dict[str, str]]] = None
+
+    # --- Endpoints ---
+
+    @property
+    def endpoints(self) -> List[ApiEndpoint]:
+        if self._endpoints is None:
+            # Local import: parser depends on discovery, which the schema layer does not need
+            from core.parser import parse_swagger_endpoints
+            self._endpoints = parse_swagger_endpoints(self.raw)
+        return self._endpoints
+
+    def operation(self, op_id: str) -> Optional[ApiEndpoint]:
+        if self._by_op is None:
+            self._by_op = {get_operation_id(ep): ep for ep in self.endpoints}
+        return self._by_op.get(op_id)
+
+    # --- $ref resolution ---
+
+    def _pointer(self, ref: str) -> Any:
+        node: Any = self.raw
+        for token in ref[2:].split("/"):
+            token = _unescape(token)
+            if isinstance(node, list):
+                node = node[int(token)]
+            else:
+                node = node[token]
+        return node
+
+    def resolve_ref(self, ref: str) -> Any:
+        if ref in self._refs:
+            return self._refs[ref]
+        if not ref.startswith("#/"):
+            # External documents are out of scope; leave a marker instead of failing
+            return {"$ref": ref, "x-unresolved": True}
+        if ref in self._resolving:
+            # Cycle (e.g. a Node schema with children: [Node]); cut it here
+            return {"$ref": ref, "x-circular": True}
+
+        self._resolving.append(ref)
+        try:
+            try:
+                target = self._pointer(ref)
+            except (KeyError, IndexError, ValueError, TypeError):
+                return {"$ref": ref, "x-unresolved": True}
+            resolved = self.resolve(target)
+        finally:
+            self._resolving.pop()
+
+        self._refs[ref] = resolved
+        return resolved
+
+    def resolve(self, obj: Any) -> Any:
+        # Copy-on-change: subtrees without refs are returned as-is, not duplicated
+        if isinstance(obj, dict):
+            ref = obj.get("$ref")
+            if "x-circular" in obj or "x-unresolved" in obj:
+                # Markers left by an earlier pass; resolving already-resolved trees must be a no-op
+                return obj
+            if isinstance(ref, str):
+                resolved = self.resolve_ref(ref)
+                siblings = {k: self.resolve(v) for k, v in obj.items() if k != "$ref"}
+                if siblings and isinstance(resolved, dict):
+                    return {**resolved, **siblings}
+                return resolved
+
+            changed = None
+            for k, v in obj.items():
+                rv = self.resolve(v)
+                if rv is not v:
+                    if changed is None:
+                        changed = dict(obj)
+                    changed[k] = rv
+            return obj if changed is None else changed
+
+        if isinstance(obj, list):
+            items = [self.resolve(v) for v in obj]
+            if any(a is not b for a, b in zip(items, obj)):
+                return items
+            return obj
+        return obj
+
+    # --- Per-operation accessors ---
+
+    def _json_schema(self, content: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        for ctype in JSON_CONTENT_TYPES:
+            if ctype in content and "schema" in content[ctype]:
+                return self.resolve(content[ctype]["schema"])
+        for media in content.values():
+            if isinstance(media, dict) and "schema" in media:
+                return self.resolve(media["schema"])
+        return None
+
+    def request_schema(self, endpoint: ApiEndpoint) -> Optional[Dict[str, Any]]:
+        body = self.resolve(endpoint.requestBody) if endpoint.requestBody else None
+        if body and isinstance(body.get("content"), dict):
+            return self._json_schema(body["content"])
+        # Swagger 2: body parameter
+        for param in self.parameters(endpoint):
+            if param.get("in") == "body" and "schema" in param:
+                return self.resolve(param["schema"])
+        return None
+
+    def response_schema(self, endpoint: ApiEndpoint, status: Any) -> Optional[Dict[str, Any]]:
+        responses = endpoint.responses or {}
+        response = responses.get(str(status))
+        if response is None and status is not None:
+            response = responses.get(f"{str(status)[0]}XX") or responses.get(f"{str(status)[0]}xx")
+        if response is None:
+            response = responses.get("default")
+        if response is None:
+            return None
+
+        response = self.resolve(response)
+        if isinstance(response.get("content"), dict):
+            return self._json_schema(response["content"])
+        if "schema" in response:
+            return self.resolve(response["schema"])
+        return None
+
+    def parameters(self, endpoint: ApiEndpoint) -> List[Dict[str, Any]]:
+        # Path-level parameters apply to every method; the operation overrides by (in, name)
+        path_item = self.raw.get("paths", {}).get(endpoint.path, {})
+        merged: Dict[Any, Dict[str, Any]] = {}
+        for param in list(path_item.get("parameters", [])) + list(endpoint.parameters):
+            param = self.resolve(param)
+            merged[(param.get("in"), param.get("name"))] = param
+        return list(merged.values())
+
+    # --- Contract fingerprints (for diffing spec versions) ---
+
+    def contract(self, endpoint: ApiEndpoint) -> Dict[str, Any]:
+        return {
+            "parameters": sorted(self.parameters(endpoint), key=lambda p: (str(p.get("in")), str(p.get("name")))),
+            "requestBody": self.resolve(endpoint.requestBody),
+            "responses": self.resolve(endpoint.responses),
+            # An explicit empty list makes the operation public; only a missing one inherits
+            "security": endpoint.security if endpoint.security is not None else self.raw.get("security", [])
+        }
+
+    def fingerprints(self) -> Dict[str, Dict[str, str]]:
+        # operationId -> contract part -> short hash of its resolved, canonical form
+        if self._fingerprints is None:
+            self._fingerprints = {
+                get_operation_id(ep): {part: _digest(value) for part, value in self.contract(ep).items()}
+                for ep in self.endpoints
+            }
+        return self._fingerprints
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "operations": len(self.endpoints),
+            "resolved_refs": len(self._refs)
+        }
@@ -0,0 +1,96 @@
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+from core.schema import ParsedSpec
+from core.resolver import RunResolver, producer_index
+
+
+class RunSession:
+    # Everything a run needs between calls: the parsed spec, test data and the learned variables.
+    # Clients send deltas; runs read and extend this context in place.
+    def __init__(self, spec: ParsedSpec, spec_url: str, base_url: str, test_data: Dict[str, Any], variables: Dict[str, Any]):
+        self.id = uuid.uuid4().hex
+        self.spec = spec
+        self.spec_url = spec_url
+        self.base_url = base_url
+        self.test_data = test_data
+        self.variables = variables
+        self.resolver = RunResolver(producer_index(spec))
+        self.lock = asyncio.Lock()
+        self.created_at = time.monotonic()
+        self.touched_at = self.created_at
+        self.runs = 0
+
+    def apply(self, variables: Optional[Dict[str, Any]] = None, test_data: Optional[Dict[str, Any]] = None, unset: Optional[List[str]] = None):
+        if variables:
+            self.variables.update(variables)
+        if test_data:
+            self.test_data.update(test_data)
+        for key in unset or []:
+            self.variables.pop(key, None)
+
+    def summary(self, ttl: float) -> Dict[str, Any]:
+        return {
+            "sessionId": self.id,
+            "specUrl": self.spec_url,
+            "baseUrl": self.base_url,
+            "operations": len(self.spec.endpoints),
+            "variables": len(self.variables),
+            "testData": len(self.test_data),
+            "runs": self.runs,
+            "expiresIn": max(0.0, ttl - (time.monotonic() - self.touched_at))
+        }
+
+
+class SessionStore:
+    # Sliding TTL: every access extends a session's life; the least recently used go first when full
+    def __init__(self, ttl: float = 1800.0, max_sessions: int = 256):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, RunSession]" = OrderedDict()
+        self.expired = 0
+
+    def create(self, spec: ParsedSpec, spec_url: str, base_url: str, test_data: Dict[str, Any], variables: Dict[str, Any]) -> RunSession:
+        self._sweep()
+        session = RunSession(spec, spec_url, base_url, test_data, variables)
+        self._sessions[session.id] = session
+        while len(self._sessions) > self.max_sessions:
+            _, old = self._sessions.popitem(last=False)
+            old.resolver.cancel()
+        return session
+
+    def get(self, session_id: str) -> Optional[RunSession]:
+        self._sweep()
+        session = self._sessions.get(session_id)
+        if session is not None:
+            session.touched_at = time.monotonic()
+            self._sessions.move_to_end(session_id)
+        return session
+
+    def delete(self, session_id: str) -> bool:
+        session = self._sessions.pop(session_id, None)
+        if session is not None:
+            session.resolver.cancel()
+        return session is not None
+
+    def _sweep(self):
+        # Ordered by last access, so expired sessions are always at the front
+        now = time.monotonic()
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if now - session.touched_at < self.ttl:
+                break
+            self._sessions.popitem(last=False)
+            session.resolver.cancel()
+            self.expired += 1
+
+    def stats(self) -> Dict[str, Any]:
+        self._sweep()
+        return {
+            "sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "ttl": self.ttl,
+            "expired": self.expired
+        }
@@ -0,0 +1,328 @@
+import asyncio
+import os
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Callable, Awaitable
+from models import ApiEndpoint
+from core.runner import get_operation_id
+from core.schema import ParsedSpec
+from core.scheduler import build_dependency_graph, run_dag
+
+
+# --- Planning ---
+
+def _group(ep: ApiEndpoint) -> str:
+    # Same grouping as the AI test-data chunks: tag first, else the collection
+    if ep.tags:
+        return ep.tags[0]
+    return ep.path.split("{")[0].rstrip("/") or "/"
+
+
+def _components(endpoints: List[ApiEndpoint], test_data: Dict[str, Any], by: str) -> List[List[int]]:
+    # Union-find over dependency edges, so a producer and its consumers always share a shard.
+    # by="tag" additionally keeps each tag / collection together.
+    parent = list(range(len(endpoints)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(a: int, b: int):
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[max(ra, rb)] = min(ra, rb)
+
+    for i, deps in enumerate(build_dependency_graph(endpoints, test_data)["deps"]):
+        for j in deps:
+            union(i, j)
+    if by == "tag":
+        first: Dict[str, int] = {}
+        for i, ep in enumerate(endpoints):
+            union(i, first.setdefault(_group(ep), i))
+
+    groups: "OrderedDict[int, List[int]]" = OrderedDict()
+    for i in range(len(endpoints)):
+        groups.setdefault(find(i), []).append(i)
+    return list(groups.values())
+
+
+def plan_shards(endpoints: List[ApiEndpoint], test_data: Dict[str, Any], count: int, by: str = "component") -> List[List[int]]:
+    # Largest group first onto the lightest shard (LPT); indices inside a shard keep spec order
+    if by not in ("component", "tag"):
+        raise ValueError(f"Unknown shard strategy '{by}' (use component or tag)")
+    groups = sorted(_components(endpoints, test_data, by), key=len, reverse=True)
+    shards: List[List[int]] = [[] for _ in range(max(1, min(count, len(groups))))]
+    for group in groups:
+        min(shards, key=len).extend(group)
+    return [sorted(shard) for shard in shards if shard]
+
+
+def shard_payload(
+    job_id: str,
+    shard: int,
+    indices: List[int],
+    endpoints: List[ApiEndpoint],
+    base_url: str,
+    variables: Dict[str, Any],
+    test_data: Dict[str, Any],
+    spec_hash: Optional[str],
+    options: Dict[str, Any]
+) -> Dict[str, Any]:
+    # Plain JSON: crosses process boundaries (pickle) and the network (HTTP) unchanged
+    selected = [endpoints[i] for i in indices]
+    ops = {get_operation_id(ep) for ep in selected}
+    return {
+        "jobId": job_id,
+        "shard": shard,
+        "indices": indices,
+        "endpoints": [ep.model_dump() for ep in selected],
+        "baseUrl": base_url,
+        "variables": variables,
+        # Only this shard's entries, plus shared non-operation keys (e.g. headers)
+        "testData": {k: v for k, v in test_data.items() if k in ops or not isinstance(v, dict) or k == "headers"},
+        "specHash": spec_hash,
+        "options": options
+    }
+
+
+# --- Execution (inside a worker) ---
+
+# Parsed specs per worker process, keyed by content hash; a process parses each spec once
+_worker_specs: Dict[str, ParsedSpec] = {}
+
+
+def worker_spec(spec_hash: Optional[str], raw: Optional[Dict[str, Any]]) -> Optional[ParsedSpec]:
+    if spec_hash is None:
+        return None
+    spec = _worker_specs.get(spec_hash)
+    if spec is None and raw is not None:
+        spec = ParsedSpec(raw, spec_hash)
+        _worker_specs[spec_hash] = spec
+    return spec
+
+
+async def execute_shard(payload: Dict[str, Any], spec: Optional[ParsedSpec], client=None) -> Dict[str, Any]:
+    from core.http_pool import ClientPool, PoolConfig
+    from core.validation import response_validators
+
+    options = payload.get("options", {})
+    concurrency = options.get("concurrency", 8)
+    endpoints = [ApiEndpoint(**ep) for ep in payload["endpoints"]]
+    validators = response_validators(spec) if spec is not None and options.get("validate", True) else None
+
+    pool = None
+    if client is None:
+        pool = ClientPool(PoolConfig(max_connections=max(concurrency, 10), max_keepalive_connections=concurrency))
+        client = await pool.get(payload["baseUrl"])
+    started_at = time.time()
+    started = time.perf_counter()
+    try:
+        results = await run_dag(
+            client, endpoints, payload["baseUrl"], dict(payload["variables"]), payload["testData"],
+            max_concurrency=concurrency, validators=validators
+        )
+    finally:
+        if pool is not None:
+            await pool.close()
+    elapsed = time.perf_counter() - started
+
+    for index, endpoint, result in zip(payload["indices"], endpoints, results):
+        result["index"] = index
+        result["shard"] = payload["shard"]
+        result["operationId"] = get_operation_id(endpoint)
+    return {
+        "jobId": payload["jobId"],
+        "shard": payload["shard"],
+        "worker": f"{os.uname().nodename}:{os.getpid()}" if hasattr(os, "uname") else str(os.getpid()),
+        # Wall-clock bounds place shards from different processes on one timeline;
+        # the duration itself comes from the monotonic clock
+        "startedAt": started_at,
+        "finishedAt": started_at + elapsed,
+        "elapsed": elapsed,
+        "results": results
+    }
+
+
+def _run_in_process(payload: Dict[str, Any], raw: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    # ProcessPoolExecutor entry point: own event loop, own connection pool
+    return asyncio.run(execute_shard(payload, worker_spec(payload.get("specHash"), raw)))
+
+
+# --- Merging ---
+
+def merge_reports(reports: List[Dict[str, Any]], total: int) -> Dict[str, Any]:
+    results: List[Optional[Dict[str, Any]]] = [None] * total
+    shards = []
+    for report in sorted(reports, key=lambda r: r["shard"]):
+        for result in report["results"]:
+            results[result["index"]] = result
+        passed = sum(1 for r in report["results"] if r.get("passed"))
+        shards.append({
+            "shard": report["shard"],
+            "worker": report.get("worker"),
+            "tests": len(report["results"]),
+            "passed": passed,
+            "failed": len(report["results"]) - passed,
+            "startedAt": report["startedAt"],
+            "finishedAt": report["finishedAt"],
+            "elapsed": report["elapsed"]
+        })
+    done = [r for r in results if r is not None]
+    started = min((s["startedAt"] for s in shards), default=0.0)
+    finished = max((s["finishedAt"] for s in shards), default=0.0)
+    return {
+        "results": results,
+        "shards": shards,
+        "tests": total,
+        "passed": sum(1 for r in done if r.get("passed")),
+        "failed": sum(1 for r in done if not r.get("passed")),
+        "missing": total - len(done),
+        "startedAt": started,
+        "finishedAt": finished,
+        # Span across all shards (what the suite cost in wall time), not the sum of their durations
+        "elapsed": finished - started
+    }
+
+
+async def run_sharded(
+    spec: Optional[ParsedSpec],
+    endpoints: List[ApiEndpoint],
+    base_url: str,
+    variables: Dict[str, Any],
+    test_data: Dict[str, Any],
+    shards: int,
+    processes: Optional[int] = None,
+    by: str = "component",
+    options: Optional[Dict[str, Any]] = None,
+    on_report: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None
+) -> Dict[str, Any]:
+    # One host: each shard runs in its own process with its own event loop and sockets.
+    # on_report gets each shard's report as soon as that shard finishes, before the merge.
+    plan = plan_shards(endpoints, test_data, shards, by)
+    job_id = uuid.uuid4().hex
+    # Specs loaded from a file carry no hash; any job-unique key works since the raw spec travels along
+    spec_hash = (spec.content_hash or uuid.uuid4().hex) if spec is not None else None
+    raw = spec.raw if spec is not None else None
+    payloads = [
+        shard_payload(job_id, n, indices, endpoints, base_url, variables, test_data, spec_hash, options or {})
+        for n, indices in enumerate(plan)
+    ]
+    loop = asyncio.get_running_loop()
+    reports = []
+    with ProcessPoolExecutor(max_workers=processes or min(len(payloads), os.cpu_count() or 1)) as executor:
+        futures = [loop.run_in_executor(executor, _run_in_process, p, raw) for p in payloads]
+        for done in asyncio.as_completed(futures):
+            report = await done
+            reports.append(report)
+            if on_report is not None:
+                await on_report(report)
+    return merge_reports(reports, len(endpoints))
+
+
+# --- Coordinator (worker nodes pull shards over HTTP) ---
+
+class ShardJob:
+    def __init__(self, job_id: str, spec: Optional[ParsedSpec], payloads: List[Dict[str, Any]], total: int, lease: float):
+        self.id = job_id
+        self.spec = spec
+        self.payloads = payloads
+        self.total = total
+        self.lease = lease
+        self.pending: List[int] = list(range(len(payloads)))
+        # shard -> lease deadline (monotonic)
+        self.claimed: Dict[int, float] = {}
+        self.reports: Dict[int, Dict[str, Any]] = {}
+        self.created_at = time.monotonic()
+
+    @property
+    def done(self) -> bool:
+        return len(self.reports) == len(self.payloads)
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        # Leases that ran out (worker died or hung) go back to the front of the queue
+        now = time.monotonic()
+        for shard, deadline in list(self.claimed.items()):
+            if deadline < now:
+                del self.claimed[shard]
+                self.pending.insert(0, shard)
+        if not self.pending:
+            return None
+        shard = self.pending.pop(0)
+        self.claimed[shard] = now + self.lease
+        return self.payloads[shard]
+
+    def complete(self, report: Dict[str, Any]) -> bool:
+        shard = report["shard"]
+        if shard in self.reports or not 0 <= shard < len(self.payloads):
+            return False
+        self.claimed.pop(shard, None)
+        if shard in self.pending:
+            self.pending.remove(shard)
+        self.reports[shard] = report
+        return True
+
+    def status(self) -> Dict[str, Any]:
+        status = {
+            "jobId": self.id,
+            "shards": len(self.payloads),
+            "pending": len(self.pending),
+            "running": len(self.claimed),
+            "completed": len(self.reports),
+            "done": self.done
+        }
+        if self.done:
+            status["report"] = merge_reports(list(self.reports.values()), self.total)
+        return status
+
+
+class ShardCoordinator:
+    # In-memory job queue on the backend; oldest jobs are dropped first when full
+    def __init__(self, lease: float = 300.0, max_jobs: int = 32):
+        self.lease = lease
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, ShardJob]" = OrderedDict()
+
+    def submit(
+        self,
+        spec: Optional[ParsedSpec],
+        endpoints: List[ApiEndpoint],
+        base_url: str,
+        variables: Dict[str, Any],
+        test_data: Dict[str, Any],
+        shards: int,
+        by: str = "component",
+        options: Optional[Dict[str, Any]] = None
+    ) -> ShardJob:
+        job_id = uuid.uuid4().hex
+        spec_hash = (spec.content_hash or job_id) if spec is not None else None
+        payloads = [
+            shard_payload(job_id, n, indices, endpoints, base_url, variables, test_data, spec_hash, options or {})
+            for n, indices in enumerate(plan_shards(endpoints, test_data, shards, by))
+        ]
+        job = ShardJob(job_id, spec, payloads, len(endpoints), self.lease)
+        self._jobs[job_id] = job
+        while len(self._jobs) > self.max_jobs:
+            self._jobs.popitem(last=False)
+        return job
+
+    def get(self, job_id: str) -> Optional[ShardJob]:
+        return self._jobs.get(job_id)
+
+    def claim(self, job_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        jobs = [self._jobs[job_id]] if job_id in self._jobs else [] if job_id else list(self._jobs.values())
+        for job in jobs:
+            payload = job.claim()
+            if payload is not None:
+                return payload
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "jobs": len(self._jobs),
+            "running": sum(1 for j in self._jobs.values() if not j.done),
+            "lease": self.lease
+        }
@@ -0,0 +1,161 @@
+import hashlib
+import time
+import asyncio
+import logging
+import httpx
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+from core.parser import discover_swagger
+from core.schema import ParsedSpec
+from core.spec_diff import diff_specs
+from core.discovery import CLIENT_OPTIONS, parse_spec_body
+
+logger = logging.getLogger(__name__)
+
+
+class _SpecEntry:
+    def __init__(self, resolved_url: str, content_hash: str, size: int, swagger: Dict[str, Any]):
+        self.resolved_url = resolved_url
+        self.content_hash = content_hash
+        self.size = size
+        self.swagger = swagger
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.fetched_at = time.time()
+
+    def set_validators(self, response: httpx.Response):
+        self.etag = response.headers.get("etag") or self.etag
+        self.last_modified = response.headers.get("last-modified") or self.last_modified
+
+
+class SpecCache:
+    # Entries are keyed by the URL the user typed; each remembers where the spec actually lives.
+    # Parsed specs are memoized by content hash, so identical specs share one parse and one
+    # $ref index.
+    def __init__(self, max_entries: int = 32, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, _SpecEntry]" = OrderedDict()
+        self._specs: Dict[str, ParsedSpec] = {}
+        # Source URL -> diff between its two most recent distinct versions. In memory only: lost on
+        # restart or when the source is evicted, after which changed-only runs fall back to running
+        # everything until the source changes again
+        self._diffs: Dict[str, Dict[str, Any]] = {}
+        self._bytes = 0
+        self._lock = asyncio.Lock()
+        self.hits = 0
+        self.unchanged = 0
+        self.misses = 0
+
+    async def load(self, url: str) -> ParsedSpec:
+        entry = self._entries.get(url)
+        if entry is not None:
+            self._entries.move_to_end(url)
+            try:
+                fresh = await self._revalidate(url, entry)
+                if fresh is not None:
+                    return fresh
+            except Exception as e:
+                # Known location went away; fall back to full discovery
+                logger.info(f"Revalidation failed for {entry.resolved_url}: {e}")
+
+        self.misses += 1
+        response, swagger = await discover_swagger(url)
+        return await self._store(url, response, swagger)
+
+    async def _revalidate(self, url: str, entry: _SpecEntry) -> Optional[ParsedSpec]:
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+
+        async with httpx.AsyncClient(**CLIENT_OPTIONS) as client:
+            resp = await client.get(entry.resolved_url, headers=headers, timeout=5.0, follow_redirects=True)
+
+        if resp.status_code == 304:
+            self.hits += 1
+            entry.fetched_at = time.time()
+            return self._spec_for(entry)
+        if resp.status_code != 200:
+            return None
+
+        # Server ignored the validators: the content hash still saves the re-parse
+        if self._hash(resp.content) == entry.content_hash:
+            self.unchanged += 1
+            entry.set_validators(resp)
+            entry.fetched_at = time.time()
+            return self._spec_for(entry)
+
+        # Changed at the same location: reuse this response rather than rediscovering
+        swagger = parse_spec_body(resp)
+        if swagger is None:
+            return None
+        self.misses += 1
+        return await self._store(url, resp, swagger)
+
+    async def _store(self, url: str, response: httpx.Response, swagger: Dict[str, Any]) -> ParsedSpec:
+        content_hash = self._hash(response.content)
+        entry = _SpecEntry(str(response.url), content_hash, len(response.content), swagger)
+        entry.set_validators(response)
+        spec = self._spec_for(entry)
+
+        previous = self._entries.get(url)
+        if previous is not None and previous.content_hash != content_hash:
+            self._diffs[url] = diff_specs(self._spec_for(previous), spec)
+
+        async with self._lock:
+            old = self._entries.pop(url, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._entries[url] = entry
+            self._bytes += entry.size
+            self._evict()
+        return spec
+
+    def _spec_for(self, entry: _SpecEntry) -> ParsedSpec:
+        spec = self._specs.get(entry.content_hash)
+        if spec is None:
+            spec = ParsedSpec(entry.swagger, entry.content_hash)
+            self._specs[entry.content_hash] = spec
+        return spec
+
+    def get(self, url: str) -> Optional[ParsedSpec]:
+        # Cached spec for a source without touching the network (None if never parsed or evicted)
+        entry = self._entries.get(url)
+        return self._spec_for(entry) if entry is not None else None
+
+    def diff(self, url: str) -> Optional[Dict[str, Any]]:
+        # What changed the last time this source's content changed; None until it has.
+        # Only returned while it ends at the cached version (its "to" fingerprint)
+        diff = self._diffs.get(url)
+        entry = self._entries.get(url)
+        if diff is None or entry is None or diff["to"] != entry.content_hash:
+            return None
+        return diff
+
+    def _evict(self):
+        # LRU by entry count and total spec bytes; always keep the newest entry
+        while len(self._entries) > 1 and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            old_url, old = self._entries.popitem(last=False)
+            self._bytes -= old.size
+            self._diffs.pop(old_url, None)
+        live = {e.content_hash for e in self._entries.values()}
+        for h in list(self._specs):
+            if h not in live:
+                del self._specs[h]
+
+    @staticmethod
+    def _hash(content: bytes) -> str:
+        return hashlib.sha256(content).hexdigest()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "unchanged": self.unchanged,
+            "misses": self.misses
+        }
@@ -0,0 +1,33 @@
+from typing import Dict, Any, List, Optional, Set
+from core.schema import ParsedSpec
+
+
+def diff_specs(old: Optional[ParsedSpec], new: ParsedSpec) -> Optional[Dict[str, Any]]:
+    # Per-operation structural diff. None means there is no baseline, so everything counts as new.
+    if old is None:
+        return None
+
+    before, after = old.fingerprints(), new.fingerprints()
+    changed: Dict[str, List[str]] = {}
+    for op_id, parts in after.items():
+        previous = before.get(op_id)
+        if previous is None:
+            continue
+        differing = [part for part, digest in parts.items() if previous.get(part) != digest]
+        if differing:
+            changed[op_id] = differing
+
+    added = [op_id for op_id in after if op_id not in before]
+    return {
+        "from": old.content_hash,
+        "to": new.content_hash,
+        "added": added,
+        "removed": [op_id for op_id in before if op_id not in after],
+        "changed": changed,
+        "unchanged": len(after) - len(added) - len(changed)
+    }
+
+
+def affected_operations(diff: Dict[str, Any]) -> Set[str]:
+    # Removed operations cannot run; everything new or modified needs a re-test
+    return set(diff["added"]) | set(diff["changed"])
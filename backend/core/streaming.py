@@ -0,0 +1,66 @@
+import asyncio
+import json
+from typing import Dict, Any, AsyncIterator, Callable, Awaitable, Optional
+
+# A run function takes an on_result callback and returns the full result list
+RunFn = Callable[[Callable[[int, Dict[str, Any]], Awaitable[None]]], Awaitable[Any]]
+
+_DONE = object()
+
+
+class RunStream:
+    def __init__(self, run: RunFn, max_buffered: int = 32, done_info: Optional[Dict[str, Any]] = None):
+        # Bounded queue: when the consumer stops reading, producers block in on_result
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_buffered)
+        self._run = run
+        # Extra fields for the final "done" event (e.g. the runId to look the run up in history)
+        self.done_info = done_info or {}
+        self._task: Optional[asyncio.Task] = None
+        self.total = 0
+        self.passed = 0
+        self.cancelled = False
+
+    async def _on_result(self, index: int, result: Dict[str, Any]):
+        await self._queue.put({"type": "result", "index": index, "result": result})
+
+    async def _drive(self):
+        try:
+            await self._run(self._on_result)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await self._queue.put({"type": "error", "error": str(e)})
+        await self._queue.put(_DONE)
+
+    async def events(self) -> AsyncIterator[Dict[str, Any]]:
+        self._task = asyncio.create_task(self._drive())
+        try:
+            while True:
+                event = await self._queue.get()
+                if event is _DONE:
+                    break
+                if event["type"] == "result":
+                    self.total += 1
+                    self.passed += 1 if event["result"].get("passed") else 0
+                yield event
+            yield {"type": "done", "total": self.total, "passed": self.passed, "cancelled": self.cancelled, **self.done_info}
+        finally:
+            # Consumer went away (disconnect / cancel): stop in-flight steps
+            self.cancel()
+
+    def cancel(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+            self.cancelled = True
+            # Wake the reader even if the buffer is full; pending results are dropped
+            while self._queue.full():
+                self._queue.get_nowait()
+            self._queue.put_nowait(_DONE)
+
+
+def encode_ndjson(event: Dict[str, Any]) -> str:
+    return json.dumps(event, default=str) + "\n"
+
+
+def encode_sse(event: Dict[str, Any]) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
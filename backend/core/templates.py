@@ -0,0 +1,88 @@
+import re
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Union
+
+# {{name}} is tried before {name} so double braces are consumed whole
+TOKEN_RE = re.compile(r"\{\{([^{}]+)\}\}|\{([^{}]+)\}")
+
+SCALARS = (str, int, float, bool)
+_MISSING = object()
+
+
+def _resolve(name: str, ctx: Dict[str, Any]) -> Any:
+    # Exact key first (keys may contain dots), then one level of nesting: {user.id}
+    value = ctx.get(name, _MISSING)
+    if value is not _MISSING:
+        return value
+    root, dot, sub = name.partition(".")
+    if dot:
+        parent = ctx.get(root)
+        if isinstance(parent, dict):
+            return parent.get(sub, _MISSING)
+    return _MISSING
+
+
+def _lookup(name: str, ctx: Dict[str, Any]) -> Optional[str]:
+    value = _resolve(name, ctx)
+    return str(value) if isinstance(value, SCALARS) else None
+
+
+class Template:
+    __slots__ = ("parts", "direct_key")
+
+    def __init__(self, text: str):
+        # parts alternates literal text (str) and placeholders (tuple of name, raw token)
+        self.parts: List[Union[str, tuple]] = []
+        pos = 0
+        for m in TOKEN_RE.finditer(text):
+            if m.start() > pos:
+                self.parts.append(text[pos:m.start()])
+            self.parts.append((m.group(1) or m.group(2), m.group(0)))
+            pos = m.end()
+        if pos < len(text):
+            self.parts.append(text[pos:])
+
+        # A value that is only "{{key}}" / "{key}" can be substituted with its original type
+        stripped = text.strip()
+        self.direct_key = None
+        if stripped.startswith("{") and stripped.endswith("}"):
+            self.direct_key = stripped.strip("{}")
+
+    def render(self, ctx: Dict[str, Any]) -> str:
+        out = []
+        for part in self.parts:
+            if isinstance(part, str):
+                out.append(part)
+            else:
+                value = _lookup(part[0], ctx)
+                out.append(part[1] if value is None else value)
+        return "".join(out)
+
+
+@lru_cache(maxsize=4096)
+def compile_template(text: str) -> Template:
+    return Template(text)
+
+
+def render(text: str, ctx: Dict[str, Any]) -> str:
+    if "{" not in text:
+        return text
+    return compile_template(text).render(ctx)
+
+
+def render_value(obj: Any, ctx: Dict[str, Any]) -> Any:
+    # Walks a request body; string leaves are rendered, direct placeholders keep their type
+    if isinstance(obj, str):
+        if "{" not in obj:
+            return obj
+        template = compile_template(obj)
+        if template.direct_key is not None:
+            value = _resolve(template.direct_key, ctx)
+            if value is not _MISSING:
+                return value
+        return template.render(ctx)
+    elif isinstance(obj, dict):
+        return {k: render_value(v, ctx) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [render_value(i, ctx) for i in obj]
+    return obj
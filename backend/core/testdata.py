@@ -0,0 +1,125 @@
+import json
+import re
+from typing import Dict, Any, List, Optional, Tuple
+from models import ApiEndpoint
+from core.runner import get_operation_id
+from core.schema import ParsedSpec
+
+# {{create_user.id}} -> "create_user"
+REFERENCE_RE = re.compile(r"\{\{\s*([^}.\s]+)\.[^}]*\}\}")
+PATH_PARAM_RE = re.compile(r"\{([^}]+)\}")
+
+# Keys of an operation's entry; an unknown key holding these is a misnamed operation, not a shared value
+OPERATION_KEYS = {"body", "parameters"}
+
+
+def estimate_tokens(obj: Any) -> int:
+    # ~4 characters per token is close enough for budgeting prompts
+    return len(json.dumps(obj, default=str)) // 4 + 1
+
+
+def endpoint_summary(ep: ApiEndpoint, spec: Optional[ParsedSpec]) -> Dict[str, Any]:
+    return {
+        "path": ep.path,
+        "method": ep.method,
+        "operationId": get_operation_id(ep),
+        "parameters": [p["name"] for p in ep.parameters if p.get("in") in ["path", "query"]],
+        # Resolved body schema when the parsed spec is available, raw requestBody otherwise
+        "body_schema": spec.request_schema(ep) if spec else ep.requestBody
+    }
+
+
+def _group_key(ep: ApiEndpoint) -> str:
+    # Tag first; otherwise the collection the path lives under, which keeps creators next to their consumers
+    if ep.tags:
+        return ep.tags[0]
+    return ep.path.split("{")[0].rstrip("/") or "/"
+
+
+def plan_chunks(endpoints: List[ApiEndpoint], summaries: List[Dict[str, Any]], budget: int) -> List[List[Dict[str, Any]]]:
+    # Whole groups are packed together while they fit; a group larger than the budget is split alone
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for ep, summary in zip(endpoints, summaries):
+        groups.setdefault(_group_key(ep), []).append(summary)
+
+    chunks: List[List[Dict[str, Any]]] = []
+    current: List[Dict[str, Any]] = []
+    current_tokens = 0
+    for group in groups.values():
+        size = sum(estimate_tokens(s) for s in group)
+        if current and current_tokens + size > budget:
+            chunks.append(current)
+            current, current_tokens = [], 0
+        if size <= budget:
+            current.extend(group)
+            current_tokens += size
+            continue
+        for summary in group:
+            tokens = estimate_tokens(summary)
+            if current and current_tokens + tokens > budget:
+                chunks.append(current)
+                current, current_tokens = [], 0
+            current.append(summary)
+            current_tokens += tokens
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def naming_contract(summaries: List[Dict[str, Any]]) -> List[str]:
+    # Every chunk sees every operationId, so references into other chunks use real names
+    return [f"{s['operationId']}: {s['method']} {s['path']}" for s in summaries]
+
+
+def validate_test_data(
+    data: Dict[str, Any],
+    endpoints: List[ApiEndpoint],
+    spec: Optional[ParsedSpec]
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    # Keeps entries for known operations plus shared top-level values (headers, template globals);
+    # reports what does not line up with the spec
+    by_op = {get_operation_id(ep): ep for ep in endpoints}
+    clean: Dict[str, Any] = {}
+    issues: List[Dict[str, Any]] = []
+
+    def issue(op_id: str, problem: str):
+        issues.append({"operationId": op_id, "issue": problem})
+
+    for op_id, entry in data.items():
+        ep = by_op.get(op_id)
+        if ep is None and (op_id == "headers" or not isinstance(entry, dict) or not OPERATION_KEYS & entry.keys()):
+            clean[op_id] = entry
+            continue
+        if ep is None:
+            issue(op_id, "unknown operationId, dropped")
+            continue
+        if not isinstance(entry, dict):
+            issue(op_id, "entry is not an object, dropped")
+            continue
+        clean[op_id] = entry
+
+        for ref in REFERENCE_RE.findall(json.dumps(entry, default=str)):
+            if ref not in by_op:
+                issue(op_id, f"references unknown operation '{ref}'")
+
+        params = entry.get("parameters", {})
+        if not isinstance(params, dict):
+            issue(op_id, "parameters is not an object")
+            params = {}
+        for name in PATH_PARAM_RE.findall(ep.path):
+            if name not in params:
+                issue(op_id, f"no value for path parameter '{name}' (left to the resolver)")
+
+        body = entry.get("body")
+        schema = spec.request_schema(ep) if spec else None
+        if isinstance(schema, dict) and ep.method.upper() in ("POST", "PUT", "PATCH"):
+            if body is None:
+                issue(op_id, "missing request body")
+            elif schema.get("type") == "object" and not isinstance(body, dict):
+                issue(op_id, "body should be an object")
+            elif isinstance(body, dict):
+                missing = [f for f in schema.get("required", []) if f not in body]
+                if missing:
+                    issue(op_id, f"body is missing required fields: {', '.join(missing)}")
+
+    return clean, issues
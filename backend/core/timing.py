@@ -0,0 +1,44 @@
+import time
+from typing import Dict, Any, Optional
+
+# Phase -> (first event, last event) of the httpcore trace. http11.* and http2.* events are
+# folded into one name, so both protocols report the same phases.
+PHASES = {
+    # Name resolution happens inside connect_tcp; httpcore does not trace it separately
+    "connect": ("connect_tcp.started", "connect_tcp.complete"),
+    "tls": ("start_tls.started", "start_tls.complete"),
+    "send": ("send_request_headers.started", "send_request_body.complete"),
+    # Request fully written -> response headers parsed: server processing plus one round trip
+    "ttfb": ("send_request_body.complete", "receive_response_headers.complete"),
+    "download": ("receive_response_body.started", "receive_response_body.complete"),
+}
+
+
+class RequestTrace:
+    # Per-request timing hook: client.request(..., extensions={"trace": trace}).
+    # Records when each traced step of the connection/request happened (monotonic clock).
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.marks: Dict[str, float] = {}
+
+    async def __call__(self, name: str, info: dict):
+        # "connection.connect_tcp.started" / "http11.send_request_headers.complete" -> "connect_tcp.started" / ...
+        _, _, event = name.partition(".")
+        self.marks[event] = time.perf_counter()
+
+    def timings(self, finished: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        # Phase durations in ms. None when the transport emits no trace events (ASGI, mocks).
+        # A phase that started but never completed (timeout, reset) runs until `finished`,
+        # so a connect timeout shows up as connect time.
+        if not self.marks:
+            return None
+        finished = finished or time.perf_counter()
+        first = min(self.marks.values())
+        out = {"queue": (first - self.started) * 1000}
+        for phase, (start, end) in PHASES.items():
+            if start in self.marks:
+                out[phase] = (self.marks.get(end, finished) - self.marks[start]) * 1000
+        out["total"] = (finished - self.started) * 1000
+        # No connect event: the request went out on a pooled keep-alive connection
+        out["reused"] = "connect_tcp.started" not in self.marks
+        return out
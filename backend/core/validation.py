@@ -0,0 +1,322 @@
+import re
+import weakref
+from typing import Dict, Any, List, Optional, Callable, Tuple
+from models import ApiEndpoint
+from core.runner import get_operation_id
+from core.schema import ParsedSpec
+
+# Reported per response; the rest are counted, not listed
+MAX_ERRORS = 20
+
+Errors = List[Dict[str, str]]
+Check = Callable[[Any, str, Errors], None]
+
+_TYPES: Dict[str, Tuple[type, ...]] = {
+    "object": (dict,),
+    "array": (list,),
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+}
+
+_FORMATS = {
+    "date-time": re.compile(r"^\d{4}-\d{2}-\d{2}[Tt ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?([Zz]|[+-]\d{2}:?\d{2})?$"),
+    "date": re.compile(r"^\d{4}-\d{2}-\d{2}$"),
+    "time": re.compile(r"^\d{2}:\d{2}(:\d{2}(\.\d+)?)?([Zz]|[+-]\d{2}:?\d{2})?$"),
+    "uuid": re.compile(r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$"),
+    "email": re.compile(r"^[^@\s]+@[^@\s]+$"),
+}
+
+
+def _noop(value: Any, path: str, errors: Errors):
+    pass
+
+
+def _type_name(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    for name, types in _TYPES.items():
+        if isinstance(value, types):
+            return name
+    return type(value).__name__
+
+
+class SchemaCompiler:
+    # Turns a schema into a tree of closures once, so validating a response is plain function
+    # calls and isinstance checks. $refs are compiled once per spec and shared; recursive
+    # schemas link back to the closure being built instead of expanding forever.
+    def __init__(self, spec: ParsedSpec):
+        self.spec = spec
+        self._refs: Dict[str, Check] = {}
+        # Parts of the spec that could not be compiled and are not checked, each reported once
+        self.notes: List[str] = []
+
+    def _pattern(self, source: Any) -> Optional[re.Pattern]:
+        # ECMA-262 patterns Python's re rejects (\p{L}, lookbehind forms, ...) are skipped, not fatal
+        if not isinstance(source, str):
+            return None
+        try:
+            return re.compile(source)
+        except re.error as e:
+            note = f"pattern {source!r} not checked: {e}"
+            if note not in self.notes:
+                self.notes.append(note)
+            return None
+
+    def _ref(self, ref: str) -> Check:
+        check = self._refs.get(ref)
+        if check is None:
+            cell: List[Check] = [_noop]
+            self._refs[ref] = check = lambda value, path, errors: cell[0](value, path, errors)
+            cell[0] = self.compile(self.spec.resolve_ref(ref))
+        return check
+
+    def compile(self, schema: Any) -> Check:
+        if not isinstance(schema, dict) or not schema or schema.get("x-unresolved"):
+            return _noop
+        if "$ref" in schema:
+            ref_check = self._ref(schema["$ref"])
+            rest = {k: v for k, v in schema.items() if k not in ("$ref", "x-circular")}
+            if not rest:
+                return ref_check
+            rest_check = self.compile(rest)
+
+            def both(value, path, errors):
+                ref_check(value, path, errors)
+                rest_check(value, path, errors)
+            return both
+
+        checks: List[Check] = []
+        nullable = bool(schema.get("nullable"))
+
+        kind = schema.get("type")
+        if kind is not None:
+            kinds = kind if isinstance(kind, list) else [kind]
+            nullable = nullable or "null" in kinds
+            allowed = tuple(t for k in kinds for t in _TYPES.get(k, ()))
+            no_bool = "boolean" not in kinds
+            expected = " or ".join(kinds)
+
+            def check_type(value, path, errors):
+                if value is None and nullable:
+                    return
+                if not isinstance(value, allowed) or (no_bool and isinstance(value, bool)):
+                    errors.append({"path": path or "/", "message": f"expected {expected}, got {_type_name(value)}"})
+            if allowed or kinds == ["null"]:
+                checks.append(check_type)
+
+        if "const" in schema:
+            const = schema["const"]
+
+            def check_const(value, path, errors):
+                if value != const:
+                    errors.append({"path": path or "/", "message": f"expected {const!r}"})
+            checks.append(check_const)
+        if "enum" in schema:
+            options = list(schema["enum"])
+
+            def check_enum(value, path, errors):
+                if value not in options and not (value is None and nullable):
+                    errors.append({"path": path or "/", "message": f"{value!r} is not one of {options}"})
+            checks.append(check_enum)
+
+        checks.extend(self._object_checks(schema))
+        checks.extend(self._array_checks(schema))
+        checks.extend(self._string_checks(schema))
+        checks.extend(self._number_checks(schema))
+        checks.extend(self._combinator_checks(schema))
+
+        if not checks:
+            return _noop
+        if len(checks) == 1:
+            return checks[0]
+
+        def run_all(value, path, errors):
+            for check in checks:
+                check(value, path, errors)
+        return run_all
+
+    def _object_checks(self, schema: Dict[str, Any]) -> List[Check]:
+        props = {name: self.compile(sub) for name, sub in schema.get("properties", {}).items()}
+        props = {name: check for name, check in props.items() if check is not _noop}
+        required = list(schema.get("required", []))
+        extra = schema.get("additionalProperties", True)
+        known = set(schema.get("properties", {}))
+        extra_check = self.compile(extra) if isinstance(extra, dict) else None
+        if not (props or required or extra is False or extra_check):
+            return []
+
+        def check_object(value, path, errors):
+            if not isinstance(value, dict):
+                return
+            for name in required:
+                if name not in value:
+                    errors.append({"path": f"{path}/{name}", "message": "required field missing"})
+            for name, check in props.items():
+                if name in value:
+                    check(value[name], f"{path}/{name}", errors)
+            if extra is False or extra_check:
+                for name in value:
+                    if name in known:
+                        continue
+                    if extra is False:
+                        errors.append({"path": f"{path}/{name}", "message": "unexpected field"})
+                    else:
+                        extra_check(value[name], f"{path}/{name}", errors)
+        return [check_object]
+
+    def _array_checks(self, schema: Dict[str, Any]) -> List[Check]:
+        items = self.compile(schema.get("items"))
+        min_items, max_items = schema.get("minItems"), schema.get("maxItems")
+        unique = schema.get("uniqueItems", False)
+        if items is _noop and min_items is None and max_items is None and not unique:
+            return []
+
+        def check_array(value, path, errors):
+            if not isinstance(value, list):
+                return
+            if min_items is not None and len(value) < min_items:
+                errors.append({"path": path or "/", "message": f"expected at least {min_items} items"})
+            if max_items is not None and len(value) > max_items:
+                errors.append({"path": path or "/", "message": f"expected at most {max_items} items"})
+            if unique and len({repr(v) for v in value}) != len(value):
+                errors.append({"path": path or "/", "message": "items are not unique"})
+            if items is not _noop:
+                for i, item in enumerate(value):
+                    items(item, f"{path}/{i}", errors)
+                    if len(errors) > MAX_ERRORS:
+                        return
+        return [check_array]
+
+    def _string_checks(self, schema: Dict[str, Any]) -> List[Check]:
+        min_len, max_len = schema.get("minLength"), schema.get("maxLength")
+        pattern = self._pattern(schema.get("pattern"))
+        fmt = _FORMATS.get(schema.get("format"))
+        if min_len is None and max_len is None and pattern is None and fmt is None:
+            return []
+
+        def check_string(value, path, errors):
+            if not isinstance(value, str):
+                return
+            if min_len is not None and len(value) < min_len:
+                errors.append({"path": path or "/", "message": f"shorter than {min_len}"})
+            if max_len is not None and len(value) > max_len:
+                errors.append({"path": path or "/", "message": f"longer than {max_len}"})
+            if pattern is not None and not pattern.search(value):
+                errors.append({"path": path or "/", "message": f"does not match {pattern.pattern!r}"})
+            if fmt is not None and not fmt.match(value):
+                errors.append({"path": path or "/", "message": f"not a valid {schema['format']}"})
+        return [check_string]
+
+    def _number_checks(self, schema: Dict[str, Any]) -> List[Check]:
+        bounds = []
+        minimum, maximum = schema.get("minimum"), schema.get("maximum")
+        ex_min, ex_max = schema.get("exclusiveMinimum"), schema.get("exclusiveMaximum")
+        # OpenAPI 3.0 flags (booleans) vs 3.1 bounds (numbers)
+        if ex_min is True:
+            ex_min, minimum = minimum, None
+        if ex_max is True:
+            ex_max, maximum = maximum, None
+        if minimum is not None:
+            bounds.append((lambda v, b=minimum: v >= b, f">= {minimum}"))
+        if maximum is not None:
+            bounds.append((lambda v, b=maximum: v <= b, f"<= {maximum}"))
+        if isinstance(ex_min, (int, float)) and not isinstance(ex_min, bool):
+            bounds.append((lambda v, b=ex_min: v > b, f"> {ex_min}"))
+        if isinstance(ex_max, (int, float)) and not isinstance(ex_max, bool):
+            bounds.append((lambda v, b=ex_max: v < b, f"< {ex_max}"))
+        multiple = schema.get("multipleOf")
+        if multiple:
+            bounds.append((lambda v, m=multiple: abs(v / m - round(v / m)) < 1e-9, f"a multiple of {multiple}"))
+        if not bounds:
+            return []
+
+        def check_number(value, path, errors):
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                return
+            for ok, rule in bounds:
+                if not ok(value):
+                    errors.append({"path": path or "/", "message": f"{value} is not {rule}"})
+        return [check_number]
+
+    def _combinator_checks(self, schema: Dict[str, Any]) -> List[Check]:
+        checks: List[Check] = []
+        for sub in schema.get("allOf", []):
+            compiled = self.compile(sub)
+            if compiled is not _noop:
+                checks.append(compiled)
+
+        for key in ("anyOf", "oneOf"):
+            if key not in schema:
+                continue
+            options = [self.compile(sub) for sub in schema[key]]
+            exactly_one = key == "oneOf"
+
+            def check_options(value, path, errors, options=options, exactly_one=exactly_one, key=key):
+                matched = 0
+                for option in options:
+                    trial: Errors = []
+                    option(value, path, trial)
+                    if not trial:
+                        matched += 1
+                        if not exactly_one:
+                            return
+                if matched == 0:
+                    errors.append({"path": path or "/", "message": f"matches none of the {key} alternatives"})
+                elif exactly_one and matched > 1:
+                    errors.append({"path": path or "/", "message": f"matches {matched} oneOf alternatives"})
+            checks.append(check_options)
+        return checks
+
+
+class ResponseValidators:
+    # Compiled validators per (operation, status), built on first use and kept with the spec
+    def __init__(self, spec: ParsedSpec):
+        self.spec = spec
+        self.compiler = SchemaCompiler(spec)
+        self._cache: Dict[Tuple[str, str], Check] = {}
+        self.compiled = 0
+        self.validated = 0
+
+    def for_response(self, endpoint: ApiEndpoint, status: Any) -> Check:
+        key = (get_operation_id(endpoint), str(status))
+        check = self._cache.get(key)
+        if check is None:
+            check = self.compiler.compile(self.spec.response_schema(endpoint, status))
+            self._cache[key] = check
+            self.compiled += 1
+        return check
+
+    def validate(self, endpoint: ApiEndpoint, status: Any, body: Any) -> Optional[Errors]:
+        # None when the response has no declared schema, else the (possibly empty) error list
+        check = self.for_response(endpoint, status)
+        if check is _noop:
+            return None
+        self.validated += 1
+        errors: Errors = []
+        check(body, "", errors)
+        if len(errors) > MAX_ERRORS:
+            errors = errors[:MAX_ERRORS] + [{"path": "/", "message": f"{len(errors) - MAX_ERRORS} more errors"}]
+        return errors
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "compiled": self.compiled,
+            "validated": self.validated,
+            "shared_refs": len(self.compiler._refs),
+            "notes": list(self.compiler.notes)
+        }
+
+
+_validators: "weakref.WeakKeyDictionary[ParsedSpec, ResponseValidators]" = weakref.WeakKeyDictionary()
+
+
+def response_validators(spec: ParsedSpec) -> ResponseValidators:
+    validators = _validators.get(spec)
+    if validators is None:
+        validators = ResponseValidators(spec)
+        _validators[spec] = validators
+    return validators
@@ -1,14 +1,32 @@
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Dict, Any, List, Optional
-import httpx
+import asyncio
 import logging
+import os
+import uuid
+from collections import OrderedDict
 
 from models import ApiEndpoint, TestExecutionResult
-from core.parser import fetch_swagger, parse_swagger_endpoints
-from core.runner import execute_test_step
-from core.ai import generate_ai_test_data, diagnose_error, chat_with_context
+from core.spec_cache import SpecCache
+from core.runner import execute_test_step, get_operation_id
+from core.scheduler import run_dag, run_sequential, select_affected
+from core.spec_diff import affected_operations
+from core.streaming import RunStream, encode_ndjson, encode_sse
+from core.http_pool import ClientPool
+from core.load import run_load
+from core.resolver import RunResolver, producer_index, needed_variables, fill_placeholders
+from core.batch import run_batch
+from core.validation import response_validators
+from core.sessions import SessionStore
+from core.sharding import ShardCoordinator, run_sharded
+from core.results_store import ResultsStore
+from core.baselines import LatencyPolicy, LatencyJudge, capture_baselines
+from core.ai import gateway, ai_cache, generate_test_data, diagnose_error, diagnose_errors, chat_with_context
 
 class DiagnoseRequest(BaseModel):
     apiKey: str
@@ -16,6 +34,15 @@ class DiagnoseRequest(BaseModel):
     requestBody: Any
     responseBody: Any
 
+class FailureCase(BaseModel):
+    endpoint: Dict[str, Any]
+    requestBody: Any
+    responseBody: Any
+
+class DiagnoseBatchRequest(BaseModel):
+    apiKey: str
+    failures: List[FailureCase]
+
 class ChatRequest(BaseModel):
     apiKey: str
     message: str
@@ -27,7 +54,29 @@ class ChatRequest(BaseModel):
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Antigravity API Automation")
+# Process-lifetime HTTP clients, one keep-alive pool per target host
+client_pool = ClientPool()
+# Parsed specs, revalidated with conditional requests on each /parse
+spec_cache = SpecCache()
+# Per-run dependency resolvers (runId -> resolver), so each producer is fetched once per run
+run_resolvers: "OrderedDict[str, RunResolver]" = OrderedDict()
+MAX_RUN_RESOLVERS = 64
+# Server-held run contexts; clients reference a session id and send only deltas
+session_store = SessionStore(ttl=float(os.getenv("API_SESSION_TTL", "1800")))
+# Sharded jobs that worker nodes (shard_worker.py) pull from this backend
+shard_coordinator = ShardCoordinator(lease=float(os.getenv("API_SHARD_LEASE", "300")))
+# Run history (API_RESULTS_DB=off disables it); writes are batched on a background thread
+results_store = ResultsStore.from_env()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await client_pool.close()
+    await gateway.close()
+    if results_store is not None:
+        results_store.close()
+
+app = FastAPI(title="Antigravity API Automation", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -40,8 +89,12 @@ class ParseRequest(BaseModel):
     url: str
 
 class GenerateDataRequest(BaseModel):
-    apiKey: str
+    apiKey: Optional[str] = None  # without a key only the local generator is used
     endpoints: List[ApiEndpoint]
+    specUrl: Optional[str] = None  # lets the prompt use resolved schemas from the parsed spec
+    mode: str = "auto"  # auto | local | ai
+    seed: Optional[int] = None  # same seed, same data
+    resolveIds: bool = False  # data runs through /run-step(s) with a runId: required ids become {{name}} for the resolver
 
 class RunRequest(BaseModel):
     baseUrl: str
@@ -49,6 +102,98 @@ class RunRequest(BaseModel):
     endpoint: Optional[ApiEndpoint] = None
     testData: Optional[Dict[str, Any]] = {}
     variables: Dict[str, Any] = {}
+    # Run independent endpoints concurrently, ordered by their data dependencies
+    parallel: bool = False
+    maxConcurrency: int = 8
+    # Only re-test operations whose contract changed in the latest version of specUrl (plus dependents)
+    specUrl: Optional[str] = None
+    changedOnly: bool = False
+    # Lets /run-step resolve missing ids server-side and reuse producer responses across steps
+    runId: Optional[str] = None
+    # Check JSON responses against the schemas declared in specUrl
+    validateSchema: bool = True
+    # Compare each step's latency with the stored baseline for baseUrl (see /baselines);
+    # latency overrides LatencyPolicy fields (z, minRatio, minDeltaMs, failOnRegression, ...)
+    checkLatency: bool = True
+    latency: Optional[Dict[str, Any]] = None
+
+class StepRef(BaseModel):
+    operationId: str
+    # Overrides for this step only; everything else comes from testData[operationId]
+    body: Any = None
+    parameters: Dict[str, Any] = {}
+
+class BatchRunRequest(BaseModel):
+    baseUrl: str
+    specUrl: str  # must have been parsed already; endpoints are looked up there by operationId
+    steps: List[StepRef]
+    testData: Dict[str, Any] = {}
+    variables: Dict[str, Any] = {}
+    runId: Optional[str] = None
+    validateSchema: bool = True
+    checkLatency: bool = True
+    latency: Optional[Dict[str, Any]] = None
+
+class SessionCreateRequest(BaseModel):
+    specUrl: str
+    baseUrl: str
+    testData: Dict[str, Any] = {}
+    variables: Dict[str, Any] = {}
+
+class SessionDelta(BaseModel):
+    # Merged into the session before anything runs; unset removes variables
+    variables: Dict[str, Any] = {}
+    testData: Dict[str, Any] = {}
+    unset: List[str] = []
+
+class SessionRunRequest(SessionDelta):
+    steps: List[StepRef]
+
+class ShardJobRequest(BaseModel):
+    specUrl: str  # must have been parsed already
+    baseUrl: str
+    operationIds: Optional[List[str]] = None  # default: every operation in the spec
+    testData: Dict[str, Any] = {}
+    variables: Dict[str, Any] = {}
+    shards: int = 4
+    by: str = "component"  # component | tag; dependent operations always share a shard
+    concurrency: int = 8  # per shard
+    processes: Optional[int] = None  # /run/sharded only; default min(shards, CPUs)
+    validateSchema: bool = True
+
+class BaselineCaptureRequest(BaseModel):
+    baseUrl: str
+    runs: int = 5  # latest recorded runs against baseUrl to learn from; the oldest `warmup` of them are dropped
+    operationIds: Optional[List[str]] = None
+    latency: Optional[Dict[str, Any]] = None  # warmup, outliers, madK, minSamples
+
+class ShardClaimRequest(BaseModel):
+    jobId: Optional[str] = None
+
+class ShardReport(BaseModel):
+    # What shard_worker.py posts back (core.sharding.execute_shard)
+    jobId: Optional[str] = None
+    shard: int
+    worker: Optional[str] = None
+    startedAt: float
+    finishedAt: float
+    elapsed: float
+    results: List[Dict[str, Any]]  # each carries the test's "index" in the job
+
+class LoadRequest(BaseModel):
+    baseUrl: str
+    endpoints: List[ApiEndpoint]
+    testData: Optional[Dict[str, Any]] = {}
+    variables: Dict[str, Any] = {}
+    duration: float = 10.0
+    # Target requests/second (open loop) or a fixed number of workers (closed loop)
+    rate: Optional[float] = None
+    concurrency: Optional[int] = None
+    weights: Dict[str, float] = {}
+    maxInFlight: int = 1000
+    seed: Optional[int] = None
+    specUrl: Optional[str] = None
+    validateSchema: bool = True
 
 @app.get("/")
 def health_check():
@@ -58,73 +203,558 @@ def health_check():
 async def parse_api(request: ParseRequest):
     logger.info(f"Parsing Swagger from: {request.url}")
     try:
-        swagger = await fetch_swagger(request.url)
-        endpoints = parse_swagger_endpoints(swagger)
-        return {"endpoints": endpoints, "raw": swagger}
+        spec = await spec_cache.load(request.url)
+        return {"endpoints": spec.endpoints, "raw": spec.raw, "diff": spec_cache.diff(request.url)}
     except Exception as e:
         logger.error(f"Error parsing swagger: {e}")
         raise HTTPException(status_code=400, detail=str(e))
 
+@app.get("/parse/cache")
+def parse_cache_stats():
+    return spec_cache.stats()
+
 @app.post("/generate-data")
 async def generate_data(request: GenerateDataRequest):
-    logger.info("Generating test data using AI")
+    logger.info(f"Generating test data ({request.mode})")
+    if request.mode not in ("auto", "local", "ai"):
+        raise HTTPException(status_code=400, detail=f"Unknown mode '{request.mode}'")
+    if request.mode == "ai" and not request.apiKey:
+        raise HTTPException(status_code=400, detail="apiKey is required for mode 'ai'")
     try:
-        data = generate_ai_test_data(request.apiKey, request.endpoints)
-        return {"testData": data}
+        spec = spec_cache.get(request.specUrl) if request.specUrl else None
+        data, issues = await generate_test_data(request.apiKey, request.endpoints, spec, request.mode, request.seed, request.resolveIds)
+        return {"testData": data, "issues": issues}
     except Exception as e:
         logger.error(f"Error generating data: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _validators_for(spec_url: Optional[str], enabled: bool):
+    # Compiled once per spec and operation; None when there is no parsed spec to check against
+    spec = spec_cache.get(spec_url) if enabled and spec_url else None
+    return response_validators(spec) if spec is not None else None
+
+def _policy(overrides: Optional[Dict[str, Any]]) -> LatencyPolicy:
+    try:
+        return LatencyPolicy.from_dict(overrides)
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _judge_for(base_url: str, enabled: bool, overrides: Optional[Dict[str, Any]]) -> Optional[LatencyJudge]:
+    # Baselines are cached in memory per target, so this is a dict lookup after the first run
+    if not enabled or results_store is None:
+        return None
+    baselines = results_store.baselines(base_url)
+    return LatencyJudge(baselines, _policy(overrides)) if baselines else None
+
+def _recorder(run_id: str, on_result=None, judge: Optional[LatencyJudge] = None):
+    # Every result is judged against its latency baseline and goes to the history store
+    # (an in-memory append) before the caller sees it
+    async def record(i, result):
+        if judge is not None:
+            judge(result)
+        if results_store is not None:
+            results_store.record(run_id, result)
+        if on_result is not None:
+            await on_result(i, result)
+    return record
+
+def _start_run(run_id: Optional[str], source: str, base_url: Optional[str], spec_url: Optional[str]) -> str:
+    run_id = run_id or uuid.uuid4().hex
+    if results_store is not None:
+        results_store.start_run(run_id, source, base_url, spec_url)
+    return run_id
+
+def _finish_run(run_id: str):
+    if results_store is not None:
+        results_store.finish_run(run_id)
+
+def _select_changed(request: RunRequest) -> Optional[List[int]]:
+    diff = spec_cache.diff(request.specUrl) if request.specUrl else None
+    if diff is None:
+        # No earlier version of this source to compare against: run everything
+        return None
+    return select_affected(request.endpoints, request.testData, affected_operations(diff))
+
+async def _run_suite(request: RunRequest, on_result=None):
+    request.runId = _start_run(request.runId, "suite", request.baseUrl, request.specUrl)
+    judge = _judge_for(request.baseUrl, request.checkLatency, request.latency)
+    on_result = _recorder(request.runId, on_result, judge)
+    client = await client_pool.get(request.baseUrl)
+    endpoints = request.endpoints
+    validators = _validators_for(request.specUrl, request.validateSchema)
+    selected = _select_changed(request) if request.changedOnly else None
+    if selected is not None:
+        logger.info(f"Changed-only run: {len(selected)} of {len(endpoints)} endpoints")
+        endpoints = [endpoints[i] for i in selected]
+        if on_result is not None:
+            # Report indices against the full endpoint list the client sent
+            report = on_result
+
+            async def on_result(i, result):
+                await report(selected[i], result)
+
+    try:
+        if request.parallel:
+            return await run_dag(
+                client,
+                endpoints,
+                request.baseUrl,
+                request.variables,
+                request.testData,
+                max_concurrency=request.maxConcurrency,
+                on_result=on_result,
+                validators=validators
+            )
+        return await run_sequential(
+            client,
+            endpoints,
+            request.baseUrl,
+            request.variables,
+            request.testData,
+            on_result=on_result,
+            validators=validators
+        )
+    finally:
+        _finish_run(request.runId)
+
 @app.post("/run")
 async def run_tests(request: RunRequest):
     logger.info("Starting test execution")
-    results = []
-    async with httpx.AsyncClient() as client:
-        for endpoint in request.endpoints:
-            # Execute step
-            result = await execute_test_step(
-                client, 
-                endpoint, 
-                request.baseUrl, 
-                request.variables, 
-                request.testData
-            )
-            results.append(result)
-            
-            # Simple stop on failure for now? Or continue?
-            # User requirement: "Pass/Fail indicators per API" implies continue.
-            
-            # Update variables from response if needed (Feature: runtime variables)
-            # This logic needs to be added to runner.py or here.
-            # Simplified for now.
-            
-    return {"results": results}
+    results = await _run_suite(request)
+    return {"results": results, "runId": request.runId}
+
+@app.post("/run/stream")
+async def run_tests_stream(request: RunRequest, http_request: Request, format: str = "ndjson"):
+    # Emits each result as soon as it completes instead of one blocking response
+    logger.info(f"Starting streamed test execution ({format})")
+    # Assigned up front so the final "done" event can carry it
+    request.runId = request.runId or uuid.uuid4().hex
+    stream = RunStream(lambda on_result: _run_suite(request, on_result), done_info={"runId": request.runId})
+    return _stream_response(stream, format, http_request)
+
+def _stream_response(stream: RunStream, format: str, http_request: Request) -> StreamingResponse:
+    # NDJSON or SSE body for a RunStream; a client that goes away cancels the run
+    encode = encode_sse if format == "sse" else encode_ndjson
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+
+    async def body():
+        async for event in stream.events():
+            if await http_request.is_disconnected():
+                logger.info("Client disconnected, cancelling run")
+                break
+            yield encode(event)
+
+    return StreamingResponse(body(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+@app.websocket("/ws/run")
+async def run_tests_ws(websocket: WebSocket):
+    # Protocol: client sends one RunRequest, then may send {"type": "cancel"} at any time
+    await websocket.accept()
+    try:
+        request = RunRequest(**await websocket.receive_json())
+    except Exception as e:
+        await websocket.send_json({"type": "error", "error": str(e)})
+        await websocket.close()
+        return
+
+    request.runId = request.runId or uuid.uuid4().hex
+    stream = RunStream(lambda on_result: _run_suite(request, on_result), done_info={"runId": request.runId})
+    disconnected = False
+
+    async def listen_for_cancel():
+        nonlocal disconnected
+        try:
+            while True:
+                try:
+                    message = await websocket.receive_json()
+                except ValueError:
+                    # Not JSON; only cancel messages mean anything here
+                    continue
+                if isinstance(message, dict) and message.get("type") == "cancel":
+                    break
+        except WebSocketDisconnect:
+            logger.info("WebSocket closed, cancelling run")
+            disconnected = True
+        stream.cancel()
+
+    listener = asyncio.create_task(listen_for_cancel())
+    try:
+        async for event in stream.events():
+            if disconnected:
+                break
+            await websocket.send_json(jsonable_encoder(event))
+    except WebSocketDisconnect:
+        logger.info("WebSocket closed, cancelling run")
+        disconnected = True
+    finally:
+        # Always reap the listener, so its exceptions are retrieved and it never outlives the socket
+        listener.cancel()
+        await asyncio.gather(listener, return_exceptions=True)
+        stream.cancel()
+    if not disconnected:
+        await websocket.close()
+
+@app.post("/load")
+async def load_test(request: LoadRequest):
+    logger.info(f"Starting load test: rate={request.rate} concurrency={request.concurrency} duration={request.duration}s")
+    client = await client_pool.get(request.baseUrl)
+    try:
+        return await run_load(
+            client,
+            request.endpoints,
+            request.baseUrl,
+            request.variables,
+            request.testData,
+            duration=request.duration,
+            rate=request.rate,
+            concurrency=request.concurrency,
+            weights=request.weights,
+            max_in_flight=request.maxInFlight,
+            seed=request.seed,
+            validators=_validators_for(request.specUrl, request.validateSchema)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _resolver_for(spec_url: Optional[str], run_id: Optional[str]) -> Optional[RunResolver]:
+    spec = spec_cache.get(spec_url) if spec_url else None
+    if spec is None:
+        return None
+    if run_id is None:
+        return RunResolver(producer_index(spec))
+
+    resolver = run_resolvers.get(run_id)
+    if resolver is None or resolver.index.spec is not spec:
+        resolver = RunResolver(producer_index(spec))
+        run_resolvers[run_id] = resolver
+        while len(run_resolvers) > MAX_RUN_RESOLVERS:
+            run_resolvers.popitem(last=False)
+    run_resolvers.move_to_end(run_id)
+    return resolver
 
 @app.post("/run-step")
 async def run_step(request: RunRequest):
     logger.info("Executing single test step")
-    async with httpx.AsyncClient() as client:
-        endpoint = request.endpoint
-        if not endpoint and request.endpoints:
-            endpoint = request.endpoints[0]
-            
-        if not endpoint:
-            raise HTTPException(status_code=400, detail="No endpoint provided")
-
-        result = await execute_test_step(
-            client, 
-            endpoint, 
-            request.baseUrl, 
-            request.variables, 
-            request.testData
+    endpoint = request.endpoint
+    if not endpoint and request.endpoints:
+        endpoint = request.endpoints[0]
+        
+    if not endpoint:
+        raise HTTPException(status_code=400, detail="No endpoint provided")
+
+    client = await client_pool.get(request.baseUrl)
+    variables, test_data, learned = request.variables, request.testData, {}
+
+    # Fill missing path params and placeholder ids from the spec's producer index
+    resolver = _resolver_for(request.specUrl, request.runId)
+    if resolver is not None:
+        op_id = get_operation_id(endpoint)
+        op_data = test_data.get(op_id, {})
+        body = op_data.get("body")
+        learned = await resolver.resolve(needed_variables(endpoint, body), client, request.baseUrl, variables)
+        variables = {**variables, **learned}
+        if body is not None:
+            test_data = {**test_data, op_id: {**op_data, "body": fill_placeholders(body, variables)}}
+
+    result = await execute_test_step(
+        client, 
+        endpoint, 
+        request.baseUrl, 
+        variables, 
+        test_data,
+        validators=_validators_for(request.specUrl, request.validateSchema)
+    )
+    judge = _judge_for(request.baseUrl, request.checkLatency, request.latency)
+    if judge is not None:
+        judge(result)
+    if results_store is not None and request.runId:
+        # Step-by-step UI runs share the runId of the whole pass
+        _start_run(request.runId, "steps", request.baseUrl, request.specUrl)
+        results_store.record(request.runId, result)
+    return {"results": [result], "learned": learned}
+
+@app.post("/run-steps")
+async def run_steps(request: BatchRunRequest, http_request: Request, format: str = "json"):
+    # Many steps in one round-trip; format=ndjson|sse streams each result as it completes
+    logger.info(f"Executing batch of {len(request.steps)} steps ({format})")
+    spec = spec_cache.get(request.specUrl)
+    if spec is None:
+        raise HTTPException(status_code=404, detail="Spec not parsed yet; call /parse first")
+
+    client = await client_pool.get(request.baseUrl)
+    resolver = _resolver_for(request.specUrl, request.runId)
+    steps = [step.model_dump() for step in request.steps]
+
+    def run(on_result=None):
+        return run_batch(
+            client,
+            spec,
+            resolver,
+            steps,
+            request.baseUrl,
+            request.variables,
+            request.testData,
+            on_result=on_result,
+            validate_schema=request.validateSchema
+        )
+
+    run_id = _start_run(request.runId, "batch", request.baseUrl, request.specUrl)
+    judge = _judge_for(request.baseUrl, request.checkLatency, request.latency)
+    return await _batch_response(run, format, http_request, run_id, judge)
+
+async def _batch_response(run, format: str, http_request: Request, run_id: str, judge: Optional[LatencyJudge] = None):
+    async def recorded(on_result=None):
+        try:
+            return await run(_recorder(run_id, on_result, judge))
+        finally:
+            _finish_run(run_id)
+
+    if format == "json":
+        results, learned = await recorded()
+        return {"results": results, "learned": learned, "runId": run_id}
+
+    return _stream_response(RunStream(recorded, done_info={"runId": run_id}), format, http_request)
+
+@app.get("/sessions")
+def session_stats():
+    return session_store.stats()
+
+@app.post("/sessions")
+async def create_session(request: SessionCreateRequest):
+    spec = spec_cache.get(request.specUrl)
+    if spec is None:
+        raise HTTPException(status_code=404, detail="Spec not parsed yet; call /parse first")
+    session = session_store.create(spec, request.specUrl, request.baseUrl, request.testData, request.variables)
+    logger.info(f"Created run session {session.id}")
+    return session.summary(session_store.ttl)
+
+def _session(session_id: str):
+    session = session_store.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired session")
+    return session
+
+@app.get("/sessions/{session_id}")
+def get_session(session_id: str, full: bool = False):
+    session = _session(session_id)
+    summary = session.summary(session_store.ttl)
+    if full:
+        summary["variableValues"] = session.variables
+    return summary
+
+@app.patch("/sessions/{session_id}")
+async def update_session(session_id: str, delta: SessionDelta):
+    session = _session(session_id)
+    async with session.lock:
+        session.apply(delta.variables, delta.testData, delta.unset)
+    return session.summary(session_store.ttl)
+
+@app.delete("/sessions/{session_id}")
+def delete_session(session_id: str):
+    if not session_store.delete(session_id):
+        raise HTTPException(status_code=404, detail="Unknown or expired session")
+    return {"deleted": session_id}
+
+@app.post("/sessions/{session_id}/run-steps")
+async def run_session_steps(session_id: str, request: SessionRunRequest, http_request: Request, format: str = "json"):
+    # Like /run-steps, but spec, test data and learned variables live in the session
+    session = _session(session_id)
+    logger.info(f"Session {session_id}: batch of {len(request.steps)} steps ({format})")
+    client = await client_pool.get(session.base_url)
+    steps = [step.model_dump() for step in request.steps]
+
+    async def run(on_result=None):
+        # One run at a time per session; they all extend the same context
+        async with session.lock:
+            session.apply(request.variables, request.testData, request.unset)
+            session.runs += 1
+            return await run_batch(
+                client,
+                session.spec,
+                session.resolver,
+                steps,
+                session.base_url,
+                session.variables,
+                session.test_data,
+                on_result=on_result
+            )
+
+    # One history run per session: every batch extends it
+    run_id = _start_run(session.id, "session", session.base_url, session.spec_url)
+    return await _batch_response(run, format, http_request, run_id, _judge_for(session.base_url, True, None))
+
+def _shard_inputs(request: ShardJobRequest):
+    spec = spec_cache.get(request.specUrl)
+    if spec is None:
+        raise HTTPException(status_code=404, detail="Spec not parsed yet; call /parse first")
+    endpoints = spec.endpoints
+    if request.operationIds is not None:
+        wanted = set(request.operationIds)
+        endpoints = [ep for ep in endpoints if get_operation_id(ep) in wanted]
+    options = {"concurrency": request.concurrency, "validate": request.validateSchema}
+    return spec, endpoints, options
+
+@app.post("/run/sharded")
+async def run_tests_sharded(request: ShardJobRequest):
+    # Shards run in a local process pool (one event loop each) and come back as one merged report
+    spec, endpoints, options = _shard_inputs(request)
+    logger.info(f"Sharded run: {len(endpoints)} endpoints in {request.shards} shards")
+    try:
+        report = await run_sharded(
+            spec, endpoints, request.baseUrl, request.variables, request.testData,
+            request.shards, processes=request.processes, by=request.by, options=options
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    report["runId"] = _start_run(None, "sharded", request.baseUrl, request.specUrl)
+    judge = _judge_for(request.baseUrl, True, None)
+    for result in report["results"]:
+        if result is None:
+            continue
+        if judge is not None:
+            judge(result)
+        if results_store is not None:
+            results_store.record(report["runId"], result)
+    _finish_run(report["runId"])
+    return report
+
+@app.post("/shards/jobs")
+def submit_shard_job(request: ShardJobRequest):
+    spec, endpoints, options = _shard_inputs(request)
+    try:
+        job = shard_coordinator.submit(
+            spec, endpoints, request.baseUrl, request.variables, request.testData,
+            request.shards, by=request.by, options=options
         )
-        return {"results": [result]}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    _start_run(job.id, "sharded", request.baseUrl, request.specUrl)
+    logger.info(f"Shard job {job.id}: {len(endpoints)} endpoints in {len(job.payloads)} shards")
+    return job.status()
+
+def _shard_job(job_id: str):
+    job = shard_coordinator.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown shard job")
+    return job
+
+@app.get("/shards")
+def shard_stats():
+    return shard_coordinator.stats()
+
+@app.get("/shards/jobs/{job_id}")
+def shard_job_status(job_id: str):
+    return _shard_job(job_id).status()
+
+@app.get("/shards/jobs/{job_id}/spec")
+def shard_job_spec(job_id: str):
+    # Workers fetch the raw spec once per job (payloads only carry its hash)
+    job = _shard_job(job_id)
+    return job.spec.raw if job.spec is not None else {}
+
+@app.post("/shards/claim")
+def claim_shard(request: ShardClaimRequest):
+    payload = shard_coordinator.claim(request.jobId)
+    if payload is None:
+        return Response(status_code=204)
+    return payload
+
+@app.post("/shards/jobs/{job_id}/results")
+def submit_shard_results(job_id: str, request: ShardReport):
+    job = _shard_job(job_id)
+    if request.jobId is not None and request.jobId != job.id:
+        raise HTTPException(status_code=400, detail=f"Report is for job {request.jobId}, not {job.id}")
+    if not 0 <= request.shard < len(job.payloads):
+        raise HTTPException(status_code=400, detail=f"Job {job.id} has no shard {request.shard}")
+    # A shard may only report its own tests, never overwrite another shard's
+    owned = set(job.payloads[request.shard]["indices"])
+    if any(not isinstance(r.get("index"), int) or r["index"] not in owned for r in request.results):
+        raise HTTPException(status_code=400, detail=f"Results must carry indices of shard {request.shard}'s tests")
+    report = request.model_dump()
+    if not job.complete(report):
+        raise HTTPException(status_code=409, detail=f"Shard {request.shard} already reported or unknown")
+    judge = _judge_for(job.payloads[0]["baseUrl"], True, None) if job.payloads else None
+    for result in report["results"]:
+        if judge is not None:
+            judge(result)
+        if results_store is not None:
+            results_store.record(job.id, result)
+    if job.done:
+        _finish_run(job.id)
+    return {key: value for key, value in job.status().items() if key != "report"}
+
+def _history():
+    if results_store is None:
+        raise HTTPException(status_code=404, detail="Results history is disabled (API_RESULTS_DB=off)")
+    return results_store
+
+@app.get("/history/runs")
+async def history_runs(limit: int = 50):
+    return await asyncio.to_thread(_history().runs, limit)
+
+@app.get("/history/runs/{run_id}")
+async def history_run(run_id: str):
+    run = await asyncio.to_thread(_history().run, run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Unknown run")
+    return run
+
+@app.get("/history/operations/{operation_id}")
+async def history_series(operation_id: str, since: Optional[float] = None, limit: int = 1000):
+    # Latency / status time series for one operation, oldest first
+    return await asyncio.to_thread(_history().series, operation_id, since, limit)
+
+@app.get("/history/rollup")
+async def history_rollup(since: Optional[float] = None, until: Optional[float] = None, operationId: Optional[str] = None):
+    return await asyncio.to_thread(_history().rollup, since, until, operationId)
+
+@app.get("/history/regressions")
+async def history_regressions(window: float = 86400, baseline: float = 7 * 86400, threshold: float = 1.5,
+                              minSamples: int = 5, metric: str = "p50"):
+    if metric not in ("p50", "p90", "p99", "mean"):
+        raise HTTPException(status_code=400, detail=f"Unknown metric '{metric}'")
+    return await asyncio.to_thread(_history().regressions, window, baseline, threshold, minSamples, metric)
+
+@app.post("/baselines/capture")
+async def capture_latency_baselines(request: BaselineCaptureRequest):
+    # Median / percentiles per operation over the latest warm runs already in the history
+    store = _history()
+    policy = _policy(request.latency)
+    baselines = await asyncio.to_thread(capture_baselines, store, request.baseUrl, request.runs, policy, request.operationIds)
+    logger.info(f"Captured {len(baselines)} latency baselines for {request.baseUrl}")
+    return {op: {k: v for k, v in b.items() if k != "samples"} for op, b in baselines.items()}
+
+@app.get("/baselines")
+def get_latency_baselines(baseUrl: str, samples: bool = False):
+    baselines = _history().baselines(baseUrl)
+    if samples:
+        return baselines
+    return {op: {k: v for k, v in b.items() if k != "samples"} for op, b in baselines.items()}
+
+@app.delete("/baselines")
+def delete_latency_baselines(baseUrl: str, operationId: Optional[List[str]] = Query(None)):
+    return {"deleted": _history().delete_baselines(baseUrl, operationId)}
+
+@app.get("/history/stats")
+def history_stats():
+    return _history().stats()
+
+@app.get("/producers")
+def producers(url: str):
+    spec = spec_cache.get(url)
+    if spec is None:
+        raise HTTPException(status_code=404, detail="Spec not parsed yet")
+    return producer_index(spec).as_dict()
+
+@app.get("/pool/stats")
+def pool_stats():
+    return client_pool.stats()
 
 @app.post("/diagnose")
 async def diagnose(request: DiagnoseRequest):
     logger.info("Diagnosing API failure using AI")
     try:
-        diagnosis = diagnose_error(
+        diagnosis = await diagnose_error(
             request.apiKey, 
             request.endpoint, 
             request.requestBody, 
@@ -136,6 +766,27 @@ async def diagnose(request: DiagnoseRequest):
         raise HTTPException(status_code=500, detail=str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/diagnose/batch")
+async def diagnose_batch(request: DiagnoseBatchRequest):
+    # Several failures per prompt; results come back in request order
+    logger.info(f"Diagnosing {len(request.failures)} API failures using AI")
+    failures = [f.model_dump() for f in request.failures]
+    try:
+        return {"diagnoses": await diagnose_errors(request.apiKey, failures)}
+    except Exception as e:
+        logger.error(f"Error diagnosing failures: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/ai/stats")
+def ai_stats():
+    return {"gateway": gateway.stats(), "cache": ai_cache.stats() if ai_cache else None}
+
+@app.delete("/ai/cache")
+def clear_ai_cache():
+    if ai_cache:
+        ai_cache.clear()
+    return {"cleared": ai_cache is not None}
+
 @app.post("/chat")
 async def chat_interaction(request: ChatRequest):
     logger.info("Executing Chat Interaction")
@@ -143,7 +794,7 @@ async def chat_interaction(request: ChatRequest):
         raise HTTPException(status_code=400, detail="API Key is required")
         
     try:
-        reply = chat_with_context(
+        reply = await chat_with_context(
             request.apiKey,
             request.endpoints,
             request.message,
@@ -14,7 +14,7 @@ class ApiEndpoint(BaseModel):
     parameters: List[Dict[str, Any]] = []
     requestBody: Optional[Dict[str, Any]] = None
     responses: Dict[str, Any] = {}
-    security: List[Dict[str, Any]] = []
+    security: Optional[List[Dict[str, Any]]] = None  # None: inherits the spec's global security; []: public
 
 class SwaggerDoc(BaseModel):
     openapi: str
@@ -32,3 +32,9 @@ class TestExecutionResult(BaseModel):
     response: Any = None
     error: Optional[str] = None
     healed: Optional[bool] = False
+    schemaErrors: Optional[List[Dict[str, Any]]] = None  # per-field contract violations (path, message)
+    verdict: Optional[str] = None  # latency vs stored baseline: ok | regressed | improved | no_baseline
+    latency: Optional[Dict[str, Any]] = None  # baselineMedian, ratio, z behind the verdict
+    timings: Optional[Dict[str, Any]] = None  # ms per phase: queue, connect, tls, send, ttfb, download, total
+    requestBytes: Optional[int] = None
+    responseBytes: Optional[int] = None  # as received on the wire
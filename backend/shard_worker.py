@@ -0,0 +1,74 @@
+import argparse
+import asyncio
+import multiprocessing
+import sys
+from typing import Optional, Set
+
+import httpx
+
+from core.sharding import execute_shard, worker_spec
+
+# Worker node for sharded runs: pulls shards from a backend's coordinator (/shards/claim),
+# runs them against the API under test and posts the results back.
+# Usage: python shard_worker.py http://coordinator:8000 [--job JOB_ID] [--processes N] [--exit-when-idle]
+
+
+async def work(coordinator: str, job_id: Optional[str], poll: float, exit_when_idle: bool) -> int:
+    done = 0
+    seen: Set[str] = set()
+    async with httpx.AsyncClient(base_url=coordinator.rstrip("/"), timeout=60.0) as api:
+        while True:
+            resp = await api.post("/shards/claim", json={"jobId": job_id})
+            resp.raise_for_status()
+            if resp.status_code == 204:
+                if exit_when_idle:
+                    return done
+                await asyncio.sleep(poll)
+                continue
+
+            payload = resp.json()
+            spec_hash = payload.get("specHash")
+            raw = None
+            if spec_hash and spec_hash not in seen:
+                # Parsed once per process and spec; later shards of the job reuse it
+                raw = (await api.get(f"/shards/jobs/{payload['jobId']}/spec")).json()
+                seen.add(spec_hash)
+            report = await execute_shard(payload, worker_spec(spec_hash, raw))
+            # Conflicts mean the lease ran out and another worker got there first; nothing to do
+            result = await api.post(f"/shards/jobs/{payload['jobId']}/results", json=report)
+            if result.status_code not in (200, 409):
+                result.raise_for_status()
+            done += 1
+            print(f"[{report['worker']}] shard {payload['shard']} of job {payload['jobId']}: "
+                  f"{len(report['results'])} tests in {report['elapsed']:.2f}s", file=sys.stderr)
+
+
+def _process_main(coordinator: str, job_id: Optional[str], poll: float, exit_when_idle: bool):
+    asyncio.run(work(coordinator, job_id, poll, exit_when_idle))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="shard_worker.py", description="Pull and run test shards from a coordinator.")
+    parser.add_argument("coordinator", help="Backend URL, e.g. http://localhost:8000")
+    parser.add_argument("--job", help="Only work on this job")
+    parser.add_argument("--processes", type=int, default=1, help="Worker processes on this machine")
+    parser.add_argument("--poll", type=float, default=1.0, help="Seconds between claims when the queue is empty")
+    parser.add_argument("--exit-when-idle", action="store_true", help="Stop once no shard is left to claim")
+    args = parser.parse_args(argv)
+
+    if args.processes <= 1:
+        _process_main(args.coordinator, args.job, args.poll, args.exit_when_idle)
+        return 0
+    procs = [
+        multiprocessing.Process(target=_process_main, args=(args.coordinator, args.job, args.poll, args.exit_when_idle))
+        for _ in range(args.processes)
+    ]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    return 0 if all(p.exitcode == 0 for p in procs) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+import itertools
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# Backend modules import each other from the backend directory (`from core.llm import ...`)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TargetAPI(BaseHTTPRequestHandler):
+    # Tiny CRUD API to run suites against: POST /<collection> creates, GET/DELETE /<collection>/<id>.
+    # Reading an id that was never created is a 404, so a passing consumer proves it got the producer's id.
+    items = {}
+    ids = itertools.count(1)
+    lock = threading.Lock()
+
+    def _reply(self, status, body=None):
+        data = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _parts(self):
+        return [p for p in self.path.split("?")[0].split("/") if p]
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        with self.lock:
+            item = {**body, "id": next(self.ids)}
+            self.items[(self._parts()[0], item["id"])] = item
+        self._reply(201, item)
+
+    def do_GET(self):
+        parts = self._parts()
+        if len(parts) == 1:
+            return self._reply(200, {"status": "ok"})
+        item = self.items.get((parts[0], int(parts[1]) if parts[1].isdigit() else parts[1]))
+        self._reply(200, item) if item else self._reply(404, {"detail": "not found"})
+
+    def do_DELETE(self):
+        parts = self._parts()
+        with self.lock:
+            item = self.items.pop((parts[0], int(parts[1]) if parts[1].isdigit() else parts[1]), None)
+        self._reply(204) if item else self._reply(404, {"detail": "not found"})
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="session")
+def target():
+    # Base URL of a TargetAPI served from a background thread
+    server = ThreadingHTTPServer(("127.0.0.1", 0), TargetAPI)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,113 @@
+import re
+
+from core import datagen
+from core.datagen import SchemaDataGenerator, _name_tokens, generate_local_test_data
+from core.schema import ParsedSpec
+
+SPEC = ParsedSpec({
+    "openapi": "3.0.0",
+    "paths": {
+        "/users": {"post": {
+            "operationId": "create_user",
+            "requestBody": {"content": {"application/json": {"schema": {"$ref": "#/components/schemas/NewUser"}}}},
+            "responses": {}
+        }},
+        "/users/{user_id}/trips": {"get": {
+            "operationId": "list_trips",
+            "parameters": [
+                {"name": "user_id", "in": "path", "required": True, "schema": {"type": "integer"}},
+                {"name": "status", "in": "query", "required": True, "schema": {"enum": ["open", "closed"]}},
+                {"name": "page", "in": "query", "schema": {"type": "integer"}}
+            ],
+            "responses": {}
+        }},
+        "/trips": {"post": {
+            "operationId": "create_trip",
+            "requestBody": {"content": {"application/json": {"schema": {
+                "type": "object",
+                "required": ["driver_id", "fare"],
+                "properties": {
+                    "driver_id": {"type": "integer"},
+                    "vehicleId": {"type": "string"},
+                    "fare": {"type": "number", "minimum": 50, "maximum": 60, "multipleOf": 5}
+                }
+            }}}},
+            "responses": {}
+        }}
+    },
+    "components": {"schemas": {"NewUser": {
+        "type": "object",
+        "required": ["candidate_name", "email", "code"],
+        "properties": {
+            "candidate_name": {"type": "string"},
+            "email": {"type": "string"},
+            "code": {"type": "string", "pattern": "^[A-Z]{2}-\\d{4}$"},
+            "role": {"type": "string", "enum": ["admin", "member"]},
+            "plan": {"const": "free"},
+            "nickname": {"type": "string", "minLength": 12, "maxLength": 12},
+            "created_at": {"type": "string"},
+            "score": {"type": "integer", "minimum": 10, "maximum": 5}
+        }
+    }}}
+})
+ENDPOINTS = SPEC.endpoints
+
+
+def generate(**options):
+    return generate_local_test_data(SPEC, ENDPOINTS, seed=7, **options)
+
+
+def test_values_satisfy_the_schema():
+    data, unsatisfied = generate()
+    user = data["create_user"]["body"]
+    assert re.fullmatch(r"[A-Z]{2}-\d{4}", user["code"])
+    assert user["role"] in ("admin", "member") and user["plan"] == "free"
+    assert len(user["nickname"]) == 12
+    assert re.fullmatch(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}Z", user["created_at"])
+    assert data["create_trip"]["body"]["fare"] in (50, 55, 60)
+    # An optional field with contradictory bounds is dropped, not reported
+    assert "score" not in user and "create_user" not in unsatisfied
+
+
+def test_is_deterministic_per_seed_and_operation():
+    assert generate()[0] == generate()[0]
+    alone, _ = generate_local_test_data(SPEC, [SPEC.operation("create_trip")], seed=7)
+    assert alone["create_trip"] == generate()[0]["create_trip"]
+
+
+def test_name_heuristics_match_whole_words():
+    assert _name_tokens("pickupLat") == ["pickup", "lat"]
+    assert _name_tokens("candidate_name") == ["candidate", "name"]
+    user = generate()[0]["create_user"]["body"]
+    assert " " in user["candidate_name"] and not re.match(r"\d{4}-", user["candidate_name"])
+    assert user["email"].endswith("@example.com")
+    for name in ("plate", "template", "latest", "total_lateness"):
+        assert SchemaDataGenerator._heuristic_range(_name_tokens(name), False) != (8.0, 28.0), name
+    assert SchemaDataGenerator._heuristic_range(_name_tokens("pickupLat"), False) == (8.0, 28.0)
+    assert SchemaDataGenerator._heuristic_range(_name_tokens("totalAmount"), False) == (100, 2000)
+
+
+def test_required_ids_are_templates_only_for_the_resolver():
+    body = generate()[0]["create_trip"]["body"]
+    assert isinstance(body["driver_id"], int)
+    assert "vehicleId" not in body
+    body = generate(placeholders=True)[0]["create_trip"]["body"]
+    assert body["driver_id"] == "{{driver_id}}"
+    assert "vehicleId" not in body
+
+
+def test_parameters_skip_ids_and_optional_query():
+    assert generate()[0]["list_trips"]["parameters"].keys() == {"status"}
+
+
+def test_patterns_without_the_regex_parser_are_reported(monkeypatch):
+    monkeypatch.setattr(datagen, "sre_parse", None)
+    data, unsatisfied = generate()
+    assert data["create_user"]["body"]["code"] is None
+    assert any(reason.startswith("/body/code:") for reason in unsatisfied["create_user"])
+
+
+def test_unsupported_pattern_constructs_are_reported():
+    gen = SchemaDataGenerator(seed=1)
+    assert gen.value({"type": "string", "pattern": "^(?=a)b$"}, "code", "/code") is None
+    assert gen.unsatisfied and gen.unsatisfied[0].startswith("/code:")
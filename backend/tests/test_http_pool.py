@@ -0,0 +1,48 @@
+import asyncio
+
+from core.http_pool import ClientPool, PoolConfig, pool_key
+
+
+def test_pool_key_is_per_origin():
+    assert pool_key("https://API.example.com/v1/") == pool_key("https://api.example.com/other")
+    assert pool_key("http://api.example.com") != pool_key("https://api.example.com")
+
+
+def test_held_client_survives_while_it_keeps_sending(target):
+    # One host slot; "localhost" and "127.0.0.1" are two hosts of the same test server
+    other = target.replace("127.0.0.1", "localhost")
+
+    async def go():
+        pool = ClientPool(PoolConfig(max_pools=1, idle_grace=0.2))
+        held = await pool.get(target)
+        # A long run: one checkout, requests keep flowing well past the grace period
+        for _ in range(6):
+            assert (await held.get(f"{target}/health")).status_code == 200
+            await pool.get(other)
+            await asyncio.sleep(0.1)
+        assert pool.evictions == 0 and not held.is_closed
+
+        # Once it has been silent for the grace period it is fair game
+        await asyncio.sleep(0.25)
+        await pool.get(other)
+        assert pool.evictions == 1 and held.is_closed
+        await pool.close()
+
+    asyncio.run(go())
+
+
+def test_streaming_response_is_in_flight_until_closed(target):
+    other = target.replace("127.0.0.1", "localhost")
+
+    async def go():
+        pool = ClientPool(PoolConfig(max_pools=1, idle_grace=0.0))
+        client = await pool.get(target)
+        async with client.stream("GET", f"{target}/health") as response:
+            await pool.get(other)
+            assert not client.is_closed
+            await response.aread()
+        await pool.get(other)
+        assert client.is_closed
+        await pool.close()
+
+    asyncio.run(go())
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from core import llm
+from core.llm import LLMError, LLMGateway, StubBackend
+
+
+class RateLimited(Exception):
+    # Shaped like the SDK's status errors: a status_code plus the HTTP response headers
+    def __init__(self, retry_after=None):
+        super().__init__("rate limited")
+        self.status_code = 429
+        self.response = type("Response", (), {"headers": {"retry-after": retry_after} if retry_after else {}})()
+
+
+def flaky(failures):
+    # Responder that raises each of `failures` in turn, then answers "{}"
+    pending = list(failures)
+
+    def respond(messages, json_mode):
+        if pending:
+            raise pending.pop(0)
+        return "{}"
+    return respond
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+    monkeypatch.setattr(llm.asyncio, "sleep", sleep)
+    return delays
+
+
+def test_retries_with_capped_backoff(sleeps):
+    backend = StubBackend(flaky([RateLimited(), RateLimited("600"), RateLimited("0.25")]))
+    gateway = LLMGateway(backend=backend, retries=3, backoff=0.5, max_backoff=2.0)
+
+    assert asyncio.run(gateway.complete_json("key", [{"role": "user", "content": "hi"}])) == {}
+    assert len(backend.calls) == 4
+    assert gateway.retried == 3 and gateway.failed == 0
+    # Jittered backoff stays under the attempt's ceiling; Retry-After is honoured but capped
+    assert 0 <= sleeps[0] <= 0.5
+    assert sleeps[1:] == [2.0, 0.25]
+
+
+def test_gives_up_after_retries(sleeps):
+    backend = StubBackend(flaky([RateLimited()] * 5))
+    gateway = LLMGateway(backend=backend, retries=2)
+
+    with pytest.raises(LLMError):
+        asyncio.run(gateway.complete("key", [{"role": "user", "content": "hi"}]))
+    assert len(backend.calls) == 3
+    assert gateway.failed == 1 and len(sleeps) == 2
+
+
+def test_non_retryable_error_fails_fast(sleeps):
+    backend = StubBackend(flaky([ValueError("bad request")]))
+    gateway = LLMGateway(backend=backend)
+
+    with pytest.raises(LLMError):
+        asyncio.run(gateway.complete("key", [{"role": "user", "content": "hi"}]))
+    assert len(backend.calls) == 1 and sleeps == []
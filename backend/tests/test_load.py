@@ -0,0 +1,66 @@
+import asyncio
+
+import httpx
+import pytest
+
+from core.load import run_load
+from models import ApiEndpoint
+
+ENDPOINT = ApiEndpoint(path="/items", method="GET", parameters=[], responses={})
+
+
+def slow_client(delay: float = 0.02) -> httpx.AsyncClient:
+    async def handler(request):
+        await asyncio.sleep(delay)
+        return httpx.Response(200, json={})
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def load(**options):
+    async def go():
+        async with slow_client() as client:
+            return await run_load(client, [ENDPOINT], "http://test", {}, {}, **options)
+    return asyncio.run(go())
+
+
+@pytest.mark.parametrize("options", [
+    {"duration": 1, "rate": -1},
+    {"duration": 0, "rate": 5},
+    {"duration": 1, "concurrency": 0},
+    {"duration": 1, "rate": 5, "max_in_flight": 0},
+    {"duration": 1},
+])
+def test_rejects_invalid_options(options):
+    with pytest.raises(ValueError):
+        load(**options)
+
+
+def test_open_loop_is_bounded_by_max_in_flight():
+    # A rate far beyond what the server can take must neither freeze the loop nor overrun the duration
+    async def go():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        tick_task = asyncio.create_task(ticker())
+        async with slow_client() as client:
+            report = await run_load(client, [ENDPOINT], "http://test", {}, {}, duration=0.5, rate=1e7, max_in_flight=10)
+        tick_task.cancel()
+        return report, ticks
+
+    report, ticks = asyncio.run(go())
+    assert report["mode"] == "open_loop"
+    assert 0 < report["requests"] <= 10 * 0.5 / 0.02 + 10
+    assert report["duration"] < 1.0
+    assert ticks > 10
+
+
+def test_closed_loop_counts_every_request():
+    report = load(duration=0.2, concurrency=2)
+    assert report["mode"] == "closed_loop"
+    assert report["requests"] > 0 and report["errors"] == 0
+    assert report["operations"][0]["requests"] == report["requests"]
@@ -0,0 +1,60 @@
+import asyncio
+import json
+
+import httpx
+
+from core.scheduler import build_dependency_graph, run_dag, select_affected
+from models import ApiEndpoint
+
+
+def ep(method, path, op_id):
+    return ApiEndpoint(path=path, method=method, operationId=op_id, parameters=[], responses={})
+
+
+ENDPOINTS = [
+    ep("DELETE", "/users/{user_id}", "delete_user"),
+    ep("GET", "/users/{user_id}", "get_user"),
+    ep("POST", "/trips", "create_trip"),
+    ep("POST", "/users", "create_user"),
+    ep("GET", "/health", "health"),
+]
+TEST_DATA = {
+    "create_user": {"body": {"name": "Ada"}},
+    "create_trip": {"body": {"rider": "{{create_user.id}}", "token": "{{token}}", "status": "{{status}}"}},
+}
+
+
+def test_graph_edges():
+    graph = build_dependency_graph(ENDPOINTS, TEST_DATA)
+    assert graph["deps"] == [{1, 3}, {3}, {3}, set(), set()]
+    assert graph["bindings"][1] == {"user_id": 3}
+    # Changing the creator re-runs its consumers and the delete that waits on them
+    assert select_affected(ENDPOINTS, TEST_DATA, {"create_user"}) == [0, 1, 2, 3]
+    assert select_affected(ENDPOINTS, TEST_DATA, {"health"}) == [4]
+
+
+def test_run_dag_order_and_context():
+    sent = []
+
+    async def handler(request):
+        body = json.loads(request.content) if request.content else None
+        sent.append((request.method, request.url.path, body))
+        await asyncio.sleep(0.01)
+        if request.method == "POST" and request.url.path == "/users":
+            # Scalar fields that collide with the caller's variables
+            return httpx.Response(201, json={"id": 42, "token": "from-response", "status": "active"})
+        return httpx.Response(200, json={"ok": True})
+
+    async def go():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await run_dag(client, ENDPOINTS, "http://test", {"token": "caller"}, TEST_DATA, max_concurrency=4)
+
+    results = asyncio.run(go())
+    assert all(r["passed"] for r in results)
+    order = [f"{method} {path}" for method, path, _ in sent]
+    assert order.index("POST /users") < order.index("GET /users/42") < order.index("DELETE /users/42")
+    assert order.index("POST /users") < order.index("POST /trips")
+
+    trip = next(body for method, path, body in sent if path == "/trips")
+    # Producer output fills what the caller left open; explicit variables win
+    assert trip == {"rider": 42, "token": "caller", "status": "active"}
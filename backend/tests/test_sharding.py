@@ -0,0 +1,150 @@
+import asyncio
+import os
+import socket
+import threading
+import time
+
+import httpx
+import pytest
+
+from core.sharding import ShardJob, merge_reports, plan_shards, run_sharded
+from models import ApiEndpoint
+
+os.environ.setdefault("API_RESULTS_DB", "off")
+os.environ.setdefault("API_AI_CACHE", "off")
+
+
+def ep(method, path, op_id, tags=None):
+    return ApiEndpoint(path=path, method=method, operationId=op_id, parameters=[], responses={}, tags=tags or [])
+
+
+# Two dependency components (users, orders) and one standalone operation
+ENDPOINTS = [
+    ep("POST", "/users", "create_user", ["people"]),
+    ep("GET", "/orders/{order_id}", "get_order", ["shop"]),
+    ep("GET", "/users/{id}", "get_user", ["people"]),
+    ep("GET", "/health", "health", ["people"]),
+    ep("POST", "/orders", "create_order", ["shop"]),
+    ep("DELETE", "/users/{id}", "delete_user", ["people"]),
+]
+TEST_DATA = {"create_user": {"body": {"name": "Ada"}}, "create_order": {"body": {"item": "book"}}, "headers": {"X-Test": "1"}}
+USERS, ORDERS = {0, 2, 5}, {1, 4}
+
+
+def shard_of(plan, index):
+    return next(n for n, indices in enumerate(plan) if index in indices)
+
+
+def test_plan_keeps_producers_with_consumers():
+    plan = plan_shards(ENDPOINTS, TEST_DATA, 3)
+    assert sorted(i for shard in plan for i in shard) == list(range(len(ENDPOINTS)))
+    assert len({shard_of(plan, i) for i in USERS}) == 1
+    assert len({shard_of(plan, i) for i in ORDERS}) == 1
+    # Largest component first onto the lightest shard; indices keep spec order
+    assert plan == [[0, 2, 5], [1, 4], [3]]
+
+
+def test_plan_by_tag_and_shard_count():
+    assert plan_shards(ENDPOINTS, TEST_DATA, 3, by="tag") == [[0, 2, 3, 5], [1, 4]]
+    assert plan_shards(ENDPOINTS, TEST_DATA, 1) == [list(range(len(ENDPOINTS)))]
+    with pytest.raises(ValueError):
+        plan_shards(ENDPOINTS, TEST_DATA, 2, by="host")
+
+
+def test_merge_reports_places_results_and_counts_missing():
+    reports = [
+        {"shard": 1, "startedAt": 12.0, "finishedAt": 13.0, "elapsed": 1.0, "results": [{"index": 2, "passed": False}]},
+        {"shard": 0, "startedAt": 10.0, "finishedAt": 11.5, "elapsed": 1.5, "results": [{"index": 0, "passed": True}]},
+    ]
+    merged = merge_reports(reports, 3)
+    assert [r and r["index"] for r in merged["results"]] == [0, None, 2]
+    assert (merged["passed"], merged["failed"], merged["missing"]) == (1, 1, 1)
+    assert [s["shard"] for s in merged["shards"]] == [0, 1]
+    # Wall-clock span across shards, not the sum of their durations
+    assert merged["elapsed"] == 3.0
+
+
+def test_run_sharded_in_worker_processes(target):
+    seen = []
+
+    async def on_report(report):
+        seen.append(report["shard"])
+
+    merged = asyncio.run(run_sharded(
+        None, ENDPOINTS, target, {}, TEST_DATA, shards=3, processes=2, options={"concurrency": 4}, on_report=on_report
+    ))
+    results = merged["results"]
+    assert [r["index"] for r in results] == list(range(len(ENDPOINTS)))
+    assert [r["operationId"] for r in results] == [e.operationId for e in ENDPOINTS]
+    assert (merged["tests"], merged["passed"], merged["failed"], merged["missing"]) == (6, 6, 0, 0)
+    # Consumers only pass if they ran after their producer, in the same shard, with its id
+    assert len({results[i]["shard"] for i in USERS}) == 1
+    assert len({results[i]["shard"] for i in ORDERS}) == 1
+    assert results[2]["url"].endswith(f"/users/{results[0]['response']['id']}")
+    assert results[1]["url"].endswith(f"/orders/{results[4]['response']['id']}")
+    assert sorted(seen) == [0, 1, 2]
+
+
+def test_shard_job_leases_and_duplicates():
+    job = ShardJob("job", None, [{"shard": 0}, {"shard": 1}], 2, lease=60)
+    assert job.claim()["shard"] == 0
+    assert job.claim()["shard"] == 1
+    assert job.claim() is None
+    job.claimed[0] = time.monotonic() - 1  # worker holding shard 0 went away
+    assert job.claim()["shard"] == 0
+    assert job.complete({"shard": 0, "results": []})
+    assert not job.complete({"shard": 0, "results": []})
+    assert not job.complete({"shard": 5, "results": []})
+    assert not job.done
+
+
+@pytest.fixture
+def coordinator():
+    import uvicorn
+    import main
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=port, lifespan="off", log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    yield main, f"http://127.0.0.1:{port}"
+    server.should_exit = True
+    thread.join()
+
+
+def test_workers_drain_a_coordinator_job(coordinator, target):
+    from shard_worker import work
+
+    main, url = coordinator
+    job = main.shard_coordinator.submit(None, ENDPOINTS, target, {}, TEST_DATA, shards=3, options={"concurrency": 4})
+    job.lease = 0.2
+
+    with httpx.Client(base_url=url) as api:
+        # A worker that claims a shard and dies: its lease runs out and the shard is handed out again
+        abandoned = api.post("/shards/claim", json={"jobId": job.id}).json()
+        time.sleep(0.3)
+
+        async def two_workers():
+            return await asyncio.gather(work(url, job.id, 0.05, True), work(url, job.id, 0.05, True))
+
+        done = asyncio.run(two_workers())
+        assert sum(done) == 3
+
+        status = api.get(f"/shards/jobs/{job.id}").json()
+        assert status["done"] and status["report"]["passed"] == 6 and status["report"]["missing"] == 0
+
+        # The abandoned worker reporting late is a duplicate
+        late = {
+            "jobId": job.id, "shard": abandoned["shard"], "worker": "late", "startedAt": 0.0, "finishedAt": 1.0,
+            "elapsed": 1.0, "results": [{"index": i, "passed": False} for i in abandoned["indices"]]
+        }
+        assert api.post(f"/shards/jobs/{job.id}/results", json=late).status_code == 409
+        # A report may not carry another shard's tests, and must be well-formed
+        other = next(n for n in range(len(job.payloads)) if n != abandoned["shard"])
+        stolen = {**late, "shard": other, "results": [{"index": abandoned["indices"][0]}]}
+        assert api.post(f"/shards/jobs/{job.id}/results", json=stolen).status_code == 400
+        assert api.post(f"/shards/jobs/{job.id}/results", json={"shard": "x"}).status_code == 422
@@ -0,0 +1,51 @@
+from core.templates import compile_template, render, render_value
+
+CTX = {
+    "user_id": 7,
+    "name": "Ada",
+    "flag": False,
+    "tags": ["a", "b"],
+    "create_user": {"id": 42, "email": "ada@example.com", "address": {"city": "Pune"}},
+    "a.b": "dotted-key",
+}
+
+
+def test_compiled_once_and_reused():
+    assert compile_template("/users/{user_id}") is compile_template("/users/{user_id}")
+
+
+def test_single_pass_rendering():
+    assert render("/users/{user_id}/orders/{{user_id}}", CTX) == "/users/7/orders/7"
+    assert render("{{create_user.email}} <{name}>", CTX) == "ada@example.com <Ada>"
+    # Values are not re-scanned, so a value that looks like a placeholder stays literal
+    assert render("{x}", {"x": "{name}"}) == "{name}"
+
+
+def test_unknown_and_non_scalar_placeholders_stay_verbatim():
+    assert render("/items/{missing}/{tags}", CTX) == "/items/{missing}/{tags}"
+    assert render("{{create_user.address}}", CTX) == "{{create_user.address}}"
+
+
+def test_exact_keys_win_over_nesting():
+    assert render("{a.b}", CTX) == "dotted-key"
+
+
+def test_direct_placeholders_keep_their_type():
+    body = {
+        "id": "{{user_id}}",
+        "owner": "{{create_user.id}}",
+        "active": "{flag}",
+        "tags": "{{tags}}",
+        "label": "user-{{user_id}}",
+        "nested": [{"email": "{{create_user.email}}"}, 3],
+        "unknown": "{{nope}}",
+    }
+    assert render_value(body, CTX) == {
+        "id": 7,
+        "owner": 42,
+        "active": False,
+        "tags": ["a", "b"],
+        "label": "user-7",
+        "nested": [{"email": "ada@example.com"}, 3],
+        "unknown": "{{nope}}",
+    }
@@ -0,0 +1,69 @@
+from core.schema import ParsedSpec
+from core.testdata import endpoint_summary, estimate_tokens, naming_contract, plan_chunks, validate_test_data
+
+SPEC = ParsedSpec({
+    "openapi": "3.0.0",
+    "paths": {
+        "/users": {"post": {
+            "operationId": "create_user",
+            "tags": ["users"],
+            "requestBody": {"content": {"application/json": {"schema": {
+                "type": "object", "required": ["name", "email"], "properties": {"name": {"type": "string"}, "email": {"type": "string"}}
+            }}}},
+            "responses": {}
+        }},
+        "/users/{user_id}": {"get": {"operationId": "get_user", "tags": ["users"], "responses": {}}},
+        "/trips": {"post": {"operationId": "create_trip", "responses": {}}},
+        "/trips/{trip_id}": {"get": {"operationId": "get_trip", "responses": {}}},
+        "/health": {"get": {"operationId": "health", "responses": {}}},
+    }
+})
+ENDPOINTS = SPEC.endpoints
+SUMMARIES = [endpoint_summary(ep, SPEC) for ep in ENDPOINTS]
+
+
+def ops(chunks):
+    return [[s["operationId"] for s in chunk] for chunk in chunks]
+
+
+def test_groups_stay_together_within_the_budget():
+    users = [s for s in SUMMARIES if s["operationId"] in ("create_user", "get_user")]
+    chunks = plan_chunks(ENDPOINTS, SUMMARIES, sum(estimate_tokens(s) for s in users))
+    # Grouped by tag, else by collection path, whatever order the spec lists them in
+    # Whole groups share a chunk while they fit
+    assert ops(chunks) == [["create_user", "get_user"], ["create_trip", "get_trip", "health"]]
+    # A large budget packs everything into one prompt
+    assert len(plan_chunks(ENDPOINTS, SUMMARIES, 10 ** 6)) == 1
+
+
+def test_oversized_group_is_split_alone():
+    chunks = plan_chunks(ENDPOINTS, SUMMARIES, 1)
+    assert ops(chunks) == [["create_user"], ["get_user"], ["create_trip"], ["get_trip"], ["health"]]
+
+
+def test_naming_contract_lists_every_operation():
+    contract = naming_contract(SUMMARIES)
+    assert "create_user: POST /users" in contract and len(contract) == len(SUMMARIES)
+
+
+def test_validation_keeps_known_operations_and_shared_values():
+    data = {
+        "create_user": {"body": {"name": "Ada"}},
+        "get_user": {"parameters": {"user_id": "{{create_user.id}}"}},
+        "get_trip": {"parameters": {}},
+        "create_trip": {"body": {"rider": "{{create_usr.id}}"}},
+        "headers": {"Authorization": "Bearer x"},
+        "tenant": "acme",
+        "defaults": {"currency": "INR"},
+        "creat_user": {"body": {"name": "typo"}},
+        "health": "not an object",
+    }
+    clean, issues = validate_test_data(data, ENDPOINTS, SPEC)
+    assert clean.keys() == {"create_user", "get_user", "get_trip", "create_trip", "headers", "tenant", "defaults"}
+    found = {(i["operationId"], i["issue"]) for i in issues}
+    assert ("creat_user", "unknown operationId, dropped") in found
+    assert ("health", "entry is not an object, dropped") in found
+    assert ("create_user", "body is missing required fields: email") in found
+    assert ("create_trip", "references unknown operation 'create_usr'") in found
+    assert ("get_trip", "no value for path parameter 'trip_id' (left to the resolver)") in found
+    assert not any(op == "get_user" for op, _ in found)
@@ -0,0 +1,101 @@
+import asyncio
+
+import httpx
+
+from core.runner import execute_test_step
+from core.schema import ParsedSpec
+from core.validation import SchemaCompiler, response_validators
+
+SPEC = {
+    "openapi": "3.0.0",
+    "paths": {
+        "/users/{id}": {
+            "get": {
+                "operationId": "get_user",
+                "responses": {"200": {"content": {"application/json": {"schema": {"$ref": "#/components/schemas/User"}}}}}
+            }
+        },
+        "/tags": {
+            "get": {
+                "operationId": "list_tags",
+                "responses": {"2XX": {"content": {"application/json": {"schema": {
+                    "type": "array", "items": {"type": "string", "pattern": "^\\p{L}+$"}
+                }}}}}
+            }
+        }
+    },
+    "components": {"schemas": {
+        "User": {
+            "type": "object",
+            "required": ["id", "name"],
+            "properties": {
+                "id": {"type": "integer", "minimum": 1},
+                "name": {"type": "string", "minLength": 1},
+                "email": {"type": "string", "format": "email", "nullable": True},
+                "role": {"enum": ["admin", "member"]},
+                "manager": {"$ref": "#/components/schemas/User"}
+            },
+            "additionalProperties": False
+        }
+    }}
+}
+
+
+def errors(schema, value, spec=None):
+    out = []
+    SchemaCompiler(spec or ParsedSpec(SPEC)).compile(schema)(value, "", out)
+    return out
+
+
+def test_types_and_bounds():
+    assert errors({"type": "integer"}, 3) == []
+    assert errors({"type": "integer"}, True)[0]["message"] == "expected integer, got boolean"
+    assert errors({"type": "number", "exclusiveMinimum": 0}, 0)
+    assert errors({"type": "number", "minimum": 0, "exclusiveMinimum": True}, 0)
+    assert errors({"type": "array", "items": {"type": "string"}, "maxItems": 1}, ["a", 2]) == [
+        {"path": "/", "message": "expected at most 1 items"},
+        {"path": "/1", "message": "expected string, got integer"},
+    ]
+
+
+def test_object_rules_and_recursive_refs():
+    spec = ParsedSpec(SPEC)
+    user = {"$ref": "#/components/schemas/User"}
+    assert errors(user, {"id": 1, "name": "a", "email": None, "manager": {"id": 2, "name": "b"}}, spec) == []
+    found = {(e["path"], e["message"]) for e in errors(user, {"id": 0, "extra": 1, "manager": {"id": "x", "name": "b"}}, spec)}
+    assert ("/name", "required field missing") in found
+    assert ("/extra", "unexpected field") in found
+    assert ("/id", "0 is not >= 1") in found
+    assert ("/manager/id", "expected integer, got string") in found
+
+
+def test_one_of_counts_matches():
+    schema = {"oneOf": [{"type": "integer"}, {"type": "number"}]}
+    assert errors(schema, 1.5) == []
+    assert errors(schema, 1)[0]["message"] == "matches 2 oneOf alternatives"
+    assert errors({"anyOf": [{"type": "string"}, {"type": "integer"}]}, [])[0]["message"].startswith("matches none")
+
+
+def test_uncompilable_pattern_is_skipped_and_noted_once():
+    compiler = SchemaCompiler(ParsedSpec(SPEC))
+    schema = {"type": "string", "pattern": "^\\p{L}+$"}
+    for _ in range(2):
+        out = []
+        compiler.compile(schema)("abc", "", out)
+        assert out == []
+    assert len(compiler.notes) == 1 and "\\p{L}" in compiler.notes[0]
+
+
+def test_runner_keeps_status_when_a_pattern_cannot_compile():
+    spec = ParsedSpec(SPEC)
+    endpoint = spec.operation("list_tags")
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json=["ok", 3]))
+
+    async def go():
+        async with httpx.AsyncClient(transport=transport) as client:
+            return await execute_test_step(client, endpoint, "http://test", {}, {}, validators=response_validators(spec))
+
+    result = asyncio.run(go())
+    assert result["status"] == 200
+    assert result["schemaErrors"] == [{"path": "/1", "message": "expected string, got integer"}]
+    assert response_validators(spec).stats()["notes"]
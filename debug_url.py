@@ -1,24 +1,26 @@
-
-import httpx
+import sys
+import os
 import asyncio
 
-async def check():
-    urls = [
-        "https://api.cholacabs.in/api/openapi.json",
-        "https://api.cholacabs.in/v1/openapi.json",
-        "https://api.cholacabs.in/api/v1/openapi.json",
-        "https://api.cholacabs.in/docs"
-    ]
-    async with httpx.AsyncClient(verify=False) as client:
-        for url in urls:
-            try:
-                print(f"Checking {url}...")
-                resp = await client.get(url, timeout=5)
-                print(f"Status: {resp.status_code}")
-                if resp.status_code == 200 and "docs" in url:
-                    print("Docs page found. It often loads OpenAPI from ./openapi.json relative to itself.")
-            except Exception as e:
-                print(f"Error {url}: {e}")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+from core.discovery import SpecDiscovery
+
+# Usage: python debug_url.py [url]
+# Shows the candidate list discovery builds for a URL, what each returns, and which one wins.
+
+async def check(url: str):
+    discovery = SpecDiscovery()
+    known = discovery.known_location(url)
+    if known:
+        print(f"Cached location for this host: {known}")
+
+    candidates = discovery.candidates(url)
+    winner = None
+    for r in await discovery.probe_all(candidates):
+        print(f"Checking {r.url}... Status: {r.status or r.error}")
+        if r.ok and winner is None:
+            winner = r.url
+    print(f"Winner: {winner}" if winner else "No OpenAPI document found.")
 
 if __name__ == "__main__":
-    asyncio.run(check())
+    asyncio.run(check(sys.argv[1] if len(sys.argv) > 1 else "https://api.cholacabs.in/docs"))
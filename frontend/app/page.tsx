@@ -23,6 +23,8 @@ export default function Home() {
     const [chatInput, setChatInput] = React.useState('');
     const [chatLoading, setChatLoading] = React.useState(false);
     const chatEndRef = React.useRef<HTMLDivElement>(null);
+    // Scopes the backend's producer cache to one suite run
+    const runIdRef = React.useRef<string>(`run-${Date.now()}`);
 
     React.useEffect(() => {
         if (chatOpen && chatEndRef.current) {
@@ -269,96 +271,8 @@ export default function Home() {
             }
         }
 
-        const bodyString = JSON.stringify(bodyToAnalyze);
-
-        // Collect needed variables from path and body templates
-        const needed = [
-            ...(ep.path.match(/\{([^}]+)\}/g) || []),
-            ...(bodyString.match(/\{\{([^}]+)\}\}/g) || [])
-        ];
-
-        // ALSO: Scan body for any `_id` fields that have placeholder values
-        // This handles cases like { "driver_id": "string" } which need resolution
-        const scanBodyForIdFields = (obj: any, prefix = ''): string[] => {
-            const foundIds: string[] = [];
-            if (!obj || typeof obj !== 'object') return foundIds;
-
-            Object.entries(obj).forEach(([key, val]) => {
-                const fullKey = prefix ? `${prefix}.${key}` : key;
-                if (key.toLowerCase().endsWith('_id') || key.toLowerCase().endsWith('id')) {
-                    // Check if value is a placeholder (empty, 'string', null, 0, or looks like a template)
-                    if (val === null || val === '' || val === 'string' || val === 0 ||
-                        (typeof val === 'string' && (val.includes('{{') || val === 'uuid'))) {
-                        foundIds.push(`{${key}}`);
-                    }
-                }
-                if (typeof val === 'object' && val !== null) {
-                    foundIds.push(...scanBodyForIdFields(val, fullKey));
-                }
-            });
-            return foundIds;
-        };
-
-        needed.push(...scanBodyForIdFields(bodyToAnalyze));
-
-        for (const varName of Array.from(new Set(needed))) {
-            const cleanVar = varName.replace(/[\{\}]/g, '');
-            if (!currentContext[cleanVar]) {
-                const searchKey = cleanVar.replace('_id', '').toLowerCase();
-
-                // Find ALL potential producers, then pick the BEST one (shortest path = base list endpoint)
-                const potentialProducers = endpoints.filter(e => {
-                    if (e.method.toUpperCase() !== 'GET' || e.path.includes('{')) return false;
-                    const path = e.path.toLowerCase();
-                    const opIdDesc = (e.operationId || "").toLowerCase();
-                    const tags = (e.tags || []).map(t => t.toLowerCase());
-
-                    const pluralKey = searchKey + 's';
-                    return path.endsWith(`/${pluralKey}`) || path.endsWith(`/${searchKey}`) ||
-                        path.includes(searchKey) || opIdDesc.includes(searchKey) || tags.some(t => t.includes(searchKey));
-                });
-
-                // Sort by path length (shortest first) - this prioritizes /api/drivers over /api/drivers/check-phone
-                potentialProducers.sort((a, b) => a.path.length - b.path.length);
-                const producer = potentialProducers[0];
-
-                if (producer) {
-                    try {
-                        const pRes = await fetch('http://localhost:8000/run-step', {
-                            method: 'POST', headers: { 'Content-Type': 'application/json' },
-                            body: JSON.stringify({ baseUrl: config.baseUrl, endpoint: producer, variables: currentContext })
-                        });
-                        const pData = await pRes.json();
-                        if (pData.results?.[0]?.response) {
-                            const learned = extractIdentifiers(pData.results[0].response);
-                            const parts = producer.path.split('/').filter(Boolean);
-                            const pName = parts[parts.length - 1] || 'data';
-                            const pSingular = pName.endsWith('s') ? pName.slice(0, -1) : pName;
-
-                            if (learned['id']) {
-                                if (!learned[cleanVar]) learned[cleanVar] = learned['id'];
-                                learned[`${pSingular}_id`] = learned['id'];
-                            }
-
-                            // Fuzzy Logic: If exact key not found, try to find ANY relevant ID from the producer
-                            if (!learned[cleanVar]) {
-                                const candidates = Object.keys(learned).filter(k =>
-                                    k.toLowerCase().endsWith('id') || k.toLowerCase().endsWith('uuid')
-                                );
-                                // Prefer the shortest key usually (id vs transaction_id)? or longest?
-                                // Let's pick the first one that is NOT the cleanVar itself (obviously)
-                                const validCandidate = candidates.find(c => c !== cleanVar);
-                                if (validCandidate) {
-                                    learned[cleanVar] = learned[validCandidate];
-                                }
-                            }
-
-                            currentContext = { ...currentContext, ...learned };
-                        }
-                    } catch (e) { }
-                }
-            }
-        }
+        // Missing path params and placeholder ids are resolved by the backend from the spec's
+        // producer index (one fetch per producer per run), so no lookup round-trips from here
 
         // DEBUG: Log context before path resolution
         console.log(`[executeStep] ${ep.method} ${ep.path} - Context keys:`, Object.keys(currentContext));
@@ -371,15 +285,9 @@ export default function Home() {
             // DEBUG: Log each variable resolution
             console.log(`[Path Resolve] Looking for '${key}' in context:`, val ? `FOUND (${val})` : 'NOT FOUND');
 
+            // Unresolved params stay as {name}; the backend resolver fills them (or falls back to a generic id)
             if (val) {
                 resolvedPath = resolvedPath.replace(p, val);
-            } else {
-                // If not found, try fallback to generic 'id' or 'uuid'
-                const fallback = currentContext['id'] || currentContext['uuid'];
-                if (fallback) {
-                    console.log(`[Path Resolve] Using fallback ID:`, fallback);
-                    resolvedPath = resolvedPath.replace(p, fallback);
-                }
             }
         });
 
@@ -397,11 +305,16 @@ export default function Home() {
                     baseUrl: config.baseUrl,
                     endpoint: { ...ep, path: resolvedPath },
                     testData: { [opId]: { body: bodyToAnalyze } },
-                    variables: currentContext
+                    variables: currentContext,
+                    specUrl: config.openapiUrl,
+                    runId: runIdRef.current
                 })
             });
             const runData = await runRes.json();
             const resultItem = runData.results?.[0];
+            if (runData.learned) {
+                currentContext = { ...currentContext, ...runData.learned };
+            }
 
             if (resultItem) {
                 resultItem.endpoint = ep.path;
@@ -517,36 +430,117 @@ export default function Home() {
 
         console.log('[Full Suite] Execution order:', sorted.map(e => e.path));
 
+        runIdRef.current = `run-${Date.now()}`;
         let ctx = { ...autoParams };
-        for (const ep of sorted) {
-            ctx = await executeStep(ep, ctx);
-            // Small delay to allow UI to update and user to see the "flow"
-            await new Promise(r => setTimeout(r, 100));
+        const batch = await runBatch(sorted, ctx);
+        if (batch) {
+            ctx = batch.ctx;
+            // Failures go through executeStep again for AI diagnosis and auto-healing
+            for (const ep of batch.failed) {
+                ctx = await executeStep(ep, ctx);
+            }
+        } else {
+            for (const ep of sorted) {
+                ctx = await executeStep(ep, ctx);
+                // Small delay to allow UI to update and user to see the "flow"
+                await new Promise(r => setTimeout(r, 100));
+            }
         }
 
         setAutoParams(ctx);
         setLoading(false);
     };
 
-    const generateData = async () => {
-        if (!config.apiKey) {
-            alert("Please enter a Groq API Key in Setup tab first.");
-            return;
+    // Runs the whole list in one streamed /run-steps request; steps reference endpoints by
+    // operationId in the spec the backend already parsed. Returns null if the batch could not start.
+    const runBatch = async (sorted: ApiEndpoint[], startCtx: Record<string, any>) => {
+        let globalData: Record<string, any> = {};
+        try { globalData = JSON.parse(testData); } catch (e) { }
+
+        const steps = sorted.map(ep => {
+            const opId = ep.operationId || `${ep.method.toUpperCase()}_${ep.path}`;
+            let body = globalData[opId]?.body;
+            if (manualBodies[opId]) {
+                try { body = JSON.parse(manualBodies[opId]); } catch (e) { }
+            }
+            if (!body && ep.requestBody) {
+                const content = ep.requestBody?.content?.["application/json"];
+                if (content?.schema) body = generateFromSchema(content.schema);
+            }
+            return { operationId: opId, body };
+        });
+
+        let res: Response;
+        try {
+            res = await fetch('http://localhost:8000/run-steps?format=ndjson', {
+                method: 'POST', headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({
+                    baseUrl: config.baseUrl,
+                    specUrl: config.openapiUrl,
+                    steps,
+                    variables: startCtx,
+                    runId: runIdRef.current
+                })
+            });
+        } catch (e) {
+            return null;
+        }
+        if (!res.ok || !res.body) return null;
+
+        let ctx = { ...startCtx };
+        const failed: ApiEndpoint[] = [];
+        const handle = (event: any) => {
+            if (event.type !== 'result') return;
+            const ep = sorted[event.index];
+            const resultItem = { ...event.result, endpoint: ep.path };
+            setResults(prev => {
+                const other = prev.filter(r => !(r.endpoint === ep.path && r.method === ep.method));
+                return [...other, resultItem];
+            });
+            ctx = { ...ctx, ...(resultItem.learned || {}) };
+            if (!resultItem.passed && config.apiKey) failed.push(ep);
+        };
+
+        const reader = res.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            let newline;
+            while ((newline = buffer.indexOf('\n')) >= 0) {
+                const line = buffer.slice(0, newline).trim();
+                buffer = buffer.slice(newline + 1);
+                if (line) handle(JSON.parse(line));
+            }
         }
+        return { ctx, failed };
+    };
+
+    const generateData = async () => {
+        // Without a key the backend's schema-driven generator does the whole job
         setLoading(true);
         try {
             const res = await fetch('http://localhost:8000/generate-data', {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({
-                    apiKey: config.apiKey,
-                    endpoints: endpoints
+                    apiKey: config.apiKey || undefined,
+                    endpoints: endpoints,
+                    specUrl: config.openapiUrl,
+                    mode: config.apiKey ? 'auto' : 'local',
+                    // Steps run with a runId, so the backend resolves {{id}} fields from producers
+                    resolveIds: true
                 })
             });
             const data = await res.json();
             if (data.testData) {
                 setTestData(JSON.stringify(data.testData, null, 2));
             }
+            if (data.issues?.length) {
+                console.warn('[AI Test Data] Checked against the spec:', data.issues);
+            }
         } catch (e) {
             alert("Failed to generate data");
         } finally {
@@ -1035,12 +1029,27 @@ export default function Home() {
                                                                         {res && (
                                                                             <div className="animate-in fade-in duration-500">
                                                                                 <div className={styles.tileInfo}>
-                                                                                    <div className={styles.tileTime}>{res.time.toFixed(0)} MS</div>
+                                                                                    <div className={styles.tileTime} title={res.latency ? `baseline ${res.latency.baselineMedian.toFixed(0)} MS (${res.latency.ratio.toFixed(2)}x)` : undefined}>
+                                                                                        {res.time.toFixed(0)} MS
+                                                                                        {(res.verdict === 'regressed' || res.verdict === 'improved') && (
+                                                                                            <span className={res.verdict === 'regressed' ? 'text-error' : 'text-success'}> {res.verdict === 'regressed' ? 'SLOWER' : 'FASTER'}</span>
+                                                                                        )}
+                                                                                    </div>
                                                                                     <div className={`${styles.status} ${res.passed ? styles.pass : styles.fail}`}>
                                                                                         <div className={`w-1.5 h-1.5 rounded-full ${res.passed ? 'bg-success' : 'bg-error'}`}></div>
                                                                                         {res.passed ? (res.healed ? 'AI HEALED' : 'Passed') : 'Failed'}
                                                                                     </div>
                                                                                 </div>
+                                                                                {(res.timings || res.responseBytes !== undefined) && (
+                                                                                    <div className="text-[10px] opacity-60 font-mono mb-2">
+                                                                                        {res.timings && (['queue', 'connect', 'tls', 'send', 'ttfb', 'download'] as const)
+                                                                                            .filter(phase => res.timings![phase] !== undefined)
+                                                                                            .map(phase => `${phase} ${res.timings![phase]!.toFixed(1)}`)
+                                                                                            .join(' · ')}
+                                                                                        {res.timings?.reused && ' (reused)'}
+                                                                                        {res.responseBytes !== undefined && ` · ↑${res.requestBytes ?? 0}B ↓${res.responseBytes}B`}
+                                                                                    </div>
+                                                                                )}
                                                                                 <div className={styles.inspectorBox}>
                                                                                     <pre>{JSON.stringify(res.response, null, 2)}</pre>
                                                                                 </div>
@@ -1065,6 +1074,9 @@ export default function Home() {
                                                                                     );
                                                                                 })()}
                                                                                 {res.error && <div className="text-[10px] text-error mt-2 font-mono">{res.error}</div>}
+                                                                                {res.schemaErrors?.map((e, i) => (
+                                                                                    <div key={i} className="text-[10px] text-error font-mono">{e.path}: {e.message}</div>
+                                                                                ))}
                                                                             </div>
                                                                         )}
                                                                     </div>
@@ -19,6 +19,26 @@ export interface TestExecutionResult {
     response: any;
     error?: string;
     healed?: boolean;
+    operationId?: string;
+    learned?: Record<string, any>; // ids picked up by this step (batched runs)
+    schemaErrors?: { path: string; message: string }[]; // response vs declared schema
+    verdict?: 'ok' | 'regressed' | 'improved' | 'no_baseline'; // latency vs stored baseline
+    latency?: { baselineMedian: number; ratio: number; z: number };
+    timings?: RequestTimings; // absent when the transport emits no trace events
+    requestBytes?: number;
+    responseBytes?: number; // as received on the wire (before decompression)
+}
+
+// Per-phase breakdown of one request in ms; connect includes DNS resolution
+export interface RequestTimings {
+    queue: number;
+    connect?: number;
+    tls?: number;
+    send?: number;
+    ttfb?: number;
+    download?: number;
+    total: number;
+    reused: boolean; // keep-alive connection, no connect/TLS phases
 }
 
 export interface GlobalState {
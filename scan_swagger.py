@@ -1,29 +1,22 @@
-
-import httpx
+import sys
+import os
 import asyncio
 
-async def scan():
-    base = "https://api.cholacabs.in"
-    paths = [
-        "/openapi.json",
-        "/api/openapi.json",
-        "/api/v1/openapi.json",
-        "/v1/openapi.json",
-        "/docs",
-        "/api/docs",
-        "/api/v1/docs",
-        "/swagger.json",
-        "/api/swagger.json"
-    ]
-    
-    async with httpx.AsyncClient(verify=False) as client:
-        for p in paths:
-            url = base + p
-            try:
-                resp = await client.get(url, timeout=5)
-                print(f"[{resp.status_code}] {url} (Content-Type: {resp.headers.get('content-type')})")
-            except Exception as e:
-                print(f"[ERR] {url} : {e}")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+from core.discovery import SpecDiscovery
+
+# Usage: python scan_swagger.py [base_url]
+# Probes every known spec location under the host and prints what each one returns.
+
+async def scan(base: str):
+    discovery = SpecDiscovery()
+    urls = [base.rstrip("/") + p for p in discovery.paths + ["/docs", "/api/docs", "/api/v1/docs"]]
+    for r in await discovery.probe_all(urls):
+        if r.error:
+            print(f"[ERR] {r.url} : {r.error}")
+        else:
+            marker = " <- spec" if r.ok else ""
+            print(f"[{r.status}] {r.url} (Content-Type: {r.content_type}){marker}")
 
 if __name__ == "__main__":
-    asyncio.run(scan())
+    asyncio.run(scan(sys.argv[1] if len(sys.argv) > 1 else "https://api.cholacabs.in"))
@@ -1,15 +1,23 @@
 import uvicorn
-import json
-import os
 import uuid
+import functools
+from contextlib import asynccontextmanager
 from typing import List, Optional, Literal, Dict, Any, Union
 from datetime import datetime
 from fastapi import FastAPI, HTTPException, Body, Query, Path
 from fastapi.responses import RedirectResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
 
-app = FastAPI(title="Ride Hailing Automation Test API", version="3.0.0")
+from storage import Store, COLLECTIONS, SEQUENCES, UNIQUE_FIELDS
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    store.start()
+    yield
+    store.close()
+
+app = FastAPI(title="Ride Hailing Automation Test API", version="3.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -25,32 +33,24 @@ def redirect_to_docs():
 DB_FILE = "database.json"
 
 # --- Database Utils ---
-def load_db():
-    if not os.path.exists(DB_FILE):
-        return {
-            "drivers": [],
-            "vehicles": [],
-            "tariff_configs": [],
-            "trips": [],
-            "payments": [],
-            "wallet_transactions": [],
-            "driver_requests": []
-        }
-    with open(DB_FILE, "r") as f:
-        data = json.load(f)
-        for k in ["drivers", "vehicles", "tariff_configs", "trips", "payments", "wallet_transactions", "driver_requests"]:
-            if k not in data:
-                data[k] = []
-        return data
-
-def save_db(data):
-    with open(DB_FILE, "w") as f:
-        json.dump(data, f, indent=2)
-
-def get_next_id(list_data, id_field):
-    if not list_data:
-        return 1
-    return max(item[id_field] for item in list_data) + 1
+# Loaded once; per-collection indexes on primary keys, writes journaled to disk in the background
+store = Store(DB_FILE)
+
+def _detach(result):
+    # Shallow copies so responses are serialized after the lock without racing later writes
+    if isinstance(result, dict):
+        return dict(result)
+    if isinstance(result, list):
+        return [dict(i) if isinstance(i, dict) else i for i in result]
+    return result
+
+def locked(func):
+    # Runs a handler as one transaction against the store
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with store.transaction():
+            return _detach(func(*args, **kwargs))
+    return wrapper
 
 # ==========================================
 # 1. DRIVERS API (/api/drivers)
@@ -101,9 +101,9 @@ class UpdateDriverRequest(BaseModel):
     is_available: Optional[bool] = None
 
 @app.post("/api/drivers/check-phone", response_model=CheckPhoneResponse, tags=["Drivers"])
+@locked
 def check_phone_exists(request: CheckPhoneRequest):
-    db = load_db()
-    driver = next((d for d in db["drivers"] if d["phone_number"] == request.phone_number), None)
+    driver = store.find("drivers", "phone_number", request.phone_number)
     if driver:
         return {
             "exists": True,
@@ -122,16 +122,16 @@ def check_phone_exists(request: CheckPhoneRequest):
         }
 
 @app.get("/api/drivers/", response_model=List[DriverResponse], tags=["Drivers"])
+@locked
 def get_drivers(skip: int = 0, limit: int = 100):
-    db = load_db()
-    return db["drivers"][skip : skip + limit]
+    return store.page("drivers", skip, limit)
 
 @app.get("/api/drivers/locations", response_model=List[Location], tags=["Drivers"])
+@locked
 def get_driver_locations():
-    db = load_db()
     # Mocking location data based on existing drivers
     locations = []
-    for d in db["drivers"]:
+    for d in store.all("drivers"):
         if d["is_available"]:
             locations.append({
                 "driver_id": d["driver_id"],
@@ -143,23 +143,23 @@ def get_driver_locations():
     return locations
 
 @app.get("/api/drivers/locations/map", response_model=List[Location], tags=["Drivers"])
+@locked
 def get_driver_locations_map():
     # Helper alias
     return get_driver_locations()
 
 @app.get("/api/drivers/{driver_id}", response_model=DriverResponse, tags=["Drivers"])
+@locked
 def get_driver_by_id(driver_id: str):
-    db = load_db()
-    driver = next((d for d in db["drivers"] if d["driver_id"] == driver_id), None)
+    driver = store.get("drivers", driver_id)
     if not driver:
         raise HTTPException(status_code=404, detail="Driver not found")
     return driver
 
 @app.post("/api/drivers/", response_model=CreateDriverResponse, status_code=201, tags=["Drivers"])
+@locked
 def create_driver(request: CreateDriverRequest):
-    db = load_db()
-    
-    if any(d["phone_number"] == request.phone_number for d in db["drivers"]):
+    if store.find("drivers", "phone_number", request.phone_number):
         raise HTTPException(status_code=400, detail="Phone number already registered")
 
     new_driver = request.dict()
@@ -172,8 +172,7 @@ def create_driver(request: CreateDriverRequest):
     new_driver["created_at"] = datetime.now().isoformat()
     new_driver["updated_at"] = new_driver["created_at"]
     
-    db["drivers"].append(new_driver)
-    save_db(db)
+    store.insert("drivers", new_driver)
     
     return {
         "driver_id": new_driver["driver_id"],
@@ -182,28 +181,25 @@ def create_driver(request: CreateDriverRequest):
     }
 
 @app.put("/api/drivers/{driver_id}", response_model=DriverResponse, tags=["Drivers"])
+@locked
 def update_driver(driver_id: str, request: UpdateDriverRequest):
-    db = load_db()
-    driver = next((d for d in db["drivers"] if d["driver_id"] == driver_id), None)
+    driver = store.get("drivers", driver_id)
     if not driver:
         raise HTTPException(status_code=404, detail="Driver not found")
 
     update_data = request.dict(exclude_unset=True)
-    for k, v in update_data.items():
-        driver[k] = v
-    driver["updated_at"] = datetime.now().isoformat()
-    save_db(db)
+    update_data["updated_at"] = datetime.now().isoformat()
+    store.update("drivers", driver, update_data)
     return driver
 
 @app.patch("/api/drivers/{driver_id}/availability", tags=["Drivers"])
+@locked
 def update_driver_availability(driver_id: str, is_available: bool = Query(...)):
-    db = load_db()
-    driver = next((d for d in db["drivers"] if d["driver_id"] == driver_id), None)
+    driver = store.get("drivers", driver_id)
     if not driver:
         raise HTTPException(status_code=404, detail="Driver not found")
     
-    driver["is_available"] = is_available
-    save_db(db)
+    store.update("drivers", driver, {"is_available": is_available})
     return {
         "message": "Driver availability updated to " + ("available" if is_available else "unavailable"),
         "driver_id": driver_id,
@@ -211,38 +207,33 @@ def update_driver_availability(driver_id: str, is_available: bool = Query(...)):
     }
 
 @app.patch("/api/drivers/{driver_id}/kyc-status", tags=["Drivers"])
+@locked
 def update_kyc_status(driver_id: str, kyc_status: str = Query(...)):
-    db = load_db()
-    driver = next((d for d in db["drivers"] if d["driver_id"] == driver_id), None)
+    driver = store.get("drivers", driver_id)
     if not driver:
         raise HTTPException(status_code=404, detail="Driver not found")
     
     if kyc_status not in ["pending", "approved", "rejected"]:
         raise HTTPException(status_code=400, detail="Invalid status")
         
-    driver["kyc_verified"] = kyc_status
-    save_db(db)
+    store.update("drivers", driver, {"kyc_verified": kyc_status})
     return {"message": "KYC status updated", "driver_id": driver_id, "kyc_status": kyc_status}
 
 @app.patch("/api/drivers/{driver_id}/approve", tags=["Drivers"])
+@locked
 def approve_driver(driver_id: str, is_approved: bool = Query(...)):
-    db = load_db()
-    driver = next((d for d in db["drivers"] if d["driver_id"] == driver_id), None)
+    driver = store.get("drivers", driver_id)
     if not driver:
         raise HTTPException(status_code=404, detail="Driver not found")
     
-    driver["is_approved"] = is_approved
-    save_db(db)
+    store.update("drivers", driver, {"is_approved": is_approved})
     return {"message": "Driver approval status updated", "driver_id": driver_id, "is_approved": is_approved}
 
 @app.delete("/api/drivers/{driver_id}", tags=["Drivers"])
+@locked
 def delete_driver(driver_id: str):
-    db = load_db()
-    initial_len = len(db["drivers"])
-    db["drivers"] = [d for d in db["drivers"] if d["driver_id"] != driver_id]
-    if len(db["drivers"]) == initial_len:
+    if store.delete("drivers", driver_id) is None:
          raise HTTPException(status_code=404, detail="Driver not found")
-    save_db(db)
     return {"message": "Driver deleted successfully", "driver_id": driver_id}
 
 
@@ -283,30 +274,30 @@ class UpdateVehicleRequest(BaseModel):
     seating_capacity: Optional[int] = None
 
 @app.get("/api/vehicles/", response_model=List[VehicleResponse], tags=["Vehicles"])
+@locked
 def get_vehicles(skip: int = 0, limit: int = 100):
-    db = load_db()
-    return db["vehicles"][skip : skip + limit]
+    return store.page("vehicles", skip, limit)
 
 @app.get("/api/vehicles/{vehicle_id}", response_model=VehicleResponse, tags=["Vehicles"])
+@locked
 def get_vehicle(vehicle_id: str):
-    db = load_db()
-    vehicle = next((v for v in db["vehicles"] if v["vehicle_id"] == vehicle_id), None)
+    vehicle = store.get("vehicles", vehicle_id)
     if not vehicle:
         raise HTTPException(status_code=404, detail="Vehicle not found")
     return vehicle
 
 @app.get("/api/vehicles/driver/{driver_id}", response_model=List[VehicleResponse], tags=["Vehicles"])
+@locked
 def get_vehicles_by_driver(driver_id: str):
-    db = load_db()
-    return [v for v in db["vehicles"] if v["driver_id"] == driver_id]
+    return store.filter("vehicles", "driver_id", driver_id)
 
 @app.post("/api/vehicles/", response_model=CreateVehicleResponse, status_code=201, tags=["Vehicles"])
+@locked
 def create_vehicle(request: CreateVehicleRequest):
-    db = load_db()
-    if any(v["vehicle_number"] == request.vehicle_number for v in db["vehicles"]):
+    if store.find("vehicles", "vehicle_number", request.vehicle_number):
         raise HTTPException(status_code=400, detail="Vehicle number already registered")
     
-    if not any(d["driver_id"] == request.driver_id for d in db["drivers"]):
+    if not store.get("drivers", request.driver_id):
         raise HTTPException(status_code=404, detail="Driver not found")
 
     new_vehicle = request.dict()
@@ -315,8 +306,7 @@ def create_vehicle(request: CreateVehicleRequest):
     new_vehicle["created_at"] = datetime.now().isoformat()
     new_vehicle["updated_at"] = new_vehicle["created_at"]
     
-    db["vehicles"].append(new_vehicle)
-    save_db(db)
+    store.insert("vehicles", new_vehicle)
     
     return {
         "vehicle_id": new_vehicle["vehicle_id"],
@@ -326,28 +316,25 @@ def create_vehicle(request: CreateVehicleRequest):
     }
 
 @app.put("/api/vehicles/{vehicle_id}", tags=["Vehicles"])
+@locked
 def update_vehicle(vehicle_id: str, request: UpdateVehicleRequest):
-    db = load_db()
-    vehicle = next((v for v in db["vehicles"] if v["vehicle_id"] == vehicle_id), None)
+    vehicle = store.get("vehicles", vehicle_id)
     if not vehicle:
         raise HTTPException(status_code=404, detail="Vehicle not found")
     
     update_data = request.dict(exclude_unset=True)
-    for k, v in update_data.items():
-        vehicle[k] = v
-    vehicle["updated_at"] = datetime.now().isoformat()
-    save_db(db)
+    update_data["updated_at"] = datetime.now().isoformat()
+    store.update("vehicles", vehicle, update_data)
     return {"vehicle_id": vehicle_id, "message": "Vehicle updated successfully"}
 
 @app.patch("/api/vehicles/{vehicle_id}/approve", tags=["Vehicles"])
+@locked
 def approve_vehicle(vehicle_id: str, is_approved: bool = Query(...)):
-    db = load_db()
-    vehicle = next((v for v in db["vehicles"] if v["vehicle_id"] == vehicle_id), None)
+    vehicle = store.get("vehicles", vehicle_id)
     if not vehicle:
         raise HTTPException(status_code=404, detail="Vehicle not found")
     
-    vehicle["vehicle_approved"] = is_approved
-    save_db(db)
+    store.update("vehicles", vehicle, {"vehicle_approved": is_approved})
     return {
         "message": "Vehicle approval status updated", 
         "vehicle_id": vehicle_id, 
@@ -356,13 +343,10 @@ def approve_vehicle(vehicle_id: str, is_approved: bool = Query(...)):
     }
 
 @app.delete("/api/vehicles/{vehicle_id}", tags=["Vehicles"])
+@locked
 def delete_vehicle(vehicle_id: str):
-    db = load_db()
-    initial_len = len(db["vehicles"])
-    db["vehicles"] = [v for v in db["vehicles"] if v["vehicle_id"] != vehicle_id]
-    if len(db["vehicles"]) == initial_len:
+    if store.delete("vehicles", vehicle_id) is None:
          raise HTTPException(status_code=404, detail="Vehicle not found")
-    save_db(db)
     return {"message": "Vehicle deleted successfully", "vehicle_id": vehicle_id}
 
 
@@ -415,28 +399,29 @@ class UpdateTripRequest(BaseModel):
     waiting_charges: Optional[float] = None
 
 @app.get("/api/trips/available", response_model=List[TripResponse], tags=["Trips"])
+@locked
 def get_available_trips():
-    db = load_db()
-    return [t for t in db["trips"] if t["trip_status"] == "OPEN"]
+    return store.filter("trips", "trip_status", "OPEN")
 
 @app.get("/api/trips/", response_model=List[TripResponse], tags=["Trips"])
+@locked
 def get_trips(skip: int = 0, limit: int = 100, status_filter: Optional[str] = None):
-    db = load_db()
-    trips = db["trips"]
-    if status_filter:
-        trips = [t for t in trips if t["trip_status"] == status_filter]
+    if not status_filter:
+        return store.page("trips", skip, limit)
+    trips = store.filter("trips", "trip_status", status_filter)
     return trips[skip : skip + limit]
 
 @app.get("/api/trips/{trip_id}", response_model=TripResponse, tags=["Trips"])
+@locked
 def get_trip_by_id(trip_id: str):
-    db = load_db()
-    trip = next((t for t in db["trips"] if t["trip_id"] == trip_id), None)
+    trip = store.get("trips", trip_id)
     if not trip:
         raise HTTPException(status_code=404, detail="Trip not found")
     
-    # Enrich with driver info if assigned
+    # Enrich a copy with driver info if assigned; the stored trip stays as-is
+    trip = dict(trip)
     if trip.get("assigned_driver_id"):
-        driver = next((d for d in db["drivers"] if d["driver_id"] == trip["assigned_driver_id"]), None)
+        driver = store.get("drivers", trip["assigned_driver_id"])
         if driver:
             trip["driver"] = {
                 "driver_id": driver["driver_id"],
@@ -448,10 +433,10 @@ def get_trip_by_id(trip_id: str):
     return trip
 
 @app.post("/api/trips/", response_model=CreateTripResponse, status_code=201, tags=["Trips"])
+@locked
 def create_trip(request: CreateTripRequest):
-    db = load_db()
     # Fare estimation
-    tariff = next((t for t in db["tariff_configs"] if t["vehicle_type"] == request.vehicle_type and t["is_active"]), None)
+    tariff = next((t for t in store.all("tariff_configs") if t["vehicle_type"] == request.vehicle_type and t["is_active"]), None)
     estimated_fare = 100.0 
     if tariff:
         dist = 10 # Default dummy distance
@@ -465,8 +450,7 @@ def create_trip(request: CreateTripRequest):
     new_trip["created_at"] = datetime.now().isoformat()
     new_trip["assigned_driver_id"] = None
     
-    db["trips"].append(new_trip)
-    save_db(db)
+    store.insert("trips", new_trip)
     
     return {
         "trip_id": new_trip["trip_id"],
@@ -476,34 +460,30 @@ def create_trip(request: CreateTripRequest):
     }
 
 @app.put("/api/trips/{trip_id}", tags=["Trips"])
+@locked
 def update_trip(trip_id: str, request: UpdateTripRequest):
-    db = load_db()
-    trip = next((t for t in db["trips"] if t["trip_id"] == trip_id), None)
+    trip = store.get("trips", trip_id)
     if not trip:
         raise HTTPException(status_code=404, detail="Trip not found")
     
     update_data = request.dict(exclude_unset=True)
-    for k, v in update_data.items():
-        trip[k] = v
-    save_db(db)
+    store.update("trips", trip, update_data)
     return trip
 
 @app.patch("/api/trips/{trip_id}/assign-driver/{driver_id}", tags=["Trips"])
+@locked
 def assign_driver(trip_id: str, driver_id: str):
-    db = load_db()
-    trip = next((t for t in db["trips"] if t["trip_id"] == trip_id), None)
+    trip = store.get("trips", trip_id)
     if not trip:
         raise HTTPException(status_code=404, detail="Trip not found")
     
-    driver = next((d for d in db["drivers"] if d["driver_id"] == driver_id), None)
+    driver = store.get("drivers", driver_id)
     if not driver:
          raise HTTPException(status_code=404, detail="Driver not found")
          
-    trip["assigned_driver_id"] = driver_id
-    trip["trip_status"] = "ASSIGNED"
-    driver["is_available"] = False
+    store.update("trips", trip, {"assigned_driver_id": driver_id, "trip_status": "ASSIGNED"})
+    store.update("drivers", driver, {"is_available": False})
     
-    save_db(db)
     return {
         "message": "Driver assigned successfully",
         "trip_id": trip_id,
@@ -512,21 +492,19 @@ def assign_driver(trip_id: str, driver_id: str):
     }
 
 @app.patch("/api/trips/{trip_id}/unassign", tags=["Trips"])
+@locked
 def unassign_driver(trip_id: str):
-    db = load_db()
-    trip = next((t for t in db["trips"] if t["trip_id"] == trip_id), None)
+    trip = store.get("trips", trip_id)
     if not trip:
         raise HTTPException(status_code=404, detail="Trip not found")
     
     prev_driver_id = trip.get("assigned_driver_id")
     if prev_driver_id:
-        driver = next((d for d in db["drivers"] if d["driver_id"] == prev_driver_id), None)
+        driver = store.get("drivers", prev_driver_id)
         if driver:
-            driver["is_available"] = True
+            store.update("drivers", driver, {"is_available": True})
             
-    trip["assigned_driver_id"] = None
-    trip["trip_status"] = "OPEN"
-    save_db(db)
+    store.update("trips", trip, {"assigned_driver_id": None, "trip_status": "OPEN"})
     return {
         "message": "Driver unassigned successfully",
         "trip_id": trip_id,
@@ -535,20 +513,19 @@ def unassign_driver(trip_id: str):
     }
 
 @app.patch("/api/trips/{trip_id}/status", tags=["Trips"])
+@locked
 def update_trip_status(trip_id: str, new_status: str = Query(...)):
-    db = load_db()
-    trip = next((t for t in db["trips"] if t["trip_id"] == trip_id), None)
+    trip = store.get("trips", trip_id)
     if not trip:
         raise HTTPException(status_code=404, detail="Trip not found")
 
-    trip["trip_status"] = new_status
+    store.update("trips", trip, {"trip_status": new_status})
     
     if new_status in ["COMPLETED", "CANCELLED"] and trip.get("assigned_driver_id"):
-        driver = next((d for d in db["drivers"] if d["driver_id"] == trip["assigned_driver_id"]), None)
+        driver = store.get("drivers", trip["assigned_driver_id"])
         if driver:
-            driver["is_available"] = True
+            store.update("drivers", driver, {"is_available": True})
             
-    save_db(db)
     return {
         "message": f"Trip status updated to {new_status}",
         "trip_id": trip_id,
@@ -557,15 +534,13 @@ def update_trip_status(trip_id: str, new_status: str = Query(...)):
     }
 
 @app.patch("/api/trips/{trip_id}/odometer/start", tags=["Trips"])
+@locked
 def update_odometer_start(trip_id: str, odo_start: int = Query(...)):
-    db = load_db()
-    trip = next((t for t in db["trips"] if t["trip_id"] == trip_id), None)
+    trip = store.get("trips", trip_id)
     if not trip:
         raise HTTPException(status_code=404, detail="Trip not found")
         
-    trip["odo_start"] = odo_start
-    trip["trip_status"] = "STARTED"
-    save_db(db)
+    store.update("trips", trip, {"odo_start": odo_start, "trip_status": "STARTED"})
     return {
         "message": "Odometer start updated",
         "trip_id": trip_id,
@@ -574,25 +549,25 @@ def update_odometer_start(trip_id: str, odo_start: int = Query(...)):
     }
 
 @app.patch("/api/trips/{trip_id}/odometer/end", tags=["Trips"])
+@locked
 def update_odometer_end(trip_id: str, odo_end: int = Query(...)):
-    db = load_db()
-    trip = next((t for t in db["trips"] if t["trip_id"] == trip_id), None)
+    trip = store.get("trips", trip_id)
     if not trip:
         raise HTTPException(status_code=404, detail="Trip not found")
         
-    trip["odo_end"] = odo_end
-    trip["trip_status"] = "COMPLETED"
+    # Mock totals
+    store.update("trips", trip, {
+        "odo_end": odo_end,
+        "trip_status": "COMPLETED",
+        "total_amount": (trip.get("fare") or 0) + 50 # Adding random charges
+    })
     
     # Make driver available
     if trip.get("assigned_driver_id"):
-        driver = next((d for d in db["drivers"] if d["driver_id"] == trip["assigned_driver_id"]), None)
+        driver = store.get("drivers", trip["assigned_driver_id"])
         if driver:
-            driver["is_available"] = True
+            store.update("drivers", driver, {"is_available": True})
             
-    # Mock totals
-    trip["total_amount"] = (trip.get("fare") or 0) + 50 # Adding random charges
-    
-    save_db(db)
     return {
         "message": "Trip completed successfully",
         "trip_id": trip_id,
@@ -604,13 +579,10 @@ def update_odometer_end(trip_id: str, odo_end: int = Query(...)):
     }
 
 @app.delete("/api/trips/{trip_id}", tags=["Trips"])
+@locked
 def delete_trip(trip_id: str):
-    db = load_db()
-    initial_len = len(db["trips"])
-    db["trips"] = [t for t in db["trips"] if t["trip_id"] != trip_id]
-    if len(db["trips"]) == initial_len:
+    if store.delete("trips", trip_id) is None:
          raise HTTPException(status_code=404, detail="Trip not found")
-    save_db(db)
     return {"message": "Trip deleted successfully", "trip_id": trip_id}
 
 
@@ -638,37 +610,33 @@ class UpdatePaymentRequest(BaseModel):
     pass # Doc has generic "Update payment info" but no body spec. Assuming status or typical fields.
 
 @app.get("/api/payments/", response_model=List[PaymentResponse], tags=["Payments"])
+@locked
 def get_payments(skip: int = 0, limit: int = 100):
-    db = load_db()
-    return db["payments"][skip : skip + limit]
+    return store.page("payments", skip, limit)
 
 @app.get("/api/payments/{payment_id}", response_model=PaymentResponse, tags=["Payments"])
+@locked
 def get_payment(payment_id: str):
-    db = load_db()
-    payment = next((p for p in db["payments"] if p["payment_id"] == payment_id), None)
+    payment = store.get("payments", payment_id)
     if not payment:
          raise HTTPException(status_code=404, detail="Payment not found")
     return payment
 
 @app.post("/api/payments/", response_model=PaymentResponse, status_code=201, tags=["Payments"])
+@locked
 def create_payment(request: CreatePaymentRequest):
-    db = load_db()
     new_payment = request.dict()
     new_payment["payment_id"] = str(uuid.uuid4())
     new_payment["created_at"] = datetime.now().isoformat()
     
-    db["payments"].append(new_payment)
-    save_db(db)
+    store.insert("payments", new_payment)
     return new_payment
 
 @app.delete("/api/payments/{payment_id}", tags=["Payments"])
+@locked
 def delete_payment(payment_id: str):
-    db = load_db()
-    initial_len = len(db["payments"])
-    db["payments"] = [p for p in db["payments"] if p["payment_id"] != payment_id]
-    if len(db["payments"]) == initial_len:
+    if store.delete("payments", payment_id) is None:
          raise HTTPException(status_code=404, detail="Payment not found")
-    save_db(db)
     return {"message": "Payment deleted successfully", "payment_id": payment_id}
 
 
@@ -699,22 +667,21 @@ class UpdateWalletTxnRequest(BaseModel):
     reference_id: Optional[str] = None
 
 @app.get("/api/v1/wallet-transactions", response_model=List[WalletTxnResponse], tags=["Wallet Transactions"])
+@locked
 def get_all_transactions(skip: int = 0, limit: int = 100):
-    db = load_db()
-    return db["wallet_transactions"][skip : skip + limit]
+    return store.page("wallet_transactions", skip, limit)
 
 @app.get("/api/v1/wallet-transactions/{transaction_id}", response_model=WalletTxnResponse, tags=["Wallet Transactions"])
+@locked
 def get_transaction(transaction_id: int):
-    db = load_db()
-    txn = next((t for t in db["wallet_transactions"] if t["transaction_id"] == transaction_id), None)
+    txn = store.get("wallet_transactions", transaction_id)
     if not txn:
         raise HTTPException(status_code=404, detail="Wallet transaction not found")
     return txn
 
 @app.post("/api/v1/wallet-transactions", response_model=WalletTxnResponse, status_code=201, tags=["Wallet Transactions"])
+@locked
 def create_transaction(request: CreateWalletTxnRequest):
-    db = load_db()
-    
     # Try to find driver. CAREFUL: Driver ID in main system is UUID String.
     # Wallet System uses INT ID in docs.
     # If the user strictly follows the docs, they will send an INT ID.
@@ -726,54 +693,45 @@ def create_transaction(request: CreateWalletTxnRequest):
     
     # For robust testing: "Driver wallet balances are maintained in the drivers table"
     # So I *attempt* to find a driver.
-    found_driver = None
-    for d in db["drivers"]:
-        # Loose match logic
-        if str(d["driver_id"]) == str(request.driver_id):
-            found_driver = d
-            break
+    # Loose match logic: driver ids are stored as strings
+    found_driver = store.get("drivers", str(request.driver_id))
             
     if found_driver:
         current = found_driver.get("wallet_balance", 0.0)
         if request.transaction_type == "debit":
             if current < request.amount:
                  raise HTTPException(status_code=400, detail="Insufficient wallet balance")
-            found_driver["wallet_balance"] = current - request.amount
+            store.update("drivers", found_driver, {"wallet_balance": current - request.amount})
         else:
-            found_driver["wallet_balance"] = current + request.amount
+            store.update("drivers", found_driver, {"wallet_balance": current + request.amount})
 
     new_txn = request.dict()
-    new_txn["transaction_id"] = get_next_id(db["wallet_transactions"], "transaction_id")
+    new_txn["transaction_id"] = store.next_id("wallet_transactions")
     new_txn["created_at"] = datetime.now().isoformat()
     new_txn["updated_at"] = None
     
-    db["wallet_transactions"].append(new_txn)
-    save_db(db)
+    store.insert("wallet_transactions", new_txn)
     return new_txn
 
 @app.put("/api/v1/wallet-transactions/{transaction_id}", response_model=WalletTxnResponse, tags=["Wallet Transactions"])
+@locked
 def update_transaction(transaction_id: int, request: UpdateWalletTxnRequest):
-    db = load_db()
-    txn = next((t for t in db["wallet_transactions"] if t["transaction_id"] == transaction_id), None)
+    txn = store.get("wallet_transactions", transaction_id)
     if not txn:
         raise HTTPException(status_code=404, detail="Wallet transaction not found")
         
-    if request.description: txn["description"] = request.description
-    if request.reference_id: txn["reference_id"] = request.reference_id
+    changes = {"updated_at": datetime.now().isoformat()}
+    if request.description: changes["description"] = request.description
+    if request.reference_id: changes["reference_id"] = request.reference_id
         
-    txn["updated_at"] = datetime.now().isoformat()
-    save_db(db)
+    store.update("wallet_transactions", txn, changes)
     return txn
 
 @app.delete("/api/v1/wallet-transactions/{transaction_id}", tags=["Wallet Transactions"])
+@locked
 def delete_transaction(transaction_id: int):
-    db = load_db()
-    initial_len = len(db["wallet_transactions"])
-    db["wallet_transactions"] = [t for t in db["wallet_transactions"] if t["transaction_id"] != transaction_id]
-    
-    if len(db["wallet_transactions"]) == initial_len:
+    if store.delete("wallet_transactions", transaction_id) is None:
         raise HTTPException(status_code=404, detail="Wallet transaction not found")
-    save_db(db)
     return {"message": "Wallet transaction deleted successfully", "transaction_id": transaction_id}
 
 
@@ -794,25 +752,93 @@ class TariffConfig(BaseModel):
     updated_at: Optional[str] = None
 
 @app.get("/api/v1/tariff-config/", response_model=List[TariffConfig], tags=["Tariff Config"])
+@locked
 def get_tariffs(skip: int = 0, limit: int = 100):
-    db = load_db()
-    return db["tariff_configs"][skip : skip + limit]
+    return store.page("tariff_configs", skip, limit)
 
 @app.post("/api/v1/tariff-config/", response_model=TariffConfig, status_code=201, tags=["Tariff Config"])
+@locked
 def create_tariff(tariff: TariffConfig):
-    db = load_db()
     new_tariff = tariff.dict()
-    new_tariff["config_id"] = get_next_id(db["tariff_configs"], "config_id")
+    new_tariff["config_id"] = store.next_id("tariff_configs")
     new_tariff["created_at"] = datetime.now().isoformat()
-    db["tariff_configs"].append(new_tariff)
-    save_db(db)
+    store.insert("tariff_configs", new_tariff)
     return new_tariff
 
 
+# ==========================================
+# 7. BULK SEEDING (internal, hidden from the spec)
+# ==========================================
+
+class BulkInsertRequest(BaseModel):
+    items: List[Dict[str, Any]]
+
+# Seeded items must be readable by the collection's GET endpoints, so they are checked against the same models
+BULK_MODELS = {
+    "drivers": DriverResponse,
+    "vehicles": VehicleResponse,
+    "tariff_configs": TariffConfig,
+    "trips": TripResponse,
+    "payments": PaymentResponse,
+    "wallet_transactions": WalletTxnResponse
+}
+
+@app.post("/api/bulk/{collection}", status_code=201, include_in_schema=False)
+@locked
+def bulk_insert(collection: str, request: BulkInsertRequest):
+    if collection not in COLLECTIONS:
+        raise HTTPException(status_code=404, detail="Unknown collection")
+
+    pk = COLLECTIONS[collection]
+    items = request.items
+    sequenced = collection in SEQUENCES
+    # Items without a key share one contiguous id range instead of allocating per item;
+    # explicit keys are kept
+    unkeyed = [item for item in items if pk and item.get(pk) is None]
+    ids = iter(store.reserve_ids(collection, len(unkeyed))) if sequenced and unkeyed else None
+    now = datetime.now().isoformat()
+    for item in unkeyed:
+        item[pk] = next(ids) if ids is not None else str(uuid.uuid4())
+    for item in items:
+        item.setdefault("created_at", now)
+
+    # The whole batch is checked before anything is stored, so a bad item leaves no partial insert
+    model = BULK_MODELS.get(collection)
+    if model is not None:
+        errors = []
+        for i, item in enumerate(items):
+            try:
+                # Keys as the model coerces them ("7" -> 7), so the sequence and index see one type
+                item[pk] = getattr(model.model_validate(item), pk)
+            except ValidationError as e:
+                errors.append({"index": i, "errors": e.errors(include_url=False, include_context=False)})
+        if errors:
+            raise HTTPException(status_code=422, detail=errors)
+    checks = ([pk] if pk else []) + UNIQUE_FIELDS.get(collection, [])
+    for field in checks:
+        seen = set()
+        for item in items:
+            value = item.get(field)
+            if value is None:
+                continue
+            taken = store.get(collection, value) if field == pk else store.find(collection, field, value)
+            if taken or value in seen:
+                raise HTTPException(status_code=400, detail=f"Duplicate {field}: {value}")
+            seen.add(value)
+
+    for item in items:
+        store.insert(collection, item)
+    keys = [item[pk] for item in items] if pk else []
+    if sequenced and keys:
+        store.advance_sequence(collection, max(keys) + 1)
+
+    return {
+        "collection": collection,
+        "inserted": len(items),
+        # Lowest and highest key in the batch (explicit keys need not be contiguous)
+        "id_range": [min(keys), max(keys)] if sequenced and keys else None
+    }
+
+
 if __name__ == "__main__":
-    if not os.path.exists(DB_FILE):
-        save_db({
-            "drivers": [], "vehicles": [], "tariff_configs": [], 
-            "trips": [], "payments": [], "wallet_transactions": [], "driver_requests": []
-        })
     uvicorn.run(app, host="0.0.0.0", port=8001)
@@ -0,0 +1,287 @@
+import json
+import os
+import itertools
+import threading
+import atexit
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Iterator
+
+# Collection name -> primary key field (None: plain list, no index)
+COLLECTIONS = {
+    "drivers": "driver_id",
+    "vehicles": "vehicle_id",
+    "tariff_configs": "config_id",
+    "trips": "trip_id",
+    "payments": "payment_id",
+    "wallet_transactions": "transaction_id",
+    "driver_requests": None
+}
+
+# Integer-keyed collections get a persistent sequence instead of max(id) + 1 scans
+SEQUENCES = ["wallet_transactions", "tariff_configs"]
+
+# Secondary unique indexes used for duplicate checks and lookups
+UNIQUE_FIELDS = {
+    "drivers": ["phone_number"],
+    "vehicles": ["vehicle_number"]
+}
+
+
+class Store:
+    # Persistence: a JSON snapshot (self.path) plus an append-only JSON-lines journal of mutations.
+    # Each write appends one small record; the snapshot is only rewritten when the journal is compacted.
+    def __init__(self, path: str, flush_interval: float = 0.5, compact_bytes: int = 1024 * 1024):
+        self.path = path
+        self.journal_path = f"{path}.journal"
+        self.flush_interval = flush_interval
+        self.compact_bytes = compact_bytes
+        self.lock = threading.RLock()
+        # Primary-key collections are dicts (insertion ordered); the rest stay lists
+        self._data: Dict[str, Any] = {}
+        self._unique: Dict[str, Dict[str, Dict[Any, Any]]] = {}
+        self._sequences: Dict[str, int] = {}
+        self._pending: List[str] = []
+        self._journal_bytes = 0
+        # Log sequence number of the last journal record; the snapshot stores the one it includes
+        self._lsn = 0
+        self._io_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        self._load()
+
+    # --- Loading / persistence ---
+
+    def _load(self):
+        raw: Dict[str, Any] = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                raw = json.load(f)
+        self._populate(raw)
+        self._replay()
+        self._recover_sequences()
+
+    def _replay(self):
+        # Records at or below the snapshot's sequence number are already in it (a crash between
+        # writing the snapshot and resetting the journal), so they are skipped; list collections
+        # would otherwise get their inserts appended twice
+        if not os.path.exists(self.journal_path):
+            return
+        folded = self._lsn
+        good = 0
+        with open(self.journal_path, "rb") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn final write from a crash; everything before it is intact
+                    break
+                good += len(line)
+                lsn = record.get("n", 0)
+                self._lsn = max(self._lsn, lsn)
+                if not lsn or lsn > folded:
+                    self._apply(record)
+        if good < os.path.getsize(self.journal_path):
+            # Cut the torn tail, or later appends would sit behind it and be lost on the next replay
+            os.truncate(self.journal_path, good)
+        self._journal_bytes = good
+
+    def _recover_sequences(self):
+        # Never hand out an id at or below one already stored (covers data edited by hand)
+        for name in SEQUENCES:
+            keys = [k for k in self._data[name] if isinstance(k, int)]
+            floor = max(keys) + 1 if keys else 1
+            self._sequences[name] = max(self._sequences.get(name, 1), floor)
+
+    def _apply(self, record: Dict[str, Any]):
+        name, op = record["c"], record["op"]
+        if op == "seq":
+            self._sequences[name] = max(self._sequences.get(name, 1), record["v"])
+        elif op == "insert":
+            if COLLECTIONS[name] is None:
+                self._data[name].append(record["item"])
+            else:
+                self._index(name, record["item"])
+        elif op == "update":
+            item = self._data[name].get(record["k"])
+            if item is not None:
+                self._unindex(name, item)
+                item.update(record["changes"])
+                self._index(name, item)
+        elif op == "delete":
+            item = self._data[name].pop(record["k"], None)
+            if item is not None:
+                self._unindex(name, item)
+
+    def _log(self, record: Dict[str, Any]):
+        # Called with self.lock held, so sequence numbers follow the order of the mutations
+        self._lsn += 1
+        record["n"] = self._lsn
+        self._pending.append(json.dumps(record) + "\n")
+
+    def _populate(self, raw: Dict[str, Any]):
+        self._data = {}
+        self._unique = {}
+        self._sequences = dict(raw.get("_sequences", {}))
+        self._lsn = raw.get("_lsn", 0)
+        for name, pk in COLLECTIONS.items():
+            items = raw.get(name, [])
+            if pk is None:
+                self._data[name] = list(items)
+                continue
+            self._data[name] = {}
+            self._unique[name] = {field: {} for field in UNIQUE_FIELDS.get(name, [])}
+            for item in items:
+                self._index(name, item)
+
+    def _index(self, name: str, item: Dict[str, Any]):
+        pk = COLLECTIONS[name]
+        self._data[name][item[pk]] = item
+        for field, index in self._unique[name].items():
+            if item.get(field) is not None:
+                index[item[field]] = item[pk]
+
+    def _unindex(self, name: str, item: Dict[str, Any]):
+        for field, index in self._unique[name].items():
+            if index.get(item.get(field)) == item[COLLECTIONS[name]]:
+                del index[item[field]]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            data: Dict[str, Any] = {
+                name: list(coll.values()) if isinstance(coll, dict) else list(coll)
+                for name, coll in self._data.items()
+            }
+            data["_sequences"] = dict(self._sequences)
+            data["_lsn"] = self._lsn
+            return data
+
+    def flush(self):
+        with self._io_lock:
+            with self.lock:
+                if not self._pending:
+                    return
+                lines, self._pending = self._pending, []
+                chunk = "".join(lines)
+                compact = self._journal_bytes + len(chunk) > self.compact_bytes
+                # The snapshot already contains these records, so a compaction can drop them
+                payload = json.dumps(self.snapshot(), indent=2) if compact else None
+
+            # Disk I/O happens outside the data lock
+            if compact:
+                self._compact(payload)
+            else:
+                with open(self.journal_path, "a") as f:
+                    f.write(chunk)
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._journal_bytes += len(chunk)
+
+    def _compact(self, payload: str):
+        # Snapshot first (temp file + fsync + rename), then reset the journal.
+        # A crash between the two just replays already-applied records.
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        with open(self.journal_path, "w") as f:
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_bytes = 0
+
+    def compact(self):
+        with self._io_lock:
+            with self.lock:
+                self._pending = []
+                payload = json.dumps(self.snapshot(), indent=2)
+            self._compact(payload)
+
+    def start(self):
+        # Write-behind: mutations queue journal records, a background thread appends them in batches
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+            self._flusher.start()
+            atexit.register(self.close)
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def close(self):
+        self._stop.set()
+        self.flush()
+
+    # --- Access ---
+
+    @contextmanager
+    def transaction(self) -> Iterator["Store"]:
+        # Serializes read-modify-write sequences across the threadpool handlers
+        with self.lock:
+            yield self
+
+    def all(self, name: str) -> List[Dict[str, Any]]:
+        coll = self._data[name]
+        return list(coll.values()) if isinstance(coll, dict) else list(coll)
+
+    def page(self, name: str, skip: int, limit: int) -> List[Dict[str, Any]]:
+        coll = self._data[name]
+        values = coll.values() if isinstance(coll, dict) else coll
+        return list(itertools.islice(values, skip, skip + limit))
+
+    def get(self, name: str, key: Any) -> Optional[Dict[str, Any]]:
+        return self._data[name].get(key)
+
+    def find(self, name: str, field: str, value: Any) -> Optional[Dict[str, Any]]:
+        index = self._unique.get(name, {}).get(field)
+        if index is not None:
+            key = index.get(value)
+            return self._data[name].get(key) if key is not None else None
+        return next((item for item in self.all(name) if item.get(field) == value), None)
+
+    def filter(self, name: str, field: str, value: Any) -> List[Dict[str, Any]]:
+        return [item for item in self.all(name) if item.get(field) == value]
+
+    def reserve_ids(self, name: str, count: int = 1) -> range:
+        # O(1) allocation; ids are never reused, even after deletes
+        with self.lock:
+            start = self._sequences.get(name, 1)
+            self._sequences[name] = start + count
+            self._log({"op": "seq", "c": name, "v": start + count})
+        return range(start, start + count)
+
+    def next_id(self, name: str) -> int:
+        return self.reserve_ids(name, 1)[0]
+
+    def advance_sequence(self, name: str, floor: int):
+        # Explicitly keyed inserts (seeding) move the sequence past their ids so next_id never reuses them
+        with self.lock:
+            if floor > self._sequences.get(name, 1):
+                self._sequences[name] = floor
+                self._log({"op": "seq", "c": name, "v": floor})
+
+    def insert(self, name: str, item: Dict[str, Any]) -> Dict[str, Any]:
+        with self.lock:
+            if COLLECTIONS[name] is None:
+                self._data[name].append(item)
+            else:
+                self._index(name, item)
+            self._log({"op": "insert", "c": name, "item": item})
+        return item
+
+    def update(self, name: str, item: Dict[str, Any], changes: Dict[str, Any]) -> Dict[str, Any]:
+        # Applies changes in place, keeping the unique indexes in step
+        with self.lock:
+            self._unindex(name, item)
+            item.update(changes)
+            self._index(name, item)
+            self._log({"op": "update", "c": name, "k": item[COLLECTIONS[name]], "changes": changes})
+        return item
+
+    def delete(self, name: str, key: Any) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            item = self._data[name].pop(key, None)
+            if item is not None:
+                self._unindex(name, item)
+                self._log({"op": "delete", "c": name, "k": key})
+        return item
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The mock API runs from its own directory (`uvicorn main:app`), so its modules import as top-level.
+# Appended, not prepended: when both suites run together, `main` stays the backend's.
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,104 @@
+import json
+import os
+
+import pytest
+
+from storage import Store
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "database.json")
+
+
+def driver(key, phone):
+    return {"driver_id": key, "phone_number": phone, "name": key}
+
+
+def test_unique_indexes_follow_updates_and_deletes(path):
+    store = Store(path)
+    item = store.insert("drivers", driver("D1", "900"))
+    store.insert("drivers", driver("D2", "901"))
+    assert store.find("drivers", "phone_number", "900") is item
+
+    store.update("drivers", item, {"phone_number": "902"})
+    assert store.find("drivers", "phone_number", "900") is None
+    assert store.find("drivers", "phone_number", "902") is item
+
+    store.delete("drivers", "D1")
+    assert store.find("drivers", "phone_number", "902") is None
+    assert [d["driver_id"] for d in store.page("drivers", 0, 10)] == ["D2"]
+
+
+def test_writes_reach_disk_on_flush_and_replay(path):
+    store = Store(path)
+    store.insert("drivers", driver("D1", "900"))
+    store.insert("driver_requests", {"driver": "D1"})
+    assert not os.path.exists(store.journal_path)
+
+    store.flush()
+    store.update("drivers", store.get("drivers", "D1"), {"name": "Renamed"})
+    store.flush()
+    reloaded = Store(path)
+    assert reloaded.get("drivers", "D1")["name"] == "Renamed"
+    assert reloaded.all("driver_requests") == [{"driver": "D1"}]
+
+
+def test_compaction_folds_the_journal_into_the_snapshot(path):
+    store = Store(path, compact_bytes=200)
+    for n in range(5):
+        store.insert("drivers", driver(f"D{n}", str(n)))
+    store.flush()
+    assert os.path.getsize(store.journal_path) == 0
+    assert len(json.load(open(path))["drivers"]) == 5
+    assert [d["driver_id"] for d in Store(path).all("drivers")] == [f"D{n}" for n in range(5)]
+
+
+def test_replay_after_a_crash_mid_compaction_applies_nothing_twice(path):
+    store = Store(path)
+    store.insert("driver_requests", {"driver": "D1"})
+    store.next_id("wallet_transactions")
+    store.flush()
+    journal = open(store.journal_path).read()
+    # Snapshot written, then the process died before the journal was reset
+    store.compact()
+    with open(store.journal_path, "w") as f:
+        f.write(journal)
+
+    reloaded = Store(path)
+    assert reloaded.all("driver_requests") == [{"driver": "D1"}]
+    assert reloaded.next_id("wallet_transactions") == 2
+
+
+def test_torn_tail_is_cut_and_later_writes_survive(path):
+    store = Store(path)
+    store.insert("drivers", driver("D1", "900"))
+    store.flush()
+    with open(store.journal_path, "a") as f:
+        f.write('{"op": "insert", "c": "drivers", "it')
+
+    recovered = Store(path)
+    assert [d["driver_id"] for d in recovered.all("drivers")] == ["D1"]
+    recovered.insert("drivers", driver("D2", "901"))
+    recovered.flush()
+    assert [d["driver_id"] for d in Store(path).all("drivers")] == ["D1", "D2"]
+
+
+def test_sequences_never_reuse_ids(path):
+    store = Store(path)
+    assert list(store.reserve_ids("wallet_transactions", 3)) == [1, 2, 3]
+    store.insert("wallet_transactions", {"transaction_id": 3})
+    store.delete("wallet_transactions", 3)
+    store.advance_sequence("tariff_configs", 50)
+    store.advance_sequence("tariff_configs", 10)
+    store.flush()
+
+    reloaded = Store(path)
+    assert reloaded.next_id("wallet_transactions") == 4
+    assert reloaded.next_id("tariff_configs") == 50
+
+
+def test_sequences_recover_from_hand_edited_data(path):
+    with open(path, "w") as f:
+        json.dump({"tariff_configs": [{"config_id": 7}], "_sequences": {"tariff_configs": 2}}, f)
+    assert Store(path).next_id("tariff_configs") == 8